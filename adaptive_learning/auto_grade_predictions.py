@@ -15,12 +15,16 @@ Features:
 - Can re-grade if needed
 """
 
+import os
 import sqlite3
 import sys
 import requests
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from player_identity import get_player_index
+
 DB_PATH = "database/nhl_predictions.db"
 NHL_API_BASE = "https://api-web.nhle.com/v1"
 
@@ -85,56 +89,37 @@ def fetch_game_boxscore(game_id: int) -> Optional[Dict]:
         return None
 
 
-def extract_last_name(full_name: str) -> str:
-    """Extract last name from a player name, handling abbreviations"""
-    # Remove periods and extra spaces
-    cleaned = full_name.replace('.', '').strip()
-    # Split and get last word (assumes last name is last word)
-    parts = cleaned.split()
-    return parts[-1].lower() if parts else ""
-
-
-def names_match(db_name: str, api_name: str) -> bool:
+def names_match(db_name: str, api_name: str, team: Optional[str] = None) -> bool:
     """
     Check if two player names match, handling abbreviations
 
     Args:
         db_name: Full name from database (e.g., "Elias Lindholm")
         api_name: Abbreviated name from API (e.g., "E. Lindholm")
+        team: Team abbreviation, to tell apart players sharing a last name
 
     Returns:
-        True if names likely refer to same player
+        True if both names resolve to the same player in the identity index
     """
-    db_last = extract_last_name(db_name)
-    api_last = extract_last_name(api_name)
-
-    # Match if last names are the same
-    if db_last and api_last and db_last == api_last:
-        return True
-
-    # Fallback: check if one name contains the other
-    db_lower = db_name.lower().strip()
-    api_lower = api_name.lower().strip()
-    return db_lower in api_lower or api_lower in db_lower
+    return get_player_index(DB_PATH).same_player(db_name, api_name, team)
 
 
-def extract_player_stats(boxscore: Dict, player_name: str) -> Optional[Dict]:
+def boxscore_players(boxscore: Dict):
     """
-    Extract stats for a specific player from boxscore
+    Iterate over the players in a boxscore
 
     Args:
         boxscore: Boxscore data from NHL API
-        player_name: Player name to search for
 
-    Returns:
-        Dictionary with player stats (points, shots, toi, etc.)
+    Yields:
+        (api_name, team_abbrev, stats dict) for every skater and goalie
     """
     if not boxscore:
-        return None
+        return
 
     # Player stats are in playerByGameStats, not directly in homeTeam/awayTeam
     if 'playerByGameStats' not in boxscore:
-        return None
+        return
 
     stats = boxscore['playerByGameStats']
 
@@ -144,51 +129,65 @@ def extract_player_stats(boxscore: Dict, player_name: str) -> Optional[Dict]:
             continue
 
         team = stats[team_key]
+        team_abbrev = boxscore.get(team_key, {}).get('abbrev')
 
-        # Check forwards
-        if 'forwards' in team:
-            for player in team['forwards']:
-                api_name = player.get('name', {}).get('default', '')
-                if names_match(player_name, api_name):
-                    return {
-                        'name': api_name,
-                        'goals': player.get('goals', 0),
-                        'assists': player.get('assists', 0),
-                        'points': player.get('goals', 0) + player.get('assists', 0),
-                        'shots': player.get('sog', 0),
-                        'toi': player.get('toi', '0:00'),
-                        'position': 'F'
-                    }
-
-        # Check defense
-        if 'defense' in team:
-            for player in team['defense']:
+        for group, position in [('forwards', 'F'), ('defense', 'D')]:
+            for player in team.get(group, []):
                 api_name = player.get('name', {}).get('default', '')
-                if names_match(player_name, api_name):
-                    return {
-                        'name': api_name,
-                        'goals': player.get('goals', 0),
-                        'assists': player.get('assists', 0),
-                        'points': player.get('goals', 0) + player.get('assists', 0),
-                        'shots': player.get('sog', 0),
-                        'toi': player.get('toi', '0:00'),
-                        'position': 'D'
-                    }
-
-        # Check goalies
-        if 'goalies' in team:
-            for goalie in team['goalies']:
-                api_name = goalie.get('name', {}).get('default', '')
-                if names_match(player_name, api_name):
-                    return {
-                        'name': api_name,
-                        'saves': goalie.get('saves', 0),
-                        'goals_against': goalie.get('goalsAgainst', 0),
-                        'toi': goalie.get('toi', '0:00'),
-                        'position': 'G'
-                    }
-
-    return None
+                yield api_name, team_abbrev, {
+                    'name': api_name,
+                    'goals': player.get('goals', 0),
+                    'assists': player.get('assists', 0),
+                    'points': player.get('goals', 0) + player.get('assists', 0),
+                    'shots': player.get('sog', 0),
+                    'toi': player.get('toi', '0:00'),
+                    'position': position
+                }
+
+        for goalie in team.get('goalies', []):
+            api_name = goalie.get('name', {}).get('default', '')
+            yield api_name, team_abbrev, {
+                'name': api_name,
+                'saves': goalie.get('saves', 0),
+                'goals_against': goalie.get('goalsAgainst', 0),
+                'toi': goalie.get('toi', '0:00'),
+                'position': 'G'
+            }
+
+
+def index_boxscore_players(boxscores: List[Dict]) -> Dict[int, Dict]:
+    """
+    Map player_id -> stats for every player in a night's boxscores
+
+    Args:
+        boxscores: Boxscore data from NHL API
+
+    Returns:
+        Dictionary keyed by player identity (players that cannot be
+        resolved unambiguously are left out)
+    """
+    entries = [entry for boxscore in boxscores for entry in boxscore_players(boxscore)]
+    player_ids = get_player_index(DB_PATH).resolve_unique([entry[0] for entry in entries],
+                                                         [entry[1] for entry in entries])
+    return {player_id: entry[2] for player_id, entry in zip(player_ids, entries) if player_id is not None}
+
+
+def extract_player_stats(boxscore: Dict, player_name: str, team: Optional[str] = None) -> Optional[Dict]:
+    """
+    Extract stats for a specific player from boxscore
+
+    Args:
+        boxscore: Boxscore data from NHL API
+        player_name: Player name to search for
+        team: Player's team abbreviation (optional)
+
+    Returns:
+        Dictionary with player stats (points, shots, toi, etc.)
+    """
+    player_id = get_player_index(DB_PATH).resolve(player_name, team)
+    if player_id is None:
+        return None
+    return index_boxscore_players([boxscore]).get(player_id)
 
 
 def convert_toi_to_minutes(toi_str: str) -> float:
@@ -423,6 +422,10 @@ def main():
             if boxscore:
                 game_boxscores[game_id] = boxscore
 
+    # Resolve every boxscore player once; predictions then look up by player_id
+    player_index = get_player_index(DB_PATH)
+    players_by_id = index_boxscore_players(list(game_boxscores.values()))
+
     # Grade predictions
     graded_count = 0
     not_found_count = 0
@@ -434,11 +437,8 @@ def main():
         line = prediction['line']
 
         # Find player stats across all games
-        player_stats = None
-        for game_id, boxscore in game_boxscores.items():
-            player_stats = extract_player_stats(boxscore, player_name)
-            if player_stats:
-                break
+        player_id = player_index.resolve(player_name, prediction.get('team'))
+        player_stats = players_by_id.get(player_id) if player_id is not None else None
 
         if not player_stats:
             print(f"[{i}/{len(predictions)}] [WARN] {player_name} - NOT FOUND in any game")
@@ -9,6 +9,7 @@ Usage:
 """
 
 import requests
+import threading
 import time
 from typing import Optional
 from system_logger import get_logger
@@ -16,6 +17,47 @@ from system_logger import get_logger
 logger = get_logger(__name__)
 
 
+class RateLimiter:
+    """
+    Token-bucket rate limit shared by every thread that calls wait()
+
+    Up to `burst` calls go out immediately; after that calls are spaced to
+    `calls_per_minute`.
+
+    Example:
+        >>> limiter = RateLimiter(calls_per_minute=60, burst=4)
+        >>> response = fetch_with_retry(url, rate_limiter=limiter)
+    """
+
+    def __init__(self, calls_per_minute: float, burst: int = 1):
+        self.interval = 60.0 / calls_per_minute
+        self.burst = max(int(burst), 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> float:
+        """
+        Block until a call is allowed
+
+        Returns:
+            Seconds waited
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+            self._updated = now
+
+            # Reserve a token (may go negative = queued behind other threads)
+            self._tokens -= 1.0
+            wait_time = max(-self._tokens * self.interval, 0.0)
+
+        if wait_time > 0:
+            logger.debug(f"Rate limiting: waiting {wait_time:.2f}s")
+            time.sleep(wait_time)
+        return wait_time
+
+
 def fetch_with_retry(
     url: str,
     method: str = "GET",
@@ -24,7 +66,8 @@ def fetch_with_retry(
     json_data: Optional[dict] = None,
     max_retries: int = 3,
     timeout: int = 30,
-    backoff_factor: float = 2.0
+    backoff_factor: float = 2.0,
+    rate_limiter: Optional[RateLimiter] = None
 ) -> requests.Response:
     """
     Fetch data from API with exponential backoff retry logic
@@ -38,6 +81,7 @@ def fetch_with_retry(
         max_retries: Maximum number of retry attempts
         timeout: Request timeout in seconds
         backoff_factor: Multiplier for wait time between retries
+        rate_limiter: Shared RateLimiter applied to every attempt
 
     Returns:
         requests.Response object
@@ -53,6 +97,9 @@ def fetch_with_retry(
     last_exception = None
 
     for attempt in range(max_retries):
+        if rate_limiter is not None:
+            rate_limiter.wait()
+
         try:
             logger.debug(f"Attempt {attempt + 1}/{max_retries}: {method} {url}")
 
@@ -13,6 +13,7 @@ import subprocess
 import sys
 import time
 import requests
+from prizepicks_payouts import PrizePicksPayoutCalculator
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -722,6 +723,19 @@ elif page == "💎 Edges & Parlays":
             if len(filtered) > 10:
                 st.info(f"Showing top 10 of {len(filtered)} parlays. Download CSV for full list.")
 
+            # Payout reference (same table the optimizer scores parlays with)
+            with st.expander("ℹ️ PrizePicks Payout Table"):
+                payout_rows = []
+                for num_legs in range(2, 7):
+                    payout_rows.append({
+                        'Legs': num_legs,
+                        'Standard': f"{PrizePicksPayoutCalculator.get_payout_for_odds_type(num_legs, 'standard'):.2f}x",
+                        'Goblin': f"{PrizePicksPayoutCalculator.get_payout_for_odds_type(num_legs, 'goblin'):.2f}x",
+                        'Demon': f"{PrizePicksPayoutCalculator.get_payout_for_odds_type(num_legs, 'demon'):.2f}x",
+                    })
+                st.dataframe(pd.DataFrame(payout_rows), use_container_width=True, hide_index=True)
+                st.caption("Mixed parlays use a weighted blend of the per-leg odds_type factors")
+
             # Download
             csv = filtered.to_csv(index=False)
             st.download_button(
@@ -1642,6 +1656,66 @@ elif page == "🔧 Settings":
     st.caption(f"- Max single bet: ${bankroll * kelly_fraction * 0.10:,.2f} (10% EV)")
     st.caption(f"- Max parlay bet: ${bankroll * kelly_fraction * 0.05:,.2f} (5% EV)")
 
+    max_bet_pct = st.slider(
+        "Max Bet (% of bankroll)",
+        min_value=1,
+        max_value=20,
+        value=5,
+        step=1
+    ) / 100
+
+    # Bankroll simulation of today's GTO parlays
+    with st.expander("🎲 Simulate Today's Parlay Slate"):
+        sim_days = st.slider("Days per season", min_value=1, max_value=180, value=100, step=1)
+        sim_seasons = st.select_slider(
+            "Simulated seasons",
+            options=[10000, 25000, 50000, 100000],
+            value=100000
+        )
+        sim_sizing = st.radio("Sizing", ["independent", "portfolio"], horizontal=True)
+
+        if st.button("Run Simulation", use_container_width=True):
+            from bankroll_manager import BankrollManager
+
+            manager = BankrollManager(kelly_fraction=kelly_fraction, max_bet_pct=max_bet_pct)
+            parlay_legs, leg_probabilities, payouts = manager.load_slate()
+
+            if not parlay_legs:
+                st.info("No GTO parlays saved for today. Run the GTO optimizer first.")
+            else:
+                fractions = sorted({0.10, 0.25, 0.50, 1.00, round(kelly_fraction, 2)})
+                with st.spinner(f"Simulating {sim_seasons:,} seasons..."):
+                    results = manager.simulate_seasons(
+                        parlay_legs, leg_probabilities, payouts,
+                        kelly_fractions=fractions,
+                        n_seasons=sim_seasons,
+                        n_days=sim_days,
+                        starting_bankroll=bankroll,
+                        sizing=sim_sizing
+                    )
+
+                st.caption(f"{len(parlay_legs)} parlays, {len(leg_probabilities)} unique legs")
+                st.dataframe(
+                    results.style.format({
+                        'kelly_fraction': '{:.2f}',
+                        'daily_risk_pct': '{:.1%}',
+                        'mean_bankroll': '${:,.0f}',
+                        'p5_bankroll': '${:,.0f}',
+                        'p25_bankroll': '${:,.0f}',
+                        'p50_bankroll': '${:,.0f}',
+                        'p75_bankroll': '${:,.0f}',
+                        'p95_bankroll': '${:,.0f}',
+                        'prob_profit': '{:.1%}',
+                        'prob_ruin': '{:.2%}',
+                        'p50_drawdown': '{:.1%}',
+                        'p95_drawdown': '{:.1%}',
+                        'p99_drawdown': '{:.1%}',
+                    }),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                st.caption("Ruin = bankroll falls below 50% of its starting value at any point in the season")
+
     st.markdown("---")
 
     # Confidence Thresholds
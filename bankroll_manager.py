@@ -17,16 +17,26 @@ Usage:
         edge=0.10
     )
 
-    # Record bet result
-    manager.record_bet(bet_size, won=True, payout=50)
+    # Record bet, grade it once settled
+    bet_id = manager.record_bet(25, 'parlay', '2-leg parlay', 0.55, 3.0, 0.65, num_legs=2)
+    manager.grade_bet(bet_id, 'won', payout=75)
 
     # Check bankroll status
     print(manager.get_status())
+
+    # Replay today's slate 100k times at several Kelly fractions
+    legs, probs, payouts = manager.load_slate()
+    results = manager.simulate_seasons(legs, probs, payouts, n_days=100)
+    manager.print_simulation(results)
 """
 
+import json
 import sqlite3
+import time
+import numpy as np
+import pandas as pd
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, Sequence, Tuple
 from system_logger import get_logger
 
 logger = get_logger(__name__)
@@ -70,13 +80,14 @@ class BankrollManager:
 
         # Initialize database tables
         self._init_database()
+        self._load_ledger()
 
         # Load or set initial bankroll
         if initial_bankroll is not None:
             self._set_bankroll(initial_bankroll)
             logger.info(f"Bankroll initialized: ${initial_bankroll:,.2f}")
         else:
-            self.current_bankroll = self._load_bankroll()
+            self.current_bankroll = self.ledger['balance']
             if self.current_bankroll == 0:
                 logger.warning("No bankroll found. Set initial bankroll first.")
             else:
@@ -120,38 +131,182 @@ class BankrollManager:
             )
         """)
 
+        # Number of legs (for ROI by leg count)
+        cursor.execute("PRAGMA table_info(bet_history)")
+        if 'num_legs' not in [col[1] for col in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE bet_history ADD COLUMN num_legs INTEGER")
+
+        # Running aggregates, updated in the same transaction as bet_history
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS bankroll_ledger (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                balance REAL NOT NULL,
+                peak_balance REAL NOT NULL,
+                max_drawdown REAL NOT NULL,  -- fraction of peak
+                settled_bets INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                losses INTEGER NOT NULL,
+                total_staked REAL NOT NULL,
+                total_profit REAL NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS bankroll_ledger_daily (
+                date TEXT PRIMARY KEY,
+                open_bets INTEGER NOT NULL,
+                open_exposure REAL NOT NULL,
+                wins INTEGER NOT NULL,
+                losses INTEGER NOT NULL,
+                profit REAL NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS bankroll_ledger_legs (
+                num_legs INTEGER PRIMARY KEY,  -- 0 = unknown
+                bets INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                losses INTEGER NOT NULL,
+                staked REAL NOT NULL,
+                profit REAL NOT NULL
+            )
+        """)
+
+        cursor.execute("SELECT COUNT(*) FROM bankroll_ledger")
+        if cursor.fetchone()[0] == 0:
+            self._rebuild_ledger(cursor)
+
         conn.commit()
         conn.close()
 
-    def _load_bankroll(self) -> float:
-        """Load current bankroll from database"""
+    def _rebuild_ledger(self, cursor):
+        """Build the ledger aggregates from bankroll_history and bet_history (one-time migration)"""
+        cursor.execute("SELECT bankroll FROM bankroll_history ORDER BY created_at")
+        history = [row[0] for row in cursor.fetchall()]
+
+        balance = history[-1] if history else 0.0
+        peak = 0.0
+        max_drawdown = 0.0
+        for bankroll in history:
+            peak = max(peak, bankroll)
+            if peak > 0:
+                max_drawdown = max(max_drawdown, 1 - bankroll / peak)
+
+        cursor.execute("""
+            SELECT
+                COUNT(*),
+                SUM(CASE WHEN result = 'won' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN result = 'lost' THEN 1 ELSE 0 END),
+                SUM(bet_amount),
+                SUM(profit)
+            FROM bet_history
+            WHERE result IN ('won', 'lost')
+        """)
+        settled, wins, losses, staked, profit = cursor.fetchone()
+
+        cursor.execute("""
+            INSERT INTO bankroll_ledger
+            (id, balance, peak_balance, max_drawdown, settled_bets, wins, losses,
+             total_staked, total_profit, updated_at)
+            VALUES (1, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (balance, peak, max_drawdown, settled or 0, wins or 0, losses or 0,
+              staked or 0.0, profit or 0.0, datetime.now().isoformat()))
+
+        cursor.execute("DELETE FROM bankroll_ledger_daily")
+        cursor.execute("""
+            INSERT INTO bankroll_ledger_daily
+            (date, open_bets, open_exposure, wins, losses, profit)
+            SELECT
+                date,
+                SUM(CASE WHEN result = 'pending' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN result = 'pending' THEN bet_amount ELSE 0 END),
+                SUM(CASE WHEN result = 'won' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN result = 'lost' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN result IN ('won', 'lost') THEN profit ELSE 0 END)
+            FROM bet_history
+            GROUP BY date
+        """)
+
+        cursor.execute("DELETE FROM bankroll_ledger_legs")
+        cursor.execute("""
+            INSERT INTO bankroll_ledger_legs
+            (num_legs, bets, wins, losses, staked, profit)
+            SELECT
+                COALESCE(num_legs, CASE WHEN bet_type = 'single' THEN 1 ELSE 0 END) AS legs,
+                COUNT(*),
+                SUM(CASE WHEN result = 'won' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN result = 'lost' THEN 1 ELSE 0 END),
+                SUM(bet_amount),
+                SUM(profit)
+            FROM bet_history
+            WHERE result IN ('won', 'lost')
+            GROUP BY legs
+        """)
+
+        logger.info("Bankroll ledger rebuilt from bet history")
+
+    def _load_ledger(self):
+        """Load the ledger row, today's daily row and the per-leg rows into memory"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
+        today = datetime.now().strftime('%Y-%m-%d')
+
         cursor.execute("""
-            SELECT bankroll FROM bankroll_history
-            ORDER BY created_at DESC
-            LIMIT 1
+            SELECT balance, peak_balance, max_drawdown, settled_bets, wins, losses,
+                   total_staked, total_profit
+            FROM bankroll_ledger WHERE id = 1
         """)
+        row = cursor.fetchone()
+
+        cursor.execute("""
+            SELECT open_bets, open_exposure, wins, losses, profit
+            FROM bankroll_ledger_daily WHERE date = ?
+        """, (today,))
+        daily = cursor.fetchone() or (0, 0.0, 0, 0, 0.0)
+
+        cursor.execute("SELECT num_legs, bets, wins, losses, staked, profit FROM bankroll_ledger_legs")
+        legs = cursor.fetchall()
 
-        result = cursor.fetchone()
         conn.close()
 
-        return result[0] if result else 0.0
+        self.ledger = {
+            'balance': row[0],
+            'peak_balance': row[1],
+            'max_drawdown': row[2],
+            'settled_bets': row[3],
+            'wins': row[4],
+            'losses': row[5],
+            'total_staked': row[6],
+            'total_profit': row[7],
+            'date': today,
+            'open_bets': daily[0],
+            'open_exposure': daily[1],
+            'today_wins': daily[2],
+            'today_losses': daily[3],
+            'today_profit': daily[4],
+            'legs': {
+                num_legs: {'bets': bets, 'wins': wins, 'losses': losses,
+                           'staked': staked, 'profit': profit}
+                for num_legs, bets, wins, losses, staked, profit in legs
+            },
+        }
 
-    def _set_bankroll(self, amount: float):
-        """Set bankroll amount"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def refresh_ledger(self):
+        """Reload ledger aggregates (picks up bets recorded by other processes)"""
+        self._load_ledger()
+        self.current_bankroll = self.ledger['balance']
 
-        # Get previous bankroll
-        previous = self._load_bankroll()
+    def _write_balance(self, cursor, amount: float, reason: str):
+        """Record a new bankroll in bankroll_history and the ledger (caller commits)"""
+        cursor.execute("SELECT balance, peak_balance, max_drawdown FROM bankroll_ledger WHERE id = 1")
+        previous, peak, max_drawdown = cursor.fetchone()
 
-        # Calculate change
         change_amount = amount - previous if previous > 0 else 0
         change_pct = (change_amount / previous * 100) if previous > 0 else 0
 
-        # Record new bankroll
         cursor.execute("""
             INSERT INTO bankroll_history
             (date, bankroll, change_amount, change_pct, reason, created_at)
@@ -161,14 +316,72 @@ class BankrollManager:
             amount,
             change_amount,
             change_pct,
-            "Manual update" if previous > 0 else "Initial bankroll",
+            reason,
             datetime.now().isoformat()
         ))
 
-        conn.commit()
-        conn.close()
+        peak = max(peak, amount)
+        if peak > 0:
+            max_drawdown = max(max_drawdown, 1 - amount / peak)
+
+        cursor.execute("""
+            UPDATE bankroll_ledger
+            SET balance = ?, peak_balance = ?, max_drawdown = ?, updated_at = ?
+            WHERE id = 1
+        """, (amount, peak, max_drawdown, datetime.now().isoformat()))
+
+    def _apply_settlement(self, cursor, date: str, num_legs: int, bet_amount: float,
+                          result: str, profit: float):
+        """Add a settled bet to the daily, per-leg and all-time aggregates (caller commits)"""
+        won = 1 if result == 'won' else 0
+        lost = 1 - won
+
+        cursor.execute("""
+            INSERT INTO bankroll_ledger_daily (date, open_bets, open_exposure, wins, losses, profit)
+            VALUES (?, 0, 0, ?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET
+                wins = wins + excluded.wins,
+                losses = losses + excluded.losses,
+                profit = profit + excluded.profit
+        """, (date, won, lost, profit))
+
+        cursor.execute("""
+            INSERT INTO bankroll_ledger_legs (num_legs, bets, wins, losses, staked, profit)
+            VALUES (?, 1, ?, ?, ?, ?)
+            ON CONFLICT(num_legs) DO UPDATE SET
+                bets = bets + 1,
+                wins = wins + excluded.wins,
+                losses = losses + excluded.losses,
+                staked = staked + excluded.staked,
+                profit = profit + excluded.profit
+        """, (num_legs, won, lost, bet_amount, profit))
 
-        self.current_bankroll = amount
+        cursor.execute("""
+            UPDATE bankroll_ledger
+            SET settled_bets = settled_bets + 1,
+                wins = wins + ?,
+                losses = losses + ?,
+                total_staked = total_staked + ?,
+                total_profit = total_profit + ?
+            WHERE id = 1
+        """, (won, lost, bet_amount, profit))
+
+    def _set_bankroll(self, amount: float):
+        """Set bankroll amount"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            reason = "Manual update" if self.ledger['balance'] > 0 else "Initial bankroll"
+            self._write_balance(cursor, amount, reason)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        self.refresh_ledger()
 
     def get_kelly_bet_size(
         self,
@@ -285,22 +498,327 @@ class BankrollManager:
             'current_bankroll': self.current_bankroll
         }
 
-    def get_daily_risk_exposure(self) -> float:
-        """Get total amount at risk today (pending bets)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def get_portfolio_bet_sizes(
+        self,
+        parlay_legs: Sequence[Sequence[int]],
+        leg_probabilities: Sequence[float],
+        payout_multipliers: Sequence[float],
+        time_budget: float = 1.0,
+        n_samples: int = 20000,
+        bankroll: float = None,
+        kelly_fraction: float = None
+    ) -> Dict:
+        """
+        Size a whole slate of parlays jointly (simultaneous Kelly)
 
-        today = datetime.now().strftime('%Y-%m-%d')
+        Parlays sharing legs are sized together so their combined stake
+        respects max_bet_pct per bet and the remaining max_daily_risk_pct
+        budget for today.
 
-        cursor.execute("""
-            SELECT SUM(bet_amount) FROM bet_history
-            WHERE date = ? AND result = 'pending'
-        """, (today,))
+        Args:
+            parlay_legs: Pick indices per parlay
+            leg_probabilities: Win probability of every pick (0-1)
+            payout_multipliers: Payout multiplier per parlay
+            time_budget: Maximum seconds spent optimizing
+            n_samples: Monte Carlo scenarios of leg outcomes
+            bankroll: Bankroll to size against (defaults to current_bankroll)
+            kelly_fraction: Fraction of Kelly (defaults to self.kelly_fraction)
+
+        Returns:
+            Dictionary with:
+                - recommended_bets: Bet amount per parlay
+                - independent_bets: Per-parlay Kelly bets (same caps)
+                - expected_log_growth: Expected log growth of the slate
+                - daily_risk_used: Current daily risk exposure
+                - daily_risk_remaining: Remaining daily risk budget
+                - warnings: List of warning messages
+        """
+        from portfolio_kelly import PortfolioKellyAllocator
+
+        if bankroll is None:
+            bankroll = self.current_bankroll
+        if kelly_fraction is None:
+            kelly_fraction = self.kelly_fraction
 
-        result = cursor.fetchone()
+        warnings = []
+
+        daily_risk_used = self.get_daily_risk_exposure()
+        max_daily_risk = bankroll * self.max_daily_risk_pct
+        daily_risk_remaining = max(0.0, max_daily_risk - daily_risk_used)
+
+        if daily_risk_remaining <= 0:
+            warnings.append(
+                f"Daily risk limit reached (${max_daily_risk:.2f}). No bets recommended."
+            )
+
+        allocator = PortfolioKellyAllocator(n_samples=n_samples, time_budget=time_budget)
+        allocation = allocator.allocate(
+            parlay_legs,
+            leg_probabilities,
+            payout_multipliers,
+            max_total_fraction=daily_risk_remaining / bankroll if bankroll > 0 else 0.0,
+            max_bet_fraction=self.max_bet_pct,
+            kelly_fraction=kelly_fraction
+        )
+
+        if not allocation['converged']:
+            warnings.append(
+                f"Portfolio sizing stopped at the {time_budget:.1f}s time budget "
+                f"after {allocation['iterations']} iterations."
+            )
+
+        return {
+            'recommended_bets': allocation['fractions'] * bankroll,
+            'independent_bets': allocation['independent_fractions'] * bankroll,
+            'expected_log_growth': allocation['expected_log_growth'],
+            'daily_risk_used': daily_risk_used,
+            'daily_risk_remaining': daily_risk_remaining,
+            'warnings': warnings,
+            'kelly_fraction': kelly_fraction,
+            'current_bankroll': bankroll
+        }
+
+    def slate_fractions(
+        self,
+        parlay_legs: Sequence[Sequence[int]],
+        leg_probabilities: Sequence[float],
+        payout_multipliers: Sequence[float],
+        kelly_fraction: float,
+        max_bet_pct: float = None,
+        sizing: str = 'independent'
+    ) -> np.ndarray:
+        """
+        Stake per parlay as a fraction of bankroll, with the risk limits applied
+
+        Args:
+            parlay_legs: Pick indices per parlay
+            leg_probabilities: Win probability of every pick (0-1)
+            payout_multipliers: Payout multiplier per parlay
+            kelly_fraction: Fraction of Kelly to bet
+            max_bet_pct: Maximum bet as % of bankroll (defaults to self.max_bet_pct)
+            sizing: 'independent' (Kelly per parlay, scaled down to the daily
+                limit) or 'portfolio' (simultaneous Kelly)
+
+        Returns:
+            Array of stake fractions, one per parlay
+        """
+        from portfolio_kelly import PortfolioKellyAllocator, leg_matrix
+
+        if max_bet_pct is None:
+            max_bet_pct = self.max_bet_pct
+
+        if sizing == 'portfolio':
+            allocation = PortfolioKellyAllocator(time_budget=0.5).allocate(
+                parlay_legs, leg_probabilities, payout_multipliers,
+                max_total_fraction=self.max_daily_risk_pct,
+                max_bet_fraction=max_bet_pct,
+                kelly_fraction=kelly_fraction
+            )
+            return allocation['fractions']
+
+        if sizing != 'independent':
+            raise ValueError(f"Unknown sizing: {sizing}")
+
+        legs = leg_matrix(parlay_legs)
+        probabilities = np.asarray(leg_probabilities, dtype=np.float64)
+        payouts = np.asarray(payout_multipliers, dtype=np.float64)
+
+        # Same formula as get_kelly_bet_size: edge / (payout - 1)
+        win_probability = np.prod(np.where(legs < 0, 1.0, probabilities[np.maximum(legs, 0)]), axis=1)
+        kelly = np.maximum(0.0, (win_probability * payouts - 1) / (payouts - 1))
+        fractions = np.minimum(kelly * kelly_fraction, max_bet_pct)
+
+        total = fractions.sum()
+        if total > self.max_daily_risk_pct:
+            fractions *= self.max_daily_risk_pct / total
+
+        return fractions
+
+    def simulate_seasons(
+        self,
+        parlay_legs: Sequence[Sequence[int]],
+        leg_probabilities: Sequence[float],
+        payout_multipliers: Sequence[float],
+        kelly_fractions: Sequence[float] = (0.10, 0.25, 0.50, 1.00),
+        max_bet_pct: float = None,
+        n_seasons: int = 100000,
+        n_days: int = 1,
+        ruin_pct: float = 0.50,
+        starting_bankroll: float = None,
+        sizing: str = 'independent',
+        seed: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Monte Carlo replay of a parlay slate over many simulated seasons
+
+        Every day of every season draws fresh leg outcomes (Bernoulli on the
+        leg probabilities), so parlays sharing a leg win and lose together.
+        Stakes are re-sized each day as a fraction of the current bankroll.
+        All Kelly fractions are evaluated on the same draws.
+
+        Args:
+            parlay_legs: Pick indices per parlay (one day's slate)
+            leg_probabilities: Win probability of every pick (0-1)
+            payout_multipliers: Payout multiplier per parlay
+            kelly_fractions: Kelly fractions to compare
+            max_bet_pct: Maximum bet as % of bankroll (defaults to self.max_bet_pct)
+            n_seasons: Number of simulated seasons
+            n_days: Days per season (the slate is replayed once per day)
+            ruin_pct: A season is ruined once bankroll falls below this
+                fraction of the starting bankroll
+            starting_bankroll: Starting bankroll (defaults to current bankroll)
+            sizing: 'independent' or 'portfolio' (see slate_fractions)
+            seed: Random seed
+
+        Returns:
+            DataFrame with one row per Kelly fraction:
+                - kelly_fraction, daily_risk_pct
+                - mean_bankroll, p5/p25/p50/p75/p95_bankroll (final)
+                - prob_profit, prob_ruin
+                - p50/p95/p99_drawdown (maximum drawdown from peak)
+        """
+        start = time.perf_counter()
+
+        if starting_bankroll is None:
+            starting_bankroll = self.current_bankroll
+
+        from portfolio_kelly import leg_matrix
+
+        legs = leg_matrix(parlay_legs)
+        probabilities = np.asarray(leg_probabilities, dtype=np.float32)
+        payouts = np.asarray(payout_multipliers, dtype=np.float32)
+        n_legs = len(probabilities)
+
+        # Leg -> parlay incidence: a parlay wins when none of its legs miss
+        incidence = np.zeros((n_legs, len(payouts)), dtype=np.float32)
+        for parlay, row in enumerate(legs):
+            incidence[row[row >= 0], parlay] = 1.0
+
+        fractions = np.column_stack([
+            self.slate_fractions(legs, leg_probabilities, payout_multipliers,
+                                 kelly_fraction, max_bet_pct, sizing)
+            for kelly_fraction in kelly_fractions
+        ]).astype(np.float32)
+
+        rng = np.random.default_rng(seed)
+        shape = (n_seasons, len(kelly_fractions))
+        bankroll = np.ones(shape, dtype=np.float64)
+        peak = np.ones(shape, dtype=np.float64)
+        max_drawdown = np.zeros(shape, dtype=np.float64)
+        ruined = np.zeros(shape, dtype=bool)
+
+        # 16-bit draws against integer thresholds (probability resolution 1/65536)
+        thresholds = np.round(probabilities * 65536).astype(np.uint32)
+        win_returns = fractions * payouts[:, None]
+        stake_total = fractions.sum(axis=0)
+
+        for _ in range(n_days):
+            misses = rng.integers(0, 65536, size=(n_seasons, n_legs), dtype=np.uint16) >= thresholds
+            wins = (misses.astype(np.float32) @ incidence) == 0
+
+            bankroll *= 1.0 - stake_total + wins.astype(np.float32) @ win_returns
+            np.maximum(peak, bankroll, out=peak)
+            np.maximum(max_drawdown, 1.0 - bankroll / peak, out=max_drawdown)
+            ruined |= bankroll < ruin_pct
+
+        rows = []
+        for k, kelly_fraction in enumerate(kelly_fractions):
+            final = bankroll[:, k] * starting_bankroll
+            bankroll_pcts = np.percentile(final, [5, 25, 50, 75, 95])
+            drawdown_pcts = np.percentile(max_drawdown[:, k], [50, 95, 99])
+            rows.append({
+                'kelly_fraction': kelly_fraction,
+                'daily_risk_pct': float(fractions[:, k].sum()),
+                'mean_bankroll': float(final.mean()),
+                'p5_bankroll': bankroll_pcts[0],
+                'p25_bankroll': bankroll_pcts[1],
+                'p50_bankroll': bankroll_pcts[2],
+                'p75_bankroll': bankroll_pcts[3],
+                'p95_bankroll': bankroll_pcts[4],
+                'prob_profit': float((final > starting_bankroll).mean()),
+                'prob_ruin': float(ruined[:, k].mean()),
+                'p50_drawdown': drawdown_pcts[0],
+                'p95_drawdown': drawdown_pcts[1],
+                'p99_drawdown': drawdown_pcts[2],
+            })
+
+        logger.info(
+            f"Simulated {n_seasons:,} seasons x {n_days} days in "
+            f"{time.perf_counter() - start:.2f}s"
+        )
+
+        return pd.DataFrame(rows)
+
+    def print_simulation(self, results: pd.DataFrame):
+        """Print simulate_seasons() results"""
+        print("="*80)
+        print("BANKROLL SIMULATION")
+        print("="*80)
+        print(f"{'Kelly':>6} {'Risk/Day':>9} {'Median':>10} {'5th %':>10} {'95th %':>10} "
+              f"{'P(Profit)':>10} {'P(Ruin)':>8} {'DD 95%':>7}")
+        for _, row in results.iterrows():
+            print(f"{row['kelly_fraction']:>6.2f} {row['daily_risk_pct']:>9.1%} "
+                  f"${row['p50_bankroll']:>9,.0f} ${row['p5_bankroll']:>9,.0f} "
+                  f"${row['p95_bankroll']:>9,.0f} {row['prob_profit']:>10.1%} "
+                  f"{row['prob_ruin']:>8.1%} {row['p95_drawdown']:>7.1%}")
+        print("="*80)
+
+    def load_slate(self, date: str = None) -> Tuple[list, list, list]:
+        """
+        Load a day's saved GTO parlays as a slate for simulate_seasons()
+
+        Legs are matched across parlays by player, prop and line so shared
+        legs stay shared. Parlays saved without per-leg probabilities fall
+        back to the geometric mean of the combined probability.
+
+        Args:
+            date: Date (YYYY-MM-DD), defaults to today
+
+        Returns:
+            (parlay_legs, leg_probabilities, payout_multipliers)
+        """
+        if date is None:
+            date = datetime.now().strftime('%Y-%m-%d')
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                SELECT picks_json, combined_probability, payout_multiplier
+                FROM gto_parlays
+                WHERE date = ?
+            """, (date,))
+            rows = cursor.fetchall()
+        except sqlite3.OperationalError:
+            rows = []
         conn.close()
 
-        return result[0] if result[0] else 0.0
+        leg_index = {}
+        leg_probabilities = []
+        parlay_legs = []
+        payout_multipliers = []
+
+        for picks_json, combined_probability, payout_multiplier in rows:
+            picks = json.loads(picks_json)
+            fallback = combined_probability ** (1 / len(picks))
+            legs = []
+            for pick in picks:
+                key = (pick['player_name'], pick['prop_type'], pick['line'])
+                if key not in leg_index:
+                    leg_index[key] = len(leg_probabilities)
+                    leg_probabilities.append(pick.get('probability', fallback))
+                legs.append(leg_index[key])
+            parlay_legs.append(tuple(legs))
+            payout_multipliers.append(payout_multiplier)
+
+        return parlay_legs, leg_probabilities, payout_multipliers
+
+    def get_daily_risk_exposure(self) -> float:
+        """Get total amount at risk today (pending bets), from the in-memory ledger"""
+        if self.ledger['date'] != datetime.now().strftime('%Y-%m-%d'):
+            self._load_ledger()
+        return self.ledger['open_exposure']
 
     def record_bet(
         self,
@@ -311,8 +829,9 @@ class BankrollManager:
         payout_multiplier: float,
         expected_value: float,
         result: str = 'pending',
-        payout: float = 0.0
-    ):
+        payout: float = 0.0,
+        num_legs: int = None
+    ) -> int:
         """
         Record a bet in the database
 
@@ -325,103 +844,177 @@ class BankrollManager:
             expected_value: Expected value
             result: 'pending', 'won', or 'lost'
             payout: Payout amount (if result is 'won')
+            num_legs: Number of legs (defaults to 1 for singles, 0 = unknown)
+
+        Returns:
+            Bet ID (for grade_bet)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if num_legs is None:
+            num_legs = 1 if bet_type == 'single' else 0
 
+        date = datetime.now().strftime('%Y-%m-%d')
         profit = payout - bet_amount if result == 'won' else (-bet_amount if result == 'lost' else 0)
-        bankroll_before = self.current_bankroll
-        bankroll_after = self.current_bankroll + profit
 
-        cursor.execute("""
-            INSERT INTO bet_history
-            (date, bet_type, bet_description, bet_amount, probability,
-             payout_multiplier, expected_value, result, payout, profit,
-             bankroll_before, bankroll_after, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            datetime.now().strftime('%Y-%m-%d'),
-            bet_type,
-            bet_description,
-            bet_amount,
-            probability,
-            payout_multiplier,
-            expected_value,
-            result,
-            payout,
-            profit,
-            bankroll_before,
-            bankroll_after,
-            datetime.now().isoformat()
-        ))
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
 
-        conn.commit()
-        conn.close()
+        try:
+            cursor.execute("SELECT balance FROM bankroll_ledger WHERE id = 1")
+            bankroll_before = cursor.fetchone()[0]
+            bankroll_after = bankroll_before + profit
+
+            cursor.execute("""
+                INSERT INTO bet_history
+                (date, bet_type, bet_description, bet_amount, probability,
+                 payout_multiplier, expected_value, result, payout, profit,
+                 bankroll_before, bankroll_after, created_at, num_legs)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                date,
+                bet_type,
+                bet_description,
+                bet_amount,
+                probability,
+                payout_multiplier,
+                expected_value,
+                result,
+                payout,
+                profit,
+                bankroll_before,
+                bankroll_after,
+                datetime.now().isoformat(),
+                num_legs
+            ))
+            bet_id = cursor.lastrowid
+
+            if result in ['won', 'lost']:
+                self._apply_settlement(cursor, date, num_legs, bet_amount, result, profit)
+                self._write_balance(cursor, bankroll_after, f"Bet {bet_id} {result}")
+            else:
+                cursor.execute("""
+                    INSERT INTO bankroll_ledger_daily (date, open_bets, open_exposure, wins, losses, profit)
+                    VALUES (?, 1, ?, 0, 0, 0)
+                    ON CONFLICT(date) DO UPDATE SET
+                        open_bets = open_bets + 1,
+                        open_exposure = open_exposure + excluded.open_exposure
+                """, (date, bet_amount))
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        self.refresh_ledger()
 
-        # Update current bankroll if bet is settled
         if result in ['won', 'lost']:
-            self._set_bankroll(bankroll_after)
             logger.info(f"Bet recorded: {result.upper()} - Profit: ${profit:+.2f}")
 
-    def get_status(self) -> Dict:
-        """Get current bankroll status"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return bet_id
 
-        # Get stats
-        today = datetime.now().strftime('%Y-%m-%d')
+    def grade_bet(self, bet_id: int, result: str, payout: float = 0.0) -> float:
+        """
+        Settle a pending bet and update the bankroll
 
-        # Pending bets today
-        cursor.execute("""
-            SELECT COUNT(*), SUM(bet_amount)
-            FROM bet_history
-            WHERE date = ? AND result = 'pending'
-        """, (today,))
-        pending_result = cursor.fetchone()
-        pending_bets = pending_result[0] if pending_result[0] else 0
-        pending_amount = pending_result[1] if pending_result[1] else 0
+        Args:
+            bet_id: ID returned by record_bet
+            result: 'won' or 'lost'
+            payout: Payout amount (if result is 'won')
 
-        # Settled bets today
-        cursor.execute("""
-            SELECT
-                SUM(CASE WHEN result = 'won' THEN 1 ELSE 0 END) as wins,
-                SUM(CASE WHEN result = 'lost' THEN 1 ELSE 0 END) as losses,
-                SUM(profit) as total_profit
-            FROM bet_history
-            WHERE date = ? AND result IN ('won', 'lost')
-        """, (today,))
-        settled_result = cursor.fetchone()
-        wins = settled_result[0] if settled_result[0] else 0
-        losses = settled_result[1] if settled_result[1] else 0
-        daily_profit = settled_result[2] if settled_result[2] else 0
+        Returns:
+            Profit of the bet
+        """
+        if result not in ('won', 'lost'):
+            raise ValueError(f"Invalid result: {result}")
 
-        # All-time stats
-        cursor.execute("""
-            SELECT
-                COUNT(*) as total_bets,
-                SUM(CASE WHEN result = 'won' THEN 1 ELSE 0 END) as total_wins,
-                SUM(CASE WHEN result = 'lost' THEN 1 ELSE 0 END) as total_losses,
-                SUM(profit) as total_profit
-            FROM bet_history
-            WHERE result IN ('won', 'lost')
-        """)
-        all_time = cursor.fetchone()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
 
-        conn.close()
+        try:
+            cursor.execute("""
+                SELECT date, bet_type, bet_amount, result, num_legs
+                FROM bet_history WHERE id = ?
+            """, (bet_id,))
+            row = cursor.fetchone()
+            if row is None:
+                raise ValueError(f"Bet {bet_id} not found")
+
+            date, bet_type, bet_amount, previous_result, num_legs = row
+            if previous_result != 'pending':
+                raise ValueError(f"Bet {bet_id} already graded ({previous_result})")
+            if num_legs is None:
+                num_legs = 1 if bet_type == 'single' else 0
+
+            profit = payout - bet_amount if result == 'won' else -bet_amount
+            cursor.execute("SELECT balance FROM bankroll_ledger WHERE id = 1")
+            bankroll_before = cursor.fetchone()[0]
+            bankroll_after = bankroll_before + profit
+
+            cursor.execute("""
+                UPDATE bet_history
+                SET result = ?, payout = ?, profit = ?, bankroll_before = ?, bankroll_after = ?
+                WHERE id = ?
+            """, (result, payout, profit, bankroll_before, bankroll_after, bet_id))
+
+            cursor.execute("""
+                UPDATE bankroll_ledger_daily
+                SET open_bets = open_bets - 1, open_exposure = open_exposure - ?
+                WHERE date = ?
+            """, (bet_amount, date))
+
+            self._apply_settlement(cursor, date, num_legs, bet_amount, result, profit)
+            self._write_balance(cursor, bankroll_after, f"Bet {bet_id} {result}")
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        self.refresh_ledger()
+        logger.info(f"Bet {bet_id} graded: {result.upper()} - Profit: ${profit:+.2f}")
+
+        return profit
+
+    def get_status(self) -> Dict:
+        """Get current bankroll status (O(1) reads from the ledger)"""
+        self.refresh_ledger()
+        ledger = self.ledger
+
+        balance = ledger['balance']
+        peak = ledger['peak_balance']
+
+        roi_by_legs = {
+            num_legs: {
+                'bets': legs['bets'],
+                'wins': legs['wins'],
+                'losses': legs['losses'],
+                'staked': legs['staked'],
+                'profit': legs['profit'],
+                'roi': (legs['profit'] / legs['staked'] * 100) if legs['staked'] > 0 else 0
+            }
+            for num_legs, legs in sorted(ledger['legs'].items())
+        }
 
         return {
             'current_bankroll': self.current_bankroll,
-            'daily_profit': daily_profit,
-            'pending_bets': pending_bets,
-            'pending_amount': pending_amount,
-            'today_wins': wins,
-            'today_losses': losses,
-            'all_time_bets': all_time[0] if all_time[0] else 0,
-            'all_time_wins': all_time[1] if all_time[1] else 0,
-            'all_time_losses': all_time[2] if all_time[2] else 0,
-            'all_time_profit': all_time[3] if all_time[3] else 0,
-            'win_rate': (all_time[1] / all_time[0] * 100) if all_time[0] > 0 else 0,
-            'roi': (all_time[3] / self.current_bankroll * 100) if self.current_bankroll > 0 else 0
+            'daily_profit': ledger['today_profit'],
+            'pending_bets': ledger['open_bets'],
+            'pending_amount': ledger['open_exposure'],
+            'today_wins': ledger['today_wins'],
+            'today_losses': ledger['today_losses'],
+            'all_time_bets': ledger['settled_bets'],
+            'all_time_wins': ledger['wins'],
+            'all_time_losses': ledger['losses'],
+            'all_time_profit': ledger['total_profit'],
+            'win_rate': (ledger['wins'] / ledger['settled_bets'] * 100) if ledger['settled_bets'] > 0 else 0,
+            'roi': (ledger['total_profit'] / self.current_bankroll * 100) if self.current_bankroll > 0 else 0,
+            'roi_by_legs': roi_by_legs,
+            'peak_bankroll': peak,
+            'current_drawdown': (1 - balance / peak) if peak > 0 else 0,
+            'max_drawdown': ledger['max_drawdown']
         }
 
     def print_status(self):
@@ -444,6 +1037,15 @@ class BankrollManager:
         print(f"  Win Rate: {status['win_rate']:.1f}%")
         print(f"  Total Profit: ${status['all_time_profit']:+,.2f}")
         print(f"  ROI: {status['roi']:+.1f}%")
+        print(f"  Peak: ${status['peak_bankroll']:,.2f} "
+              f"(drawdown {status['current_drawdown']:.1%}, max {status['max_drawdown']:.1%})")
+        if status['roi_by_legs']:
+            print()
+            print("ROI BY LEG COUNT:")
+            for num_legs, legs in status['roi_by_legs'].items():
+                label = f"{num_legs}-leg" if num_legs else "unknown"
+                print(f"  {label:8} {legs['wins']}W - {legs['losses']}L  "
+                      f"${legs['profit']:+,.2f} on ${legs['staked']:,.2f} ({legs['roi']:+.1f}%)")
         print("="*60)
 
 
@@ -487,6 +1089,40 @@ if __name__ == "__main__":
 
     print()
 
+    # Size overlapping parlays jointly
+    print("[TEST 3] Portfolio sizing: 4 parlays sharing one 75% leg, 5x payout")
+    portfolio = manager.get_portfolio_bet_sizes(
+        parlay_legs=[(0, 1, 2), (0, 3, 4), (0, 5, 6), (0, 7, 8)],
+        leg_probabilities=[0.75, 0.70, 0.68, 0.72, 0.66, 0.71, 0.69, 0.70, 0.67],
+        payout_multipliers=[5.0, 5.0, 5.0, 5.0]
+    )
+
+    print(f"  Independent: {', '.join(f'${bet:.2f}' for bet in portfolio['independent_bets'])}")
+    print(f"  Portfolio:   {', '.join(f'${bet:.2f}' for bet in portfolio['recommended_bets'])}")
+    print(f"  Daily risk remaining: ${portfolio['daily_risk_remaining']:.2f}")
+    if portfolio['warnings']:
+        for warning in portfolio['warnings']:
+            print(f"  WARNING: {warning}")
+
+    print()
+
+    # Record a pending parlay, then grade it
+    print("[TEST 4] Record a $20 3-leg parlay (pending), then grade it (lost)")
+    bet_id = manager.record_bet(
+        bet_amount=20,
+        bet_type='parlay',
+        bet_description='3-leg GTO parlay',
+        probability=0.35,
+        payout_multiplier=5.0,
+        expected_value=0.75,
+        num_legs=3
+    )
+    print(f"  Daily risk after recording: ${manager.get_daily_risk_exposure():.2f}")
+    manager.grade_bet(bet_id, 'lost')
+    print(f"  Daily risk after grading: ${manager.get_daily_risk_exposure():.2f}")
+
+    print()
+
     # Print status
     manager.print_status()
 
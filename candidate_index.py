@@ -0,0 +1,440 @@
+"""
+Persistent Parlay Candidate Index
+
+Keeps the optimizer's scored top candidates per date, together with the
+slate of legs they were scored on. Intraday reruns diff the new
+prizepicks_edges picks against that snapshot and only rescore combos
+touching added or changed legs; combos built purely from unchanged legs
+are reused from the index.
+
+The index for each parlay size stores more rows than the selection pool
+(INDEX_DEPTH x) plus an upper bound on the EV of every profitable combo
+it does NOT hold. Reused + rescored rows above that bound are exactly
+the slate's best parlays, so the incremental pool matches a full rebuild;
+when too few rows clear the bound the size is rebuilt from scratch.
+
+Usage:
+    from candidate_index import CandidateIndex
+
+    index = CandidateIndex.load(date, picks_df, min_parlay_ev, min_profitable_ev)
+    result = index.top_k(engine, 3, 150, min_parlay_ev, 'branch_and_bound', full_search)
+    index.save()
+"""
+
+import json
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from parlay_engine import ParlayCandidateEngine, SCORE_KEYS, merge_top_k
+
+DB_PATH = "database/nhl_predictions.db"
+
+# Columns identifying a leg across runs (a moved line is a new leg)
+LEG_KEY_COLUMNS = ['player_name', 'prop_type', 'line', 'odds_type']
+
+# Columns that change how a leg scores or which legs it conflicts with
+LEG_VALUE_COLUMNS = ['model_probability', 'game_id', 'team']
+
+# Index rows kept per parlay size, as a multiple of the selection pool
+INDEX_DEPTH = 2
+
+# EVs within this of the bound are not trusted (float rounding between
+# different leg orders)
+EV_TOLERANCE = 1e-9
+
+
+def leg_snapshot(picks_df: pd.DataFrame) -> List[List]:
+    """
+    One [key, values] entry per pick row, in picks_df order.
+
+    Keys carry an occurrence counter so duplicate rows stay distinct.
+    """
+    seen = {}
+    legs = []
+    for row in picks_df[LEG_KEY_COLUMNS + LEG_VALUE_COLUMNS].itertuples(index=False):
+        base = (str(row.player_name), str(row.prop_type), float(row.line), str(row.odds_type))
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        legs.append([list(base) + [occurrence],
+                     [float(row.model_probability), str(row.game_id), str(row.team)]])
+    return legs
+
+
+def diff_slates(old_legs: List[List], new_legs: List[List]) -> Dict:
+    """
+    Compare two leg snapshots.
+
+    Returns:
+        Dict with old_to_new (old index -> new index, -1 if the leg was
+        removed or changed), affected (new indices of added or changed
+        legs) and added/removed/changed/unchanged counts
+    """
+    old_positions = {tuple(key): i for i, (key, _) in enumerate(old_legs)}
+    old_to_new = np.full(len(old_legs), -1, dtype=np.int64)
+    affected = []
+    added = changed = 0
+
+    for new_index, (key, values) in enumerate(new_legs):
+        old_index = old_positions.get(tuple(key))
+        if old_index is None:
+            added += 1
+            affected.append(new_index)
+        elif old_legs[old_index][1] != values:
+            changed += 1
+            affected.append(new_index)
+        else:
+            old_to_new[old_index] = new_index
+
+    unchanged = int((old_to_new >= 0).sum())
+    return {
+        'old_to_new': old_to_new,
+        'affected': np.array(affected, dtype=np.int64),
+        'added': added,
+        'removed': len(old_legs) - unchanged - changed,
+        'changed': changed,
+        'unchanged': unchanged,
+    }
+
+
+def affected_top_k(engine: ParlayCandidateEngine,
+                   num_legs: int,
+                   top_k: int,
+                   min_parlay_ev: float,
+                   affected: np.ndarray,
+                   search_mode: str,
+                   reused: Dict) -> List[Dict]:
+    """
+    Best top_k combos that contain at least one affected leg, merged with
+    the reused (unchanged) combos.
+
+    Branch-and-bound searches with the affected legs required, its top K
+    seeded with the reused combos so pruning starts from their floor.
+    Exhaustive mode reorders the slate so the affected legs come first;
+    every combo containing one then starts at one of them, so streaming
+    just those first legs covers exactly the affected combos.
+
+    Returns:
+        Result dicts to merge (each carries 'processed'); when the first
+        one holds top_k rows, combos it left out score at most its last EV
+    """
+    if search_mode == 'branch_and_bound':
+        return [engine.search_top_k(num_legs, top_k, min_parlay_ev,
+                                    required_legs=affected, seed=reused)]
+
+    rest = np.setdiff1d(np.arange(engine.n_picks), affected)
+    order = np.concatenate((affected, rest))
+    reordered = ParlayCandidateEngine.from_arrays(
+        engine.probabilities[order],
+        engine.odds_codes[order],
+        engine.conflicts.conflicts[np.ix_(order, order)],
+        engine.min_profitable_ev
+    )
+    result = reordered.stream_top_k(num_legs, top_k, min_parlay_ev,
+                                    first_legs=range(len(affected)))
+
+    # Back to slate indices, rescored in canonical leg order
+    picks = np.sort(order[result['picks']], axis=1).astype(np.int32)
+    scores = engine.score_block(picks, check_correlation=False)
+    rescored = {'picks': picks}
+    rescored.update({key: scores[key] for key in SCORE_KEYS})
+    rescored['processed'] = result['processed']
+    return [rescored, reused]
+
+
+class CandidateIndex:
+    """
+    Scored candidate index for one date.
+
+    Loaded once per optimizer run: holds the previous run's snapshot and
+    index rows, the diff against the current picks, and the rows built
+    this run (written back by save()).
+    """
+
+    def __init__(self, date: str, picks_df: pd.DataFrame,
+                 min_parlay_ev: float, min_profitable_ev: float,
+                 db_path: str = DB_PATH):
+        """
+        Args:
+            date: Slate date (YYYY-MM-DD)
+            picks_df: Current picks (row order = engine indices)
+            min_parlay_ev: Parlay EV floor used for the pools
+            min_profitable_ev: Optimizer profitability margin
+            db_path: SQLite database path
+        """
+        self.date = date
+        self.db_path = db_path
+        self.params = {'min_parlay_ev': float(min_parlay_ev),
+                       'min_profitable_ev': float(min_profitable_ev)}
+        self.legs = leg_snapshot(picks_df)
+
+        # Previous run (filled by load)
+        self.previous_entries = {}
+        self.diff = None
+
+        # This run: num_legs -> {'picks', 'omitted_ev'}
+        self.entries = {}
+        self.stats = {'reused': 0, 'rescored': 0, 'rebuilt_sizes': [], 'incremental_sizes': []}
+
+    @classmethod
+    def load(cls, date: str, picks_df: pd.DataFrame,
+             min_parlay_ev: float, min_profitable_ev: float,
+             db_path: str = DB_PATH) -> 'CandidateIndex':
+        """
+        Load the stored index for date and diff it against picks_df.
+
+        A missing index, or one built with different EV thresholds, leaves
+        the index empty (every size is built from scratch).
+        """
+        index = cls(date, picks_df, min_parlay_ev, min_profitable_ev, db_path)
+
+        conn = sqlite3.connect(db_path)
+        create_candidate_index_tables(conn)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            "SELECT legs_json, params_json FROM gto_candidate_snapshots WHERE date = ?",
+            (date,)
+        )
+        snapshot = cursor.fetchone()
+
+        if snapshot is not None and json.loads(snapshot[1]) == index.params:
+            old_legs = json.loads(snapshot[0])
+            index.diff = diff_slates(old_legs, index.legs)
+
+            cursor.execute(
+                "SELECT num_legs, omitted_ev, picks FROM gto_candidate_index WHERE date = ?",
+                (date,)
+            )
+            for num_legs, omitted_ev, blob in cursor.fetchall():
+                picks = np.frombuffer(blob, dtype=np.int16).reshape(-1, num_legs)
+                index.previous_entries[num_legs] = {
+                    'picks': picks,
+                    'omitted_ev': -np.inf if omitted_ev is None else omitted_ev,
+                }
+
+        conn.close()
+        return index
+
+    def save(self):
+        """Persist this run's snapshot and index rows for the date."""
+        conn = sqlite3.connect(self.db_path)
+        create_candidate_index_tables(conn)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            INSERT OR REPLACE INTO gto_candidate_snapshots
+            (date, legs_json, params_json, created_at)
+            VALUES (?, ?, ?, ?)
+        """, (self.date, json.dumps(self.legs), json.dumps(self.params),
+              datetime.now().isoformat()))
+
+        cursor.execute("DELETE FROM gto_candidate_index WHERE date = ?", (self.date,))
+        for num_legs, entry in self.entries.items():
+            omitted_ev = entry['omitted_ev']
+            cursor.execute("""
+                INSERT INTO gto_candidate_index
+                (date, num_legs, omitted_ev, num_rows, picks, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (self.date, num_legs,
+                  None if np.isneginf(omitted_ev) else float(omitted_ev),
+                  len(entry['picks']),
+                  np.ascontiguousarray(entry['picks'], dtype=np.int16).tobytes(),
+                  datetime.now().isoformat()))
+
+        conn.commit()
+        conn.close()
+
+    def top_k(self,
+              engine: ParlayCandidateEngine,
+              num_legs: int,
+              pool_size: int,
+              min_parlay_ev: float,
+              search_mode: str,
+              full_search: Callable[[int], Dict]) -> Dict:
+        """
+        Best pool_size parlays of num_legs, reusing the stored index when possible.
+
+        Args:
+            engine: Engine for the current picks
+            num_legs: Parlay size
+            pool_size: Parlays to return
+            min_parlay_ev: Parlay EV floor
+            search_mode: 'exhaustive' or 'branch_and_bound' (for rescoring)
+            full_search: Called with a top_k to rebuild this size from scratch
+
+        Returns:
+            Engine result layout for the pool, plus 'incremental' (bool),
+            'reused' (index rows kept) and 'rescored' (combos scored)
+        """
+        start = time.perf_counter()
+        depth = pool_size * INDEX_DEPTH
+        previous = self.previous_entries.get(num_legs)
+
+        if previous is not None and self.diff is not None:
+            result = self._update(engine, num_legs, pool_size, depth, min_parlay_ev,
+                                  search_mode, previous)
+            if result is not None:
+                result['seconds'] = time.perf_counter() - start
+                self.stats['incremental_sizes'].append(num_legs)
+                self.stats['reused'] += result['reused']
+                self.stats['rescored'] += result['rescored']
+                return result
+
+        result = full_search(depth)
+        omitted_ev = result['ev'][-1] if len(result['ev']) >= depth else -np.inf
+        self.entries[num_legs] = {'picks': result['picks'], 'omitted_ev': float(omitted_ev)}
+
+        pool = {key: result[key][:pool_size] for key in ('picks',) + SCORE_KEYS}
+        pool.update({key: result.get(key) for key in ('processed', 'uncorrelated', 'profitable',
+                                                      'peak_rss_mb', 'combos_per_sec')})
+        pool['seconds'] = time.perf_counter() - start
+        pool['incremental'] = False
+        pool['reused'] = 0
+        pool['rescored'] = result['processed']
+        self.stats['rebuilt_sizes'].append(num_legs)
+        self.stats['rescored'] += result['processed']
+        return pool
+
+    def _update(self, engine, num_legs, pool_size, depth, min_parlay_ev,
+                search_mode, previous) -> Optional[Dict]:
+        """Incremental pool from the previous index, or None if it cannot be certified."""
+        old_to_new = self.diff['old_to_new']
+        affected = self.diff['affected']
+
+        # Stored rows made only of unchanged legs keep their scores
+        mapped = old_to_new[previous['picks'].astype(np.int64)]
+        kept = np.sort(mapped[(mapped >= 0).all(axis=1)], axis=1).astype(np.int32)
+        scores = engine.score_block(kept, check_correlation=False)
+        reusable = scores['is_profitable'] & (scores['ev'] >= min_parlay_ev)
+        reused = {'picks': kept[reusable]}
+        reused.update({key: scores[key][reusable] for key in SCORE_KEYS})
+
+        # Any unchanged combo the index did not hold scores at most this
+        omitted_ev = previous['omitted_ev']
+        sources = [reused]
+        rescored = 0
+
+        if len(affected):
+            sources = affected_top_k(engine, num_legs, depth, min_parlay_ev,
+                                     affected, search_mode, reused)
+            rescored = sources[0]['processed']
+            if len(sources[0]['ev']) >= depth:
+                omitted_ev = max(omitted_ev, float(sources[0]['ev'][-1]))
+
+        merged = merge_top_k(sources, depth + 1, num_legs)
+        if len(merged['ev']) > depth:
+            omitted_ev = max(omitted_ev, float(merged['ev'][depth]))
+
+        certified = merged['ev'] > omitted_ev + EV_TOLERANCE
+        if np.isneginf(omitted_ev):
+            certified[:] = True
+        certified[depth:] = False
+        if certified.sum() < pool_size and not np.isneginf(omitted_ev):
+            return None
+
+        rows = np.flatnonzero(certified)
+        # Rows inside the tolerance band were dropped, so the bound covers them too
+        stored_bound = omitted_ev if np.isneginf(omitted_ev) else omitted_ev + EV_TOLERANCE
+        self.entries[num_legs] = {'picks': merged['picks'][rows], 'omitted_ev': stored_bound}
+
+        result = {key: merged[key][rows[:pool_size]] for key in ('picks',) + SCORE_KEYS}
+        result['processed'] = rescored
+        result['uncorrelated'] = None
+        result['profitable'] = None
+        result['incremental'] = True
+        result['reused'] = len(reused['picks'])
+        result['rescored'] = rescored
+        return result
+
+    def summary(self) -> str:
+        """One-line report of how much work was reused this run."""
+        if self.diff is None:
+            return "No previous index for this date - built from scratch"
+        d = self.diff
+        return (f"Legs: {d['unchanged']} unchanged, {d['added']} added, {d['removed']} removed, "
+                f"{d['changed']} changed | sizes reused: {self.stats['incremental_sizes'] or '-'}, "
+                f"rebuilt: {self.stats['rebuilt_sizes'] or '-'} | "
+                f"{self.stats['reused']:,} indexed candidates reused, "
+                f"{self.stats['rescored']:,} combos rescored")
+
+
+def create_candidate_index_tables(conn: sqlite3.Connection):
+    """Create the candidate index tables if they do not exist."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS gto_candidate_snapshots (
+            date TEXT PRIMARY KEY,
+            legs_json TEXT NOT NULL,
+            params_json TEXT NOT NULL,
+            created_at TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS gto_candidate_index (
+            date TEXT NOT NULL,
+            num_legs INTEGER NOT NULL,
+            omitted_ev REAL,  -- NULL = index holds every profitable combo
+            num_rows INTEGER,
+            picks BLOB NOT NULL,  -- int16 leg indices, rows x num_legs
+            created_at TEXT,
+            PRIMARY KEY (date, num_legs)
+        )
+    """)
+    conn.commit()
+
+
+def test_candidate_index():
+    """Incremental pools must equal a full rebuild as the slate changes."""
+    import os
+    import tempfile
+    from parlay_engine import _make_test_slate
+
+    print("\n" + "="*80)
+    print("CANDIDATE INDEX TEST")
+    print("="*80)
+    print()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'candidate_index_test.db')
+    sizes = {2: 90, 3: 60, 4: 30, 5: 15}
+
+    base = _make_test_slate(80)
+    moved = base.copy()
+    moved.loc[5, 'line'] += 1                     # line moved -> removed + added
+    moved.loc[9, 'model_probability'] = 0.70      # re-scored leg -> changed
+    scratched = moved.drop(index=[0, 1]).reset_index(drop=True)
+    shuffled = scratched.sample(frac=1, random_state=1).reset_index(drop=True)
+
+    mismatches = 0
+    for search_mode in ('branch_and_bound', 'exhaustive'):
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        for label, picks in (('initial', base), ('line moves', moved),
+                             ('scratches', scratched), ('reordered', shuffled)):
+            engine = ParlayCandidateEngine(picks)
+            index = CandidateIndex.load('2026-01-01', picks, 0.05, 0.0, db_path)
+
+            for num_legs, pool_size in sizes.items():
+                def full_search(top_k, num_legs=num_legs):
+                    if search_mode == 'branch_and_bound':
+                        return engine.search_top_k(num_legs, top_k, 0.05)
+                    return engine.stream_top_k(num_legs, top_k, 0.05)
+
+                pool = index.top_k(engine, num_legs, pool_size, 0.05, search_mode, full_search)
+                expected = full_search(pool_size)
+                if not (np.array_equal(pool['picks'], expected['picks']) and
+                        np.array_equal(pool['ev'], expected['ev'])):
+                    mismatches += 1
+            index.save()
+            print(f"  {search_mode:16} {label:11} {index.summary()}")
+        print()
+
+    print(f"  Mismatches vs full rebuild: {mismatches}")
+    print()
+    print("[PASS]" if mismatches == 0 else "[FAIL]")
+
+
+if __name__ == "__main__":
+    test_candidate_index()
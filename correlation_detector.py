@@ -12,9 +12,11 @@ Usage:
 """
 
 import sqlite3
+import time
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from system_logger import get_logger
 
 logger = get_logger(__name__)
@@ -22,6 +24,147 @@ logger = get_logger(__name__)
 DB_PATH = "database/nhl_predictions.db"
 
 
+class ConflictMatrix:
+    """
+    Precomputed pairwise conflict structure for one slate of legs
+
+    Built once per slate. Holds an N x N boolean conflict matrix plus, per
+    leg, the bitset of legs it conflicts with, so checking whether a k-leg
+    combo is independent is a few integer operations. Valid combos are
+    enumerated directly as cliques of the complement graph (independent
+    sets of the conflict graph) instead of being filtered after the fact.
+    """
+
+    def __init__(self, conflicts: np.ndarray):
+        """
+        Args:
+            conflicts: Symmetric N x N boolean matrix (True = legs conflict)
+        """
+        conflicts = np.asarray(conflicts, dtype=bool).copy()
+        np.fill_diagonal(conflicts, False)
+        self.conflicts = conflicts
+        self.n_legs = len(conflicts)
+
+        # Row i as a Python int bitset (bit j set = i conflicts with j)
+        weights = [1 << j for j in range(self.n_legs)]
+        self.neighbor_bits = [
+            sum(weights[j] for j in np.flatnonzero(row).tolist())
+            for row in conflicts
+        ]
+
+        # Per-leg game/team bitmasks (set by from_slate)
+        self.game_masks = None
+        self.team_masks = None
+
+    @classmethod
+    def from_slate(cls, game_ids, teams) -> 'ConflictMatrix':
+        """
+        Conflicts for the parlay optimizer: two legs conflict if they share
+        a game_id or a team.
+        """
+        game_codes = pd.factorize(pd.Series(list(game_ids)), use_na_sentinel=False)[0]
+        team_codes = pd.factorize(pd.Series(list(teams)), use_na_sentinel=False)[0]
+
+        conflicts = ((game_codes[:, None] == game_codes[None, :]) |
+                     (team_codes[:, None] == team_codes[None, :]))
+
+        matrix = cls(conflicts)
+        matrix.game_masks = [1 << int(code) for code in game_codes]
+        matrix.team_masks = [1 << int(code) for code in team_codes]
+        return matrix
+
+    @classmethod
+    def from_players(cls, player_names) -> 'ConflictMatrix':
+        """
+        Conflicts when correlated legs are priced jointly (Gaussian copula):
+        only two legs on the same player conflict.
+        """
+        player_codes = pd.factorize(
+            pd.Series(list(player_names)).str.lower().str.strip(), use_na_sentinel=False
+        )[0]
+        return cls(player_codes[:, None] == player_codes[None, :])
+
+    def is_independent(self, indices) -> bool:
+        """True if no two legs in the combo conflict."""
+        members = 0
+        for i in indices:
+            if self.neighbor_bits[i] & members:
+                return False
+            members |= 1 << i
+        return True
+
+    def independent_mask(self, combos: np.ndarray) -> np.ndarray:
+        """Vectorized is_independent for a block of combos (rows = combos)."""
+        mask = np.ones(len(combos), dtype=bool)
+        num_legs = combos.shape[1]
+        for a in range(num_legs):
+            for b in range(a + 1, num_legs):
+                mask &= ~self.conflicts[combos[:, a], combos[:, b]]
+        return mask
+
+    def iter_independent_sets(self,
+                              num_legs: int,
+                              first_legs=None,
+                              block_size: int = 200000):
+        """
+        Yield every independent k-set (k = num_legs) as int32 blocks.
+
+        Combos come out in lexicographic order. The search expands one leg at
+        a time over whole blocks of partial combos: the next leg must come
+        after the last one and conflict with none of the legs chosen so far.
+
+        Args:
+            num_legs: Combo size
+            first_legs: Restrict to combos starting at these legs (default: all)
+            block_size: Approximate maximum rows per yielded block
+        """
+        n = self.n_legs
+        if num_legs < 1 or n < num_legs:
+            return
+
+        if first_legs is None:
+            first_legs = range(n)
+        first = np.asarray(list(first_legs), dtype=np.int32).reshape(-1, 1)
+
+        columns = np.arange(n)
+        # Each partial row has at most n children, so this bounds a chunk's output
+        rows_per_chunk = max(1, block_size // max(n, 1))
+
+        def expand(partial):
+            depth = partial.shape[1]
+            if depth == num_legs:
+                yield partial
+                return
+
+            for start in range(0, len(partial), rows_per_chunk):
+                chunk = partial[start:start + rows_per_chunk]
+                blocked = self.conflicts[chunk[:, 0]].copy()
+                for col in range(1, depth):
+                    blocked |= self.conflicts[chunk[:, col]]
+                allowed = ~blocked & (columns[None, :] > chunk[:, -1:])
+                # Next leg must leave room for the legs still to come
+                allowed[:, n - (num_legs - depth) + 1:] = False
+
+                rows, nxt = np.nonzero(allowed)
+                if len(rows) == 0:
+                    continue
+                children = np.empty((len(rows), depth + 1), dtype=np.int32)
+                children[:, :depth] = chunk[rows]
+                children[:, depth] = nxt
+                yield from expand(children)
+
+        pending = []
+        pending_rows = 0
+        for block in expand(first):
+            pending.append(block)
+            pending_rows += len(block)
+            if pending_rows >= block_size:
+                yield np.concatenate(pending)
+                pending, pending_rows = [], 0
+        if pending:
+            yield np.concatenate(pending)
+
+
 class CorrelationDetector:
     """
     Detects correlated props and players for parlay construction
@@ -45,10 +188,43 @@ class CorrelationDetector:
         ('goals', 'points'): 0.75,      # Goals are points
     }
 
-    def __init__(self, db_path: str = DB_PATH):
-        """Initialize correlation detector"""
+    # Structural scores used when no empirical correlation is cached
+    SAME_GAME_SCORE = 0.30
+    SAME_TEAM_SCORE = 0.20
+
+    def __init__(self, db_path: str = DB_PATH, season: str = None):
+        """
+        Initialize correlation detector
+
+        Args:
+            db_path: Path to database
+            season: Season of the empirical correlations (defaults to latest cached)
+        """
         self.db_path = db_path
+        self.season = season
         self.linemate_cache = {}  # Cache linemate relationships
+        self._prop_correlations = None  # Loaded on first use
+
+    @property
+    def prop_correlations(self) -> Dict[Tuple[str, str, str], float]:
+        """Empirical {(relationship, prop1, prop2): correlation} from prop_correlations"""
+        if self._prop_correlations is None:
+            self._prop_correlations = load_prop_correlations(self.season, self.db_path)
+        return self._prop_correlations
+
+    def get_prop_correlation(self, relationship: str, prop1: str, prop2: str) -> Optional[float]:
+        """
+        Empirical correlation between two props
+
+        Args:
+            relationship: 'same_player', 'teammate' or 'opponent'
+            prop1: First prop type
+            prop2: Second prop type
+
+        Returns:
+            Correlation, or None if not cached
+        """
+        return self.prop_correlations.get((relationship, normalize_prop(prop1), normalize_prop(prop2)))
 
     def are_same_player(self, player1: str, player2: str) -> bool:
         """Check if two legs are the same player"""
@@ -89,7 +265,11 @@ class CorrelationDetector:
         if prop1 == prop2:
             return True
 
-        # Check known correlations
+        # Empirical same-player correlation, then known correlations
+        correlation = self.get_prop_correlation('same_player', prop1, prop2)
+        if correlation is not None:
+            return correlation >= threshold
+
         correlation = self.PROP_CORRELATIONS.get((prop1, prop2))
         if correlation is None:
             # Try reverse order
@@ -100,22 +280,25 @@ class CorrelationDetector:
 
         return False
 
+    @property
+    def linemate_graph(self) -> 'LinemateGraph':
+        """Linemate adjacency from the linemate_graph table, loaded on first use"""
+        if 'graph' not in self.linemate_cache:
+            self.linemate_cache['graph'] = LinemateGraph.load(self.db_path)
+        return self.linemate_cache['graph']
+
     def are_linemates(self, player1: str, team1: str, player2: str, team2: str) -> bool:
         """
         Check if two players are linemates (play together)
 
-        For now, returns False (would need line combination data)
-        Future: Integrate with NHL API line combinations
+        O(1) lookup in the linemate graph built by build_linemate_graph()
+        from line_combinations and point co-occurrence in player_game_logs.
         """
         # Same team is required for linemates
         if team1 != team2:
             return False
 
-        # TODO: Fetch line combinations from NHL API
-        # For now, conservatively return False
-        # In production, would check if players share ice time regularly
-
-        return False
+        return self.linemate_graph.are_linemates(player1, team1, player2, team2)
 
     def get_correlation_score(
         self,
@@ -125,6 +308,10 @@ class CorrelationDetector:
         """
         Calculate correlation score between two parlay legs
 
+        Teammates and opponents score the absolute empirical correlation of
+        their props (prop_correlations table); without cached data the
+        structural scores apply (same game +0.30, same team +0.20).
+
         Returns:
             0.0 = No correlation (independent)
             1.0 = Perfect correlation (avoid!)
@@ -135,16 +322,21 @@ class CorrelationDetector:
 
         score = 0.0
 
-        # Same game correlation (moderate)
-        if self.are_same_game(team1, opp1, team2, opp2):
-            score += 0.30
-            logger.debug(f"Same game correlation: {player1} vs {player2}")
-
-        # Same team correlation (low)
         if self.are_same_team(team1, team2):
-            score += 0.20
+            correlation = self.get_prop_correlation('teammate', prop1, prop2)
+            if correlation is not None:
+                score += abs(correlation)
+            else:
+                if self.are_same_game(team1, opp1, team2, opp2):
+                    score += self.SAME_GAME_SCORE
+                score += self.SAME_TEAM_SCORE
             logger.debug(f"Same team correlation: {player1} vs {player2}")
 
+        elif self.are_same_game(team1, opp1, team2, opp2):
+            correlation = self.get_prop_correlation('opponent', prop1, prop2)
+            score += abs(correlation) if correlation is not None else self.SAME_GAME_SCORE
+            logger.debug(f"Same game correlation: {player1} vs {player2}")
+
         # Prop type correlation
         if self.are_props_correlated(prop1, prop2):
             # Only matters if same player (already handled) or linemates
@@ -182,6 +374,73 @@ class CorrelationDetector:
 
         return False
 
+    def build_conflict_matrix(
+        self,
+        legs: List[Dict],
+        max_correlation: float = 0.30
+    ) -> ConflictMatrix:
+        """
+        Precompute which pairs of legs are correlated
+
+        Vectorized equivalent of calling get_correlation_score() on every
+        pair: same player scores 1.0, teammates/opponents score the empirical
+        prop correlation (or the structural same game/same team scores),
+        plus 0.40 for correlated props between linemates.
+
+        Args:
+            legs: List of parlay legs (player_name, team, opponent, prop_type)
+            max_correlation: Pairs scoring above this conflict
+
+        Returns:
+            ConflictMatrix for the legs
+        """
+        n = len(legs)
+        players = pd.factorize(pd.Series([leg['player_name'].lower() for leg in legs]))[0]
+        teams = pd.Series([leg['team'] for leg in legs])
+        opponents = pd.Series([leg['opponent'] for leg in legs])
+        team_codes = pd.factorize(pd.concat([teams, opponents]))[0]
+        team_codes, opp_codes = team_codes[:n], team_codes[n:]
+        team_lower = pd.factorize(teams.str.lower())[0]
+
+        same_player = players[:, None] == players[None, :]
+        same_game = (((team_codes[:, None] == team_codes[None, :]) &
+                      (opp_codes[:, None] == opp_codes[None, :])) |
+                     ((team_codes[:, None] == opp_codes[None, :]) &
+                      (opp_codes[:, None] == team_codes[None, :])))
+        same_team = team_lower[:, None] == team_lower[None, :]
+
+        # Linemate + prop correlation only applies within a team - check those pairs directly
+        linemate_props = np.zeros((n, n), dtype=bool)
+        for i, j in zip(*np.nonzero(np.triu(same_team & ~same_player, 1))):
+            leg1, leg2 = legs[i], legs[j]
+            if (self.are_props_correlated(leg1['prop_type'], leg2['prop_type']) and
+                    self.are_linemates(leg1['player_name'], leg1['team'],
+                                       leg2['player_name'], leg2['team'])):
+                linemate_props[i, j] = linemate_props[j, i] = True
+
+        # Empirical correlation lookup by prop code (NaN = not cached)
+        props = [normalize_prop(leg['prop_type']) for leg in legs]
+        prop_codes, prop_names = pd.factorize(pd.Series(props))
+        lookup = np.full((2, len(prop_names), len(prop_names)), np.nan)
+        for r, relationship in enumerate(('teammate', 'opponent')):
+            for a, prop1 in enumerate(prop_names):
+                for b, prop2 in enumerate(prop_names):
+                    correlation = self.prop_correlations.get((relationship, prop1, prop2))
+                    if correlation is not None:
+                        lookup[r, a, b] = abs(correlation)
+        teammate = lookup[0][prop_codes[:, None], prop_codes[None, :]]
+        opponent = lookup[1][prop_codes[:, None], prop_codes[None, :]]
+
+        structural_team = self.SAME_GAME_SCORE * same_game + self.SAME_TEAM_SCORE
+        score = np.where(same_team, np.where(np.isnan(teammate), structural_team, teammate),
+                         np.where(same_game,
+                                  np.where(np.isnan(opponent), self.SAME_GAME_SCORE, opponent),
+                                  0.0))
+        score = score + 0.40 * linemate_props
+        score = np.where(same_player, 1.0, np.minimum(score, 1.0))
+
+        return ConflictMatrix(score > max_correlation)
+
     def filter_uncorrelated_combinations(
         self,
         legs: List[Dict],
@@ -190,6 +449,9 @@ class CorrelationDetector:
         """
         Generate parlay combinations with correlation filtering
 
+        Builds the pairwise conflict matrix once and enumerates only
+        uncorrelated combinations (2-leg, then 3-leg, in index order).
+
         Args:
             legs: List of potential parlay legs
             max_correlation: Maximum allowed correlation
@@ -199,37 +461,602 @@ class CorrelationDetector:
         """
         valid_combinations = []
 
-        # Generate 2-leg parlays
-        for i in range(len(legs)):
-            for j in range(i + 1, len(legs)):
-                if not self.are_correlated(legs[i], legs[j], max_correlation):
-                    valid_combinations.append([legs[i], legs[j]])
-
-        # Generate 3-leg parlays
-        for i in range(len(legs)):
-            for j in range(i + 1, len(legs)):
-                for k in range(j + 1, len(legs)):
-                    # Check all pairs
-                    if (not self.are_correlated(legs[i], legs[j], max_correlation) and
-                        not self.are_correlated(legs[i], legs[k], max_correlation) and
-                        not self.are_correlated(legs[j], legs[k], max_correlation)):
-                        valid_combinations.append([legs[i], legs[j], legs[k]])
+        if len(legs) < 2:
+            return valid_combinations
+
+        matrix = self.build_conflict_matrix(legs, max_correlation)
+
+        # Generate 2-leg and 3-leg parlays
+        for num_legs in (2, 3):
+            for block in matrix.iter_independent_sets(num_legs):
+                for combo in block.tolist():
+                    valid_combinations.append([legs[i] for i in combo])
 
         return valid_combinations
 
 
-def calculate_prop_correlations_from_data() -> Dict[Tuple[str, str], float]:
+# ============================================================================
+# EMPIRICAL PROP CORRELATIONS (from player_game_logs)
+# ============================================================================
+
+# Prop type -> player_game_logs column
+PROP_STAT_COLUMNS = {
+    'points': 'points',
+    'goals': 'goals',
+    'assists': 'assists',
+    'shots': 'shots',
+    'blocked_shots': 'blocked_shots',
+}
+CORRELATION_PROPS = list(PROP_STAT_COLUMNS)
+PROP_ALIASES = {'blocks': 'blocked_shots', 'shots_on_goal': 'shots', 'sog': 'shots'}
+
+# same_player = cross-prop for one player, teammate = two players on the same
+# team in the same game, opponent = players on opposing teams in the same game
+RELATIONSHIPS = ('same_player', 'teammate', 'opponent')
+
+
+def normalize_prop(prop: str) -> str:
+    """Lowercase prop type with aliases resolved (blocks -> blocked_shots)"""
+    prop = prop.lower().strip()
+    return PROP_ALIASES.get(prop, prop)
+
+
+def season_for_date(game_date: str) -> str:
+    """NHL season for a game date ('2025-11-03' -> '2025-2026')"""
+    year, month = int(game_date[:4]), int(game_date[5:7])
+    start = year if month >= 9 else year - 1
+    return f"{start}-{start + 1}"
+
+
+def create_prop_correlation_tables(conn):
+    """Create the correlation cache tables"""
+    cursor = conn.cursor()
+
+    # Sufficient statistics per game date, so a refresh only recomputes new dates
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS prop_correlation_sums (
+            season TEXT NOT NULL,
+            game_date TEXT NOT NULL,
+            relationship TEXT NOT NULL,
+            prop1 TEXT NOT NULL,
+            prop2 TEXT NOT NULL,
+            n_pairs INTEGER NOT NULL,
+            sum_x REAL NOT NULL,
+            sum_y REAL NOT NULL,
+            sum_xx REAL NOT NULL,
+            sum_yy REAL NOT NULL,
+            sum_xy REAL NOT NULL,
+            PRIMARY KEY (season, game_date, relationship, prop1, prop2)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS prop_correlations (
+            season TEXT NOT NULL,
+            relationship TEXT NOT NULL,
+            prop1 TEXT NOT NULL,
+            prop2 TEXT NOT NULL,
+            n_pairs INTEGER NOT NULL,
+            correlation REAL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (season, relationship, prop1, prop2)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS prop_correlation_refresh (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_log_id INTEGER NOT NULL,
+            refreshed_at TEXT NOT NULL
+        )
+    """)
+
+    conn.commit()
+
+
+def _load_stat_logs(conn, game_dates=None) -> pd.DataFrame:
+    """Game logs with one column per correlation prop (all dates, or only game_dates)"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(player_game_logs)")}
+
+    # Older logs filled shots_on_goal, newer ones shots - take whichever is set
+    shot_columns = [c for c in ('shots', 'shots_on_goal') if c in columns]
+    stat_columns = [c for c in ('points', 'goals', 'assists', 'blocked_shots') if c in columns]
+
+    query = f"""
+        SELECT game_id, game_date, team, opponent,
+               {', '.join(stat_columns + shot_columns)}
+        FROM player_game_logs
+    """
+    params = ()
+    if game_dates is not None:
+        query += f" WHERE game_date IN ({','.join('?' * len(game_dates))})"
+        params = tuple(game_dates)
+
+    logs = pd.read_sql_query(query, conn, params=params)
+    logs['shots'] = logs[shot_columns].fillna(0).max(axis=1) if shot_columns else 0
+    for prop, column in PROP_STAT_COLUMNS.items():
+        logs[prop] = logs[column].fillna(0).astype(float) if column in logs else 0.0
+
+    return logs[['game_id', 'game_date', 'team', 'opponent'] + CORRELATION_PROPS]
+
+
+def _pair_sums(logs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pairwise sufficient statistics per game date and relationship
+
+    Everything comes from per (game, team) group sums: with m players,
+    stat sums S and per-player cross products C, the ordered teammate pairs
+    contribute S S^T - C and the opponent pairs S_team S_opp^T, so no pair
+    is ever materialized.
+
+    Returns:
+        DataFrame with game_date, relationship, prop1, prop2, n_pairs,
+        sum_x, sum_y, sum_xx, sum_yy, sum_xy
+    """
+    k = len(CORRELATION_PROPS)
+    if logs.empty:
+        return pd.DataFrame(columns=['game_date', 'relationship', 'prop1', 'prop2', 'n_pairs',
+                                     'sum_x', 'sum_y', 'sum_xx', 'sum_yy', 'sum_xy'])
+
+    x = logs[CORRELATION_PROPS].to_numpy(dtype=np.float64)
+    cross = (x[:, :, None] * x[:, None, :]).reshape(len(x), k * k)
+
+    keys = logs[['game_date', 'game_id', 'team', 'opponent']].reset_index(drop=True)
+    stats = pd.concat([
+        keys,
+        pd.DataFrame(x, columns=[f's{a}' for a in range(k)]),
+        pd.DataFrame(x * x, columns=[f'q{a}' for a in range(k)]),
+        pd.DataFrame(cross, columns=[f'c{a}' for a in range(k * k)]),
+    ], axis=1)
+    stats['m'] = 1.0
+
+    groups = stats.groupby(['game_date', 'game_id', 'team', 'opponent'], sort=False).sum().reset_index()
+    m = groups['m'].to_numpy()
+    S = groups[[f's{a}' for a in range(k)]].to_numpy()
+    Q = groups[[f'q{a}' for a in range(k)]].to_numpy()
+    C = groups[[f'c{a}' for a in range(k * k)]].to_numpy().reshape(-1, k, k)
+
+    per_group = {
+        # Every player with every other prop of their own line
+        'same_player': (m, S, Q, C),
+        # Ordered pairs of distinct teammates
+        'teammate': (m * (m - 1), (m - 1)[:, None] * S, (m - 1)[:, None] * Q,
+                     S[:, :, None] * S[:, None, :] - C),
+    }
+
+    # Opponent pairs: each team group with the group of its opponent in the same game
+    opponents = groups[['game_id', 'team', 'opponent']].reset_index().merge(
+        groups[['game_id', 'team']].reset_index(),
+        left_on=['game_id', 'opponent'], right_on=['game_id', 'team'],
+        suffixes=('', '_opp')
+    )
+    own, opp = opponents['index'].to_numpy(), opponents['index_opp'].to_numpy()
+    opponent_n = np.zeros(len(groups))
+    opponent_s = np.zeros_like(S)
+    opponent_q = np.zeros_like(Q)
+    opponent_c = np.zeros_like(C)
+    np.add.at(opponent_n, own, m[own] * m[opp])
+    np.add.at(opponent_s, own, m[opp][:, None] * S[own])
+    np.add.at(opponent_q, own, m[opp][:, None] * Q[own])
+    np.add.at(opponent_c, own, S[own][:, :, None] * S[opp][:, None, :])
+    # Second-position sums come from the mirrored pairs (opponent of the opponent)
+    opponent_s_second = np.zeros_like(S)
+    opponent_q_second = np.zeros_like(Q)
+    np.add.at(opponent_s_second, own, m[own][:, None] * S[opp])
+    np.add.at(opponent_q_second, own, m[own][:, None] * Q[opp])
+
+    dates, date_index = np.unique(groups['game_date'].to_numpy(), return_inverse=True)
+
+    def by_date(values):
+        out = np.zeros((len(dates),) + values.shape[1:])
+        np.add.at(out, date_index, values)
+        return out
+
+    rows = []
+    prop_a, prop_b = np.meshgrid(np.arange(k), np.arange(k), indexing='ij')
+    prop_a, prop_b = prop_a.ravel(), prop_b.ravel()
+
+    relationship_sums = {
+        name: (by_date(n), by_date(s), by_date(s), by_date(q), by_date(q), by_date(c))
+        for name, (n, s, q, c) in per_group.items()
+    }
+    relationship_sums['opponent'] = (
+        by_date(opponent_n), by_date(opponent_s), by_date(opponent_s_second),
+        by_date(opponent_q), by_date(opponent_q_second), by_date(opponent_c)
+    )
+
+    for name, (n, s1, s2, q1, q2, c) in relationship_sums.items():
+        rows.append(pd.DataFrame({
+            'game_date': np.repeat(dates, k * k),
+            'relationship': name,
+            'prop1': np.tile(np.array(CORRELATION_PROPS)[prop_a], len(dates)),
+            'prop2': np.tile(np.array(CORRELATION_PROPS)[prop_b], len(dates)),
+            'n_pairs': np.repeat(n, k * k).astype(np.int64),
+            'sum_x': s1[:, prop_a].ravel(),
+            'sum_y': s2[:, prop_b].ravel(),
+            'sum_xx': q1[:, prop_a].ravel(),
+            'sum_yy': q2[:, prop_b].ravel(),
+            'sum_xy': c[:, prop_a, prop_b].ravel(),
+        }))
+
+    return pd.concat(rows, ignore_index=True)
+
+
+def _correlation_from_sums(sums: pd.DataFrame) -> np.ndarray:
+    """Pearson correlation from n, sum_x, sum_y, sum_xx, sum_yy, sum_xy (NaN if undefined)"""
+    n = sums['n_pairs'].to_numpy(dtype=np.float64)
+    cov = n * sums['sum_xy'] - sums['sum_x'] * sums['sum_y']
+    var_x = n * sums['sum_xx'] - sums['sum_x'] ** 2
+    var_y = n * sums['sum_yy'] - sums['sum_y'] ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = cov.to_numpy() / np.sqrt(var_x.to_numpy() * var_y.to_numpy())
+    correlation[(n < 2) | ~np.isfinite(correlation)] = np.nan
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def refresh_prop_correlations(db_path: str = DB_PATH, full_refresh: bool = False) -> Dict:
+    """
+    Update the empirical prop correlation tables from player_game_logs
+
+    Only game dates with logs newer than the last refresh are recomputed
+    (all logs of those dates, so late-arriving games are counted), then the
+    affected seasons are re-aggregated.
+
+    Args:
+        db_path: Path to database
+        full_refresh: Recompute every date
+
+    Returns:
+        Dictionary with new_logs, dates, seasons, seconds
+    """
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    create_prop_correlation_tables(conn)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT last_log_id FROM prop_correlation_refresh WHERE id = 1")
+    row = cursor.fetchone()
+    last_log_id = 0 if (row is None or full_refresh) else row[0]
+
+    cursor.execute("""
+        SELECT COUNT(*), MAX(id) FROM player_game_logs WHERE id > ?
+    """, (last_log_id,))
+    new_logs, max_log_id = cursor.fetchone()
+
+    if not new_logs:
+        conn.close()
+        return {'new_logs': 0, 'dates': 0, 'seasons': [], 'seconds': time.perf_counter() - start}
+
+    if full_refresh:
+        cursor.execute("DELETE FROM prop_correlation_sums")
+        logs = _load_stat_logs(conn)
+    else:
+        cursor.execute("""
+            SELECT DISTINCT game_date FROM player_game_logs WHERE id > ?
+        """, (last_log_id,))
+        dates = [r[0] for r in cursor.fetchall()]
+        logs = _load_stat_logs(conn, dates)
+
+    sums = _pair_sums(logs)
+    sums.insert(0, 'season', [season_for_date(d) for d in sums['game_date']])
+    dates = sorted(logs['game_date'].unique())
+    seasons = sorted(sums['season'].unique())
+
+    try:
+        cursor.executemany("DELETE FROM prop_correlation_sums WHERE game_date = ?",
+                           [(d,) for d in dates])
+        cursor.executemany(f"""
+            INSERT INTO prop_correlation_sums ({', '.join(sums.columns)})
+            VALUES ({','.join('?' * len(sums.columns))})
+        """, sums.itertuples(index=False, name=None))
+
+        # Re-aggregate the affected seasons
+        placeholders = ','.join('?' * len(seasons))
+        season_sums = pd.read_sql_query(f"""
+            SELECT season, relationship, prop1, prop2,
+                   SUM(n_pairs) AS n_pairs, SUM(sum_x) AS sum_x, SUM(sum_y) AS sum_y,
+                   SUM(sum_xx) AS sum_xx, SUM(sum_yy) AS sum_yy, SUM(sum_xy) AS sum_xy
+            FROM prop_correlation_sums
+            WHERE season IN ({placeholders})
+            GROUP BY season, relationship, prop1, prop2
+        """, conn, params=seasons)
+        season_sums['correlation'] = _correlation_from_sums(season_sums)
+
+        now = datetime.now().isoformat()
+        cursor.execute(f"DELETE FROM prop_correlations WHERE season IN ({placeholders})", seasons)
+        cursor.executemany("""
+            INSERT INTO prop_correlations
+            (season, relationship, prop1, prop2, n_pairs, correlation, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (r.season, r.relationship, r.prop1, r.prop2, int(r.n_pairs),
+             None if np.isnan(r.correlation) else float(r.correlation), now)
+            for r in season_sums.itertuples(index=False)
+        ])
+
+        cursor.execute("""
+            INSERT OR REPLACE INTO prop_correlation_refresh (id, last_log_id, refreshed_at)
+            VALUES (1, ?, ?)
+        """, (max_log_id, now))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - start
+    logger.info(f"Prop correlations refreshed: {new_logs} new logs, {len(dates)} dates, "
+                f"seasons {seasons} in {seconds:.2f}s")
+
+    return {'new_logs': new_logs, 'dates': len(dates), 'seasons': seasons, 'seconds': seconds}
+
+
+def load_prop_correlations(season: str = None,
+                           db_path: str = DB_PATH) -> Dict[Tuple[str, str, str], float]:
+    """
+    Cached empirical correlations for one season
+
+    Args:
+        season: Season ('2025-2026'), defaults to the latest cached season
+        db_path: Path to database
+
+    Returns:
+        {(relationship, prop1, prop2): correlation}, empty if nothing is cached
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        if season is None:
+            season = conn.execute("SELECT MAX(season) FROM prop_correlations").fetchone()[0]
+        rows = conn.execute("""
+            SELECT relationship, prop1, prop2, correlation
+            FROM prop_correlations
+            WHERE season = ? AND correlation IS NOT NULL
+        """, (season,)).fetchall()
+    except sqlite3.DatabaseError:
+        rows = []
+    finally:
+        conn.close()
+
+    return {(relationship, prop1, prop2): correlation
+            for relationship, prop1, prop2, correlation in rows}
+
+
+def calculate_prop_correlations_from_data(season: str = None,
+                                          db_path: str = DB_PATH) -> Dict[Tuple[str, str], float]:
     """
     Calculate prop correlations from historical data
 
-    This would analyze actual game results to find empirical correlations.
-    For now, returns known hockey correlations.
+    Refreshes the empirical correlation tables from player_game_logs and
+    returns the same-player cross-prop correlations for the season, in the
+    PROP_CORRELATIONS format. Falls back to the known hockey correlations
+    when no game logs are available.
 
-    Future: Query player_stats to calculate actual correlations
+    Args:
+        season: Season ('2025-2026'), defaults to the latest season with logs
+        db_path: Path to database
     """
-    # TODO: Implement empirical correlation calculation
-    # For now, return known hockey correlations
-    return CorrelationDetector.PROP_CORRELATIONS
+    try:
+        refresh_prop_correlations(db_path)
+    except sqlite3.DatabaseError as e:
+        logger.warning(f"Could not refresh prop correlations: {e}")
+
+    correlations = {
+        (prop1, prop2): correlation
+        for (relationship, prop1, prop2), correlation in load_prop_correlations(season, db_path).items()
+        if relationship == 'same_player' and prop1 != prop2
+    }
+
+    return correlations or CorrelationDetector.PROP_CORRELATIONS
+
+
+# ============================================================================
+# LINEMATE GRAPH (line_combinations + point co-occurrence)
+# ============================================================================
+
+# Teammates count as linemates when they record points in the same game
+# this much more often than independence predicts, over enough shared games
+LINEMATE_MIN_LIFT = 1.25
+LINEMATE_MIN_GAMES = 20
+GRAPH_MIN_GAMES = 5  # Shorter teammate histories are not stored
+
+
+def create_linemate_graph_table(conn):
+    """Create the linemate graph table"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS linemate_graph (
+            team TEXT NOT NULL,
+            player1 TEXT NOT NULL,
+            player2 TEXT NOT NULL,
+            games_together INTEGER NOT NULL,
+            co_point_games INTEGER NOT NULL,
+            expected_co_point_games REAL,
+            affinity REAL,         -- co-point lift (observed / expected)
+            line_number INTEGER,   -- from line_combinations, NULL if not listed
+            is_linemate INTEGER NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (team, player1, player2)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_linemate_player1 ON linemate_graph(player1)")
+    conn.commit()
+
+
+def _co_occurrence_edges(logs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Teammate edges from game logs (one block of matrix products per team)
+
+    With presence P and point indicator M as (players x games) matrices,
+    games together = P P^T, co-point games = M M^T and the expected
+    co-point games under independence = (M P^T)(P M^T) / (P P^T).
+    """
+    edges = []
+    for team, team_logs in logs.groupby('team'):
+        players, player_index = np.unique(team_logs['player_key'].to_numpy(), return_inverse=True)
+        games, game_index = np.unique(team_logs['game_id'].to_numpy(), return_inverse=True)
+        if len(players) < 2:
+            continue
+
+        presence = np.zeros((len(players), len(games)))
+        scored = np.zeros((len(players), len(games)))
+        presence[player_index, game_index] = 1.0
+        np.maximum.at(scored, (player_index, game_index), (team_logs['points'].to_numpy() > 0) * 1.0)
+
+        together = presence @ presence.T
+        co_points = scored @ scored.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = (scored @ presence.T) * (presence @ scored.T) / together
+
+        i, j = np.nonzero(np.triu(together >= GRAPH_MIN_GAMES, 1))
+        edges.append(pd.DataFrame({
+            'team': team,
+            'player1': players[i],
+            'player2': players[j],
+            'games_together': together[i, j].astype(int),
+            'co_point_games': co_points[i, j].astype(int),
+            'expected_co_point_games': expected[i, j],
+        }))
+
+    if not edges:
+        return pd.DataFrame(columns=['team', 'player1', 'player2', 'games_together',
+                                     'co_point_games', 'expected_co_point_games'])
+    return pd.concat(edges, ignore_index=True)
+
+
+def _line_combination_edges(conn) -> pd.DataFrame:
+    """Pairs listed on the same line in each team's latest line_combinations"""
+    try:
+        lines = pd.read_sql_query("""
+            SELECT lc.team, lc.line_number, lc.center, lc.left_wing, lc.right_wing
+            FROM line_combinations lc
+            JOIN (SELECT team, MAX(as_of_date) AS as_of_date
+                  FROM line_combinations GROUP BY team) latest
+              ON lc.team = latest.team AND lc.as_of_date = latest.as_of_date
+        """, conn)
+    except sqlite3.DatabaseError:
+        return pd.DataFrame(columns=['team', 'player1', 'player2', 'line_number'])
+
+    pairs = []
+    for first, second in (('center', 'left_wing'), ('center', 'right_wing'), ('left_wing', 'right_wing')):
+        pair = lines[['team', 'line_number', first, second]].dropna()
+        pair.columns = ['team', 'line_number', 'player1', 'player2']
+        pairs.append(pair)
+    pairs = pd.concat(pairs, ignore_index=True)
+    for column in ('player1', 'player2'):
+        pairs[column] = pairs[column].str.lower().str.strip()
+
+    # Order each pair like the co-occurrence edges (player1 < player2)
+    swap = pairs['player1'] > pairs['player2']
+    pairs.loc[swap, ['player1', 'player2']] = pairs.loc[swap, ['player2', 'player1']].to_numpy()
+    return pairs.drop_duplicates(['team', 'player1', 'player2'])
+
+
+def build_linemate_graph(db_path: str = DB_PATH) -> Dict:
+    """
+    Rebuild the linemate graph from player_game_logs and line_combinations
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        Dictionary with edges, linemates, seconds
+    """
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    create_linemate_graph_table(conn)
+
+    logs = pd.read_sql_query("SELECT game_id, team, player_name, points FROM player_game_logs", conn)
+    logs['player_key'] = logs['player_name'].str.lower().str.strip()
+    logs['points'] = logs['points'].fillna(0)
+
+    edges = _co_occurrence_edges(logs)
+    edges = edges.merge(_line_combination_edges(conn), on=['team', 'player1', 'player2'], how='outer')
+    edges['games_together'] = edges['games_together'].fillna(0).astype(int)
+    edges['co_point_games'] = edges['co_point_games'].fillna(0).astype(int)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        edges['affinity'] = edges['co_point_games'] / edges['expected_co_point_games']
+    edges['is_linemate'] = (
+        edges['line_number'].notna() |
+        ((edges['affinity'] >= LINEMATE_MIN_LIFT) & (edges['games_together'] >= LINEMATE_MIN_GAMES))
+    ).astype(int)
+
+    # Both directions, so lookups by player1 hit the index
+    mirrored = edges.rename(columns={'player1': 'player2', 'player2': 'player1'})
+    edges = pd.concat([edges, mirrored], ignore_index=True)
+    edges['updated_at'] = datetime.now().isoformat()
+    edges = edges.astype(object).where(edges.notna(), None)
+
+    columns = ['team', 'player1', 'player2', 'games_together', 'co_point_games',
+               'expected_co_point_games', 'affinity', 'line_number', 'is_linemate', 'updated_at']
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM linemate_graph")
+        cursor.executemany(f"""
+            INSERT INTO linemate_graph ({', '.join(columns)})
+            VALUES ({','.join('?' * len(columns))})
+        """, edges[columns].itertuples(index=False, name=None))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    linemates = int(edges['is_linemate'].sum()) // 2
+    seconds = time.perf_counter() - start
+    logger.info(f"Linemate graph rebuilt: {len(edges) // 2} teammate edges, "
+                f"{linemates} linemate pairs in {seconds:.2f}s")
+
+    return {'edges': len(edges) // 2, 'linemates': linemates, 'seconds': seconds}
+
+
+class LinemateGraph:
+    """
+    In-memory adjacency of the linemate_graph table
+
+    adjacency[(team, player)] = {teammate: affinity} for linemates only,
+    so are_linemates() is two dictionary lookups.
+    """
+
+    def __init__(self, adjacency: Dict[Tuple[str, str], Dict[str, float]]):
+        self.adjacency = adjacency
+
+    @classmethod
+    def load(cls, db_path: str = DB_PATH) -> 'LinemateGraph':
+        """Load linemate edges (empty graph if the table does not exist)"""
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute("""
+                SELECT team, player1, player2, affinity
+                FROM linemate_graph
+                WHERE is_linemate = 1
+            """).fetchall()
+        except sqlite3.DatabaseError:
+            rows = []
+        finally:
+            conn.close()
+
+        adjacency = {}
+        for team, player1, player2, affinity in rows:
+            adjacency.setdefault((team.lower(), player1), {})[player2] = affinity
+        return cls(adjacency)
+
+    def are_linemates(self, player1: str, team1: str, player2: str, team2: str) -> bool:
+        """True if both players are on the same team and linked in the graph"""
+        if team1.lower() != team2.lower():
+            return False
+        neighbors = self.adjacency.get((team1.lower(), player1.lower().strip()))
+        return neighbors is not None and player2.lower().strip() in neighbors
+
+    def linemates(self, player: str, team: str) -> Dict[str, float]:
+        """Linemates of a player with their co-point affinity"""
+        return self.adjacency.get((team.lower(), player.lower().strip()), {})
+
+    def __len__(self) -> int:
+        return sum(len(neighbors) for neighbors in self.adjacency.values()) // 2
 
 
 # Example usage and testing
@@ -295,6 +1122,51 @@ if __name__ == "__main__":
         for leg in sample:
             print(f"    - {leg['player_name']} ({leg['team']}) {leg['prop_type'].upper()}")
 
+    print()
+
+    # Test 5: Conflict matrix enumeration vs pairwise checks
+    print("[TEST 5] Conflict matrix matches pairwise are_correlated()")
+    from itertools import combinations
+    matrix = detector.build_conflict_matrix(legs, max_correlation=0.30)
+    for num_legs in (2, 3):
+        enumerated = [tuple(c) for block in matrix.iter_independent_sets(num_legs) for c in block.tolist()]
+        expected = [c for c in combinations(range(len(legs)), num_legs)
+                    if not any(detector.are_correlated(legs[a], legs[b], 0.30)
+                               for a, b in combinations(c, 2))]
+        print(f"  {num_legs}-leg independent combos: {len(enumerated)} (match: {enumerated == expected})")
+
+    print()
+
+    # Test 6: Empirical correlations from player_game_logs
+    print("[TEST 6] Empirical prop correlations (player_game_logs)")
+    correlations = calculate_prop_correlations_from_data()
+    for (prop1, prop2), correlation in sorted(correlations.items()):
+        if prop1 < prop2:
+            print(f"  {prop1:>13} / {prop2:<13} {correlation:+.3f}")
+
+    detector = CorrelationDetector()
+    slate = legs + [{'player_name': 'Lucas Raymond', 'team': 'DET', 'opponent': 'LAK', 'prop_type': 'points'}]
+    mixed_legs = [dict(leg, prop_type=prop) for leg in slate for prop in ('points', 'shots', 'goals')]
+    matrix = detector.build_conflict_matrix(mixed_legs, max_correlation=0.30)
+    expected = np.array([[a != b and detector.are_correlated(mixed_legs[a], mixed_legs[b], 0.30)
+                          for b in range(len(mixed_legs))] for a in range(len(mixed_legs))])
+    print(f"  Conflict matrix matches pairwise scores: {np.array_equal(matrix.conflicts, expected)}")
+
+    print()
+
+    # Test 7: Linemate graph
+    print("[TEST 7] Linemate graph (line_combinations + point co-occurrence)")
+    try:
+        graph = build_linemate_graph()
+        print(f"  {graph['edges']} teammate edges, {graph['linemates']} linemate pairs ({graph['seconds']:.2f}s)")
+    except sqlite3.DatabaseError as e:
+        print(f"  Could not rebuild graph: {e}")
+    detector = CorrelationDetector()
+    for (team, player), neighbors in list(detector.linemate_graph.adjacency.items())[:5]:
+        print(f"  {team.upper()} {player}: {', '.join(sorted(neighbors))}")
+    print(f"  Larkin + Raymond linemates: "
+          f"{detector.are_linemates('Dylan Larkin', 'DET', 'Lucas Raymond', 'DET')}")
+
     print()
     print("="*60)
     print("Correlation detection ready!")
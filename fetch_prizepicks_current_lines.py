@@ -7,10 +7,11 @@ Fetch real-time player prop lines from PrizePicks API.
 Returns lines in format needed for market vs model comparison.
 """
 
-import requests
 import sqlite3
+import pandas as pd
 from datetime import datetime
 from typing import Dict, List
+from prizepicks_projections import CACHE_TTL_SECONDS, get_projections, parse_projections
 
 DB_PATH = "database/nhl_predictions.db"
 
@@ -18,45 +19,35 @@ DB_PATH = "database/nhl_predictions.db"
 class PrizePicksLinesFetcher:
     """Fetch current lines from PrizePicks API"""
 
-    def __init__(self):
-        self.base_url = "https://api.prizepicks.com/projections"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://app.prizepicks.com/',
-            'Origin': 'https://app.prizepicks.com'
-        }
+    def __init__(self, cache_ttl: float = CACHE_TTL_SECONDS):
+        """
+        Args:
+            cache_ttl: Seconds a PrizePicks snapshot is reused (shared with the
+                other PrizePicks clients, see prizepicks_projections.py)
+        """
+        self.cache_ttl = cache_ttl
 
-    def fetch_nhl_lines(self) -> Dict[str, Dict]:
+    def fetch_nhl_lines(self, force_refresh: bool = False) -> Dict[str, Dict]:
         """
         Fetch current NHL player prop lines from PrizePicks
 
         Returns:
-            Dict of {player_name: {prop_type: {line, stat_type}}}
+            Dict of {player_name: {prop_type: [{line, stat_type, team}, ...]}}
 
         Example:
             {
                 "Connor McDavid": {
-                    "points": {"line": 0.5, "stat_type": "Points"},
-                    "shots": {"line": 2.5, "stat_type": "Shots On Goal"}
+                    "points": [{"line": 0.5, "stat_type": "Points", "team": "EDM"}],
+                    "shots": [{"line": 2.5, "stat_type": "Shots On Goal", "team": "EDM"}]
                 }
             }
         """
-        params = {
-            'league_id': 8,  # NHL = 8
-            'per_page': 250,
-            'single_stat': 'true'
-        }
-
         try:
             print("Fetching current PrizePicks lines...")
-            response = requests.get(self.base_url, params=params, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            projections = get_projections('NHL', ttl=self.cache_ttl, force_refresh=force_refresh,
+                                          timeout=30)
 
-            # Parse API response
-            lines = self._parse_api_response(data)
+            lines = self._group_lines(projections)
 
             print(f"[SUCCESS] Fetched lines for {len(lines)} players")
             return lines
@@ -67,63 +58,27 @@ class PrizePicksLinesFetcher:
 
     def _parse_api_response(self, data: Dict) -> Dict[str, Dict]:
         """Parse PrizePicks API JSON response"""
+        return self._group_lines(parse_projections(data))
 
-        # Build player lookup dictionary from 'included' section
-        players = {}
-        included = data.get('included', [])
-
-        for item in included:
-            if item.get('type') == 'new_player':
-                player_id = item.get('id')
-                attrs = item.get('attributes', {})
-                players[player_id] = {
-                    'name': attrs.get('name', 'Unknown'),
-                    'team': attrs.get('team', 'UNK')
-                }
-
-        # Parse projections
-        lines_by_player = {}
-        projections = data.get('data', [])
-
-        for proj in projections:
-            attrs = proj.get('attributes', {})
-            relationships = proj.get('relationships', {})
+    def _group_lines(self, projections: pd.DataFrame) -> Dict[str, Dict]:
+        """Normalized projections -> lines grouped by player and prop (MULTIPLE lines possible per prop!)"""
 
-            # Get player info
-            player_rel = relationships.get('new_player', {}).get('data', {})
-            player_id = player_rel.get('id')
+        # Known players with a line and a stat type we track
+        prop_types = projections['stat_type'].map(self._map_stat_type)
+        keep = (
+            (projections['player_name'] != 'Unknown')
+            & (projections['line'].fillna(0) != 0)
+            & prop_types.notna()
+        )
 
-            if player_id not in players:
-                continue
-
-            player_info = players[player_id]
-            player_name = player_info['name']
-
-            # Get projection details
-            stat_type = attrs.get('stat_type', '')
-            line_score = attrs.get('line_score')
-
-            if not line_score or not stat_type:
-                continue
-
-            # Map PrizePicks stat types to our prop types
-            prop_type = self._map_stat_type(stat_type)
-
-            if not prop_type:
-                continue
-
-            # Store line (MULTIPLE lines possible per prop!)
-            if player_name not in lines_by_player:
-                lines_by_player[player_name] = {}
-
-            if prop_type not in lines_by_player[player_name]:
-                lines_by_player[player_name][prop_type] = []
-
-            # Add this line to the list
-            lines_by_player[player_name][prop_type].append({
-                'line': line_score,
+        lines_by_player = {}
+        for player_name, team, prop_type, line, stat_type in zip(
+                projections['player_name'][keep], projections['team'][keep], prop_types[keep],
+                projections['line'][keep], projections['stat_type'][keep]):
+            lines_by_player.setdefault(player_name, {}).setdefault(prop_type, []).append({
+                'line': line,
                 'stat_type': stat_type,
-                'team': player_info['team']
+                'team': team
             })
 
         return lines_by_player
@@ -0,0 +1,564 @@
+"""
+Vectorized Game Outcome Simulator
+
+Simulates every game on a slate at the box-score level so same-game stacks
+can be priced from joint outcomes instead of assumed independent. Each
+replication draws:
+
+    1. A shared game pace (gamma) - high-event games lift both teams
+    2. Team goals - Poisson around the expected goals times pace and a
+       team form factor (negative binomial overall)
+    3. Player goals - the team's goals split among its players by their
+       share of team scoring (sequential binomials = multinomial)
+    4. Player assists - each teammate goal assisted with the player's
+       per-goal assist rate
+    5. Player shots - goals plus extra shots around the player's shot rate
+
+Expected goals come from team_stats, adjusted to the money lines and O/U
+in odds_api_game_odds when available; player rates come from player_stats.
+All replications of a game are drawn at once with NumPy (50k replications
+of a game take well under a second).
+
+Usage:
+    from game_simulator import GameSimulator
+
+    simulator = GameSimulator.from_database(game_date='2025-11-03')
+    simulation = simulator.simulate([('TOR', 'BOS'), ('EDM', 'VAN')])
+
+    simulation.hit_rate([('Auston Matthews', 'points', 0.5),
+                         ('William Nylander', 'points', 0.5)])
+    pricer = simulation.joint_pricer(picks_df)   # for ParlayCandidateEngine
+"""
+
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from scipy.stats import poisson
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from correlation_detector import normalize_prop, season_for_date
+
+DB_PATH = "database/nhl_predictions.db"
+
+# Set bits per byte value (np.bitwise_count needs NumPy 2)
+POPCOUNT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+# League-average goals per team per game (used when team_stats is missing)
+LEAGUE_GOALS_PER_GAME = 3.05
+
+# Home-ice goal multiplier when no money line is available
+HOME_ICE_FACTOR = 1.04
+
+# Gamma shapes (higher = less extra variance than Poisson)
+GAME_PACE_SHAPE = 25.0
+TEAM_FORM_SHAPE = 40.0
+SHOT_RATE_SHAPE = 12.0
+
+# Tracked players can't account for every team goal / assist
+MAX_GOAL_SHARE = 0.95
+MAX_ASSIST_RATE = 0.90
+
+SIMULATED_PROPS = ('goals', 'assists', 'points', 'shots')
+
+
+def american_to_probability(odds: float) -> float:
+    """Implied probability of American odds (-150 -> 0.60)."""
+    if odds < 0:
+        return -odds / (-odds + 100)
+    return 100 / (odds + 100)
+
+
+def home_win_probability(lam_home: float, lam_away: float, max_goals: int = 20) -> float:
+    """P(home wins) for Poisson goals, regulation ties split evenly."""
+    goals = np.arange(max_goals + 1)
+    home = poisson.pmf(goals, lam_home)
+    away = poisson.pmf(goals, lam_away)
+    joint = np.outer(home, away)
+    return float(np.tril(joint, -1).sum() + np.trace(joint) / 2)
+
+
+class GameSimulator:
+    """
+    Box-score simulator over player and team scoring rates.
+
+    Holds per-player rates (team, goals/assists/shots per game), per-team
+    goals for/against and the day's game odds.
+    """
+
+    def __init__(self,
+                 players: pd.DataFrame,
+                 teams: Optional[pd.DataFrame] = None,
+                 odds: Optional[pd.DataFrame] = None,
+                 n_sims: int = 50000,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            players: player_name, team, goals_per_game, assists_per_game,
+                sog_per_game (player_stats layout)
+            teams: team, goals_per_game, goals_against_per_game (team_stats)
+            odds: away_team, home_team (abbreviations), home_ml, away_ml,
+                over_under - one row per game
+            n_sims: Replications per game
+            seed: Random seed
+        """
+        players = players.copy()
+        # Traded players list every team ('COL,CAR,DAL') - keep the current one
+        players['team'] = players['team'].astype(str).str.split(',').str[-1].str.strip()
+        players['key'] = players['player_name'].str.lower().str.strip()
+        self.players = players.drop_duplicates('key', keep='last').reset_index(drop=True)
+
+        self.teams = {}
+        if teams is not None:
+            for row in teams.itertuples(index=False):
+                self.teams[row.team] = (row.goals_per_game, row.goals_against_per_game)
+
+        self.odds = {}
+        if odds is not None:
+            for row in odds.itertuples(index=False):
+                self.odds[(row.away_team, row.home_team)] = row
+
+        self.n_sims = n_sims
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_database(cls,
+                      db_path: str = DB_PATH,
+                      game_date: Optional[str] = None,
+                      season: Optional[str] = None,
+                      n_sims: int = 50000,
+                      seed: Optional[int] = None) -> 'GameSimulator':
+        """
+        Load rates from player_stats / team_stats and odds from odds_api_game_odds.
+
+        Args:
+            game_date: Slate date (odds for this date; default today)
+            season: Season for player/team rates (default: season of game_date,
+                falling back to the latest season in player_stats)
+        """
+        game_date = game_date or pd.Timestamp.now().strftime('%Y-%m-%d')
+        conn = sqlite3.connect(db_path)
+        try:
+            seasons = [row[0] for row in conn.execute(
+                "SELECT DISTINCT season FROM player_stats ORDER BY season DESC")]
+            if season is None:
+                season = season_for_date(game_date)
+                if season not in seasons and seasons:
+                    season = seasons[0]
+
+            # Per-game columns aren't always filled - fall back to season totals
+            players = pd.read_sql_query("""
+                SELECT player_name, team,
+                       CASE WHEN goals_per_game > 0 THEN goals_per_game
+                            ELSE CAST(goals AS REAL) / games_played END AS goals_per_game,
+                       CASE WHEN assists_per_game > 0 THEN assists_per_game
+                            ELSE CAST(assists AS REAL) / games_played END AS assists_per_game,
+                       CASE WHEN sog_per_game > 0 THEN sog_per_game
+                            ELSE CAST(shots_on_goal AS REAL) / games_played END AS sog_per_game
+                FROM player_stats
+                WHERE season = ? AND games_played > 0
+            """, conn, params=(season,))
+
+            # Latest snapshot per team
+            teams = pd.read_sql_query("""
+                SELECT t.team, t.goals_per_game, t.goals_against_per_game
+                FROM team_stats t
+                JOIN (SELECT team, MAX(as_of_date) AS as_of_date
+                      FROM team_stats WHERE season = ? GROUP BY team) latest
+                  ON latest.team = t.team AND latest.as_of_date = t.as_of_date
+                WHERE t.season = ?
+            """, conn, params=(season, season))
+
+            try:
+                # odds_api_game_odds uses full team names
+                from nhl_teams import NHL_TEAM_MAP
+
+                odds = pd.read_sql_query("""
+                    SELECT home_team, away_team,
+                           AVG(home_ml) AS home_ml, AVG(away_ml) AS away_ml,
+                           AVG(over_under) AS over_under
+                    FROM odds_api_game_odds
+                    WHERE DATE(commence_time) = ?
+                    GROUP BY home_team, away_team
+                """, conn, params=(game_date,))
+                odds['home_team'] = odds['home_team'].map(lambda name: NHL_TEAM_MAP.get(name, name))
+                odds['away_team'] = odds['away_team'].map(lambda name: NHL_TEAM_MAP.get(name, name))
+            except (ImportError, sqlite3.OperationalError, pd.errors.DatabaseError):
+                print("[WARNING] odds_api_game_odds not available - using team_stats only")
+                odds = None
+        finally:
+            conn.close()
+
+        return cls(players, teams, odds, n_sims=n_sims, seed=seed)
+
+    def team_rates(self, team: str) -> Tuple[float, float]:
+        """(goals for, goals against) per game, league average if unknown."""
+        gf, ga = self.teams.get(team, (None, None))
+        return (gf if gf and gf > 0 else LEAGUE_GOALS_PER_GAME,
+                ga if ga and ga > 0 else LEAGUE_GOALS_PER_GAME)
+
+    def orient(self, team_a: str, team_b: str) -> Tuple[str, str, bool]:
+        """(away, home, home_known) for a matchup, using the odds when listed."""
+        if (team_a, team_b) in self.odds:
+            return team_a, team_b, True
+        if (team_b, team_a) in self.odds:
+            return team_b, team_a, True
+        return team_a, team_b, False
+
+    def expected_goals(self, away: str, home: str, home_known: bool = True) -> Tuple[float, float]:
+        """
+        Expected goals (away, home) for a game.
+
+        Starts from the average of each team's goals for and the opponent's
+        goals against, rescales to the O/U total and splits the total so the
+        Poisson home-win probability matches the no-vig money line.
+        """
+        gf_away, ga_away = self.team_rates(away)
+        gf_home, ga_home = self.team_rates(home)
+        lam_away = (gf_away + ga_home) / 2
+        lam_home = (gf_home + ga_away) / 2
+
+        odds = self.odds.get((away, home))
+        if odds is None:
+            if home_known:
+                lam_home *= HOME_ICE_FACTOR
+            return lam_away, lam_home
+
+        total = lam_away + lam_home
+        if pd.notna(odds.over_under) and odds.over_under > 0:
+            total = float(odds.over_under)
+            lam_away, lam_home = total * lam_away / (lam_away + lam_home), total * lam_home / (lam_away + lam_home)
+
+        if pd.notna(odds.home_ml) and pd.notna(odds.away_ml):
+            p_home = american_to_probability(odds.home_ml)
+            p_away = american_to_probability(odds.away_ml)
+            target = p_home / (p_home + p_away)
+
+            # Bisection on the home share of the total (win prob is monotone in it)
+            low, high = 0.2, 0.8
+            for _ in range(40):
+                share = (low + high) / 2
+                if home_win_probability(total * share, total * (1 - share)) < target:
+                    low = share
+                else:
+                    high = share
+            lam_home, lam_away = total * share, total * (1 - share)
+
+        return lam_away, lam_home
+
+    def _simulate_team(self, team: str, lam: float, pace: np.ndarray) -> Tuple[np.ndarray, pd.DataFrame, Dict]:
+        """Team goals and tracked players' goals / assists / shots for every replication."""
+        n = self.n_sims
+        rng = self.rng
+        form = rng.gamma(TEAM_FORM_SHAPE, 1 / TEAM_FORM_SHAPE, n)
+        goals = rng.poisson(lam * pace * form)
+
+        roster = self.players[self.players['team'] == team]
+        team_gpg = self.team_rates(team)[0]
+
+        gpg = roster['goals_per_game'].fillna(0).to_numpy(dtype=np.float64)
+        apg = roster['assists_per_game'].fillna(0).to_numpy(dtype=np.float64)
+        sog = roster['sog_per_game'].fillna(0).to_numpy(dtype=np.float64)
+
+        shares = gpg / team_gpg
+        if shares.sum() > MAX_GOAL_SHARE:
+            shares *= MAX_GOAL_SHARE / shares.sum()
+
+        stats = {prop: np.zeros((n, len(roster)), dtype=np.int16) for prop in SIMULATED_PROPS}
+        remaining = goals.copy()
+        remaining_share = 1.0
+        for i in range(len(roster)):
+            # Multinomial split as a chain of binomials over the goals left
+            scored = rng.binomial(remaining, min(shares[i] / remaining_share, 1.0))
+            remaining -= scored
+            remaining_share -= shares[i]
+
+            assist_rate = min(apg[i] / max(team_gpg - gpg[i], 1e-9), MAX_ASSIST_RATE)
+            assists = rng.binomial(goals - scored, assist_rate)
+
+            shot_rate = max(sog[i] - gpg[i], 0.0) * pace * rng.gamma(SHOT_RATE_SHAPE, 1 / SHOT_RATE_SHAPE, n)
+            shots = scored + rng.poisson(shot_rate)
+
+            stats['goals'][:, i] = scored
+            stats['assists'][:, i] = assists
+            stats['points'][:, i] = scored + assists
+            stats['shots'][:, i] = shots
+
+        return goals, roster, stats
+
+    def simulate(self, matchups: Iterable[Tuple[str, str]]) -> 'SlateSimulation':
+        """
+        Simulate every game on the slate.
+
+        Args:
+            matchups: (team, opponent) pairs in either order; home/away is
+                taken from the odds when the game is listed there
+
+        Returns:
+            SlateSimulation over all tracked players of those games
+        """
+        start = time.perf_counter()
+        seen = set()
+        games = []
+        for team_a, team_b in matchups:
+            if frozenset((team_a, team_b)) in seen:
+                continue
+            seen.add(frozenset((team_a, team_b)))
+            games.append(self.orient(team_a, team_b))
+
+        team_goals = np.zeros((self.n_sims, len(games), 2), dtype=np.int16)
+        expected = []
+        blocks = {prop: [] for prop in SIMULATED_PROPS}
+        keys, player_games, player_teams = [], [], []
+
+        for g, (away, home, home_known) in enumerate(games):
+            lam_away, lam_home = self.expected_goals(away, home, home_known)
+            expected.append((away, home, lam_away, lam_home))
+            pace = self.rng.gamma(GAME_PACE_SHAPE, 1 / GAME_PACE_SHAPE, self.n_sims)
+
+            for side, (team, lam) in enumerate(((away, lam_away), (home, lam_home))):
+                goals, roster, stats = self._simulate_team(team, lam, pace)
+                team_goals[:, g, side] = goals
+                for prop in SIMULATED_PROPS:
+                    blocks[prop].append(stats[prop])
+                keys.extend(roster['key'])
+                player_games.extend([g] * len(roster))
+                player_teams.extend([team] * len(roster))
+
+        stats = {
+            prop: (np.concatenate(blocks[prop], axis=1) if blocks[prop]
+                   else np.zeros((self.n_sims, 0), dtype=np.int16))
+            for prop in SIMULATED_PROPS
+        }
+        return SlateSimulation(
+            stats, keys, np.array(player_games, dtype=np.intp), player_teams,
+            team_goals, pd.DataFrame(expected, columns=['away', 'home', 'away_xg', 'home_xg']),
+            seconds=time.perf_counter() - start
+        )
+
+
+class SlateSimulation:
+    """
+    Simulated box scores for a slate (replications x tracked players).
+
+    Games are simulated independently, so any set of legs - same game or
+    not - can be priced by reading the same replication rows.
+    """
+
+    def __init__(self, stats: Dict[str, np.ndarray], player_keys: List[str],
+                 player_games: np.ndarray, player_teams: List[str],
+                 team_goals: np.ndarray, games: pd.DataFrame, seconds: float = 0.0):
+        self.stats = stats
+        self.columns = {key: i for i, key in enumerate(player_keys)}
+        self.player_games = player_games
+        self.player_teams = player_teams
+        self.team_goals = team_goals
+        self.games = games
+        self.seconds = seconds
+        self.n_sims = len(team_goals)
+
+    def leg_hits(self, player: str, prop: str, line: float,
+                 direction: str = 'OVER') -> Optional[np.ndarray]:
+        """Boolean hit per replication, None if the player / prop isn't simulated."""
+        prop = normalize_prop(prop)
+        column = self.columns.get(player.lower().strip())
+        if column is None or prop not in self.stats:
+            return None
+        values = self.stats[prop][:, column]
+        return values < line if direction.upper() == 'UNDER' else values > line
+
+    def hit_rate(self, legs: Sequence[Tuple]) -> Optional[float]:
+        """
+        Simulated probability that every leg hits.
+
+        Args:
+            legs: (player, prop, line) or (player, prop, line, direction)
+
+        Returns:
+            Hit rate, or None if any leg isn't simulated
+        """
+        hits = np.ones(self.n_sims, dtype=bool)
+        for leg in legs:
+            leg_hits = self.leg_hits(*leg)
+            if leg_hits is None:
+                return None
+            hits &= leg_hits
+        return float(hits.mean())
+
+    def hit_matrix(self, picks_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hit matrix for a pick table (replications x picks).
+
+        Returns:
+            (hits, simulated) - simulated[i] is False for picks whose player or
+            prop isn't simulated (their column is all True)
+        """
+        directions = picks_df['prediction'] if 'prediction' in picks_df.columns else ['OVER'] * len(picks_df)
+        hits = np.ones((self.n_sims, len(picks_df)), dtype=bool)
+        simulated = np.zeros(len(picks_df), dtype=bool)
+        for i, (player, prop, line, direction) in enumerate(zip(
+                picks_df['player_name'], picks_df['prop_type'], picks_df['line'], directions)):
+            leg_hits = self.leg_hits(player, prop, line, direction)
+            if leg_hits is not None:
+                hits[:, i] = leg_hits
+                simulated[i] = True
+        return hits, simulated
+
+    def joint_pricer(self, picks_df: pd.DataFrame) -> 'SimulatedJointPricer':
+        """Joint pricer over a pick table (see SimulatedJointPricer)."""
+        hits, simulated = self.hit_matrix(picks_df)
+        games = np.full(len(picks_df), -1, dtype=np.intp)
+        for i, player in enumerate(picks_df['player_name']):
+            column = self.columns.get(player.lower().strip())
+            if simulated[i]:
+                games[i] = self.player_games[column]
+        return SimulatedJointPricer(hits, games)
+
+
+class SimulatedJointPricer:
+    """
+    Parlay pricing from a simulated hit matrix (same interface as
+    joint_probability.GaussianCopula, usable by ParlayCandidateEngine).
+
+    Model probabilities stay the leg marginals; the simulation supplies the
+    dependence: joint = product(p) * P_sim(all hit) / product(P_sim(hit)).
+    Legs in different games (or not simulated) are independent, so those
+    rows keep the plain product.
+    """
+
+    def __init__(self, hits: np.ndarray, games: np.ndarray, chunk_words: int = 4_000_000):
+        """
+        Args:
+            hits: Boolean hit matrix (replications x picks)
+            games: Game index per pick (-1 = not simulated)
+            chunk_words: Combos x 64-bit words processed at once
+        """
+        self.n_sims = len(hits)
+        self.games = games
+        self.marginals = hits.mean(axis=0)
+        self.chunk_words = chunk_words
+
+        # One bitset per pick (replications packed into 64-bit words)
+        packed = np.packbits(hits, axis=0).T
+        padding = (-packed.shape[1]) % 8
+        packed = np.pad(packed, ((0, 0), (0, padding)))
+        self.bits = np.ascontiguousarray(packed).view(np.uint64)
+
+    def correlated_rows(self, combos: np.ndarray) -> np.ndarray:
+        """True where two simulated legs share a game."""
+        mask = np.zeros(len(combos), dtype=bool)
+        games = self.games[combos]
+        num_legs = combos.shape[1]
+        for a in range(num_legs):
+            for b in range(a + 1, num_legs):
+                mask |= (games[:, a] == games[:, b]) & (games[:, a] >= 0)
+        return mask
+
+    def joint_probabilities(self, combos: np.ndarray, probabilities: np.ndarray) -> np.ndarray:
+        """P(all legs hit) for each combo."""
+        combos = np.asarray(combos)
+        result = np.prod(probabilities[combos], axis=1)
+        rows = np.flatnonzero(self.correlated_rows(combos))
+        if len(rows) == 0:
+            return result
+
+        chunk = max(1, self.chunk_words // self.bits.shape[1])
+        counts = np.empty(len(rows))
+        for start in range(0, len(rows), chunk):
+            block = combos[rows[start:start + chunk]]
+            joint = self.bits[block[:, 0]]
+            for leg in range(1, block.shape[1]):
+                joint = joint & self.bits[block[:, leg]]
+            counts[start:start + chunk] = POPCOUNT_TABLE[joint.view(np.uint8)].sum(axis=1, dtype=np.int64)
+
+        independent = np.prod(self.marginals[combos[rows]], axis=1)
+        lift = np.where(independent > 0, counts / self.n_sims / np.maximum(independent, 1e-12), 1.0)
+        result[rows] = np.clip(result[rows] * lift, 0.0, 1.0)
+        return result
+
+
+def test_game_simulator():
+    """Check simulated rates against inputs and time a full slate."""
+    print("\n" + "="*80)
+    print("GAME SIMULATOR TEST")
+    print("="*80)
+    print()
+
+    rng = np.random.default_rng(5)
+    teams = ['TOR', 'BOS', 'EDM', 'VAN', 'COL', 'DAL', 'FLA', 'TBL', 'NYR', 'NJD', 'VGK', 'LAK']
+    players = pd.DataFrame([{
+        'player_name': f"{team} Player {i}",
+        'team': team,
+        'goals_per_game': rng.uniform(0.15, 0.6),
+        'assists_per_game': rng.uniform(0.2, 0.8),
+        'sog_per_game': rng.uniform(1.5, 4.0),
+    } for team in teams for i in range(6)])
+    team_stats = pd.DataFrame({'team': teams, 'goals_per_game': rng.uniform(2.7, 3.6, len(teams)),
+                               'goals_against_per_game': rng.uniform(2.7, 3.4, len(teams))})
+    odds = pd.DataFrame([{'away_team': 'TOR', 'home_team': 'BOS', 'home_ml': -150, 'away_ml': 130,
+                          'over_under': 6.5}])
+
+    simulator = GameSimulator(players, team_stats, odds, n_sims=50000, seed=1)
+    matchups = list(zip(teams[::2], teams[1::2]))
+    simulation = simulator.simulate(matchups)
+    all_pass = True
+
+    per_game = simulation.seconds / len(matchups)
+    ok = per_game < 1.0
+    all_pass &= ok
+    print(f"  {len(matchups)} games x 50,000 replications: {simulation.seconds:.2f}s "
+          f"({per_game:.3f}s per game) [{'PASS' if ok else 'FAIL'}]")
+
+    # Money line / total calibration (TOR @ BOS)
+    goals = simulation.team_goals[:, 0].astype(np.float64)
+    total = goals.sum(axis=1).mean()
+    home_win = np.mean(goals[:, 1] > goals[:, 0]) + np.mean(goals[:, 1] == goals[:, 0]) / 2
+    target = (150 / 250) / (150 / 250 + 100 / 230)
+    ok = abs(total - 6.5) < 0.1 and abs(home_win - target) < 0.02
+    all_pass &= ok
+    print(f"  TOR @ BOS: total {total:.2f} (O/U 6.5), home win {home_win:.3f} "
+          f"(no-vig ML {target:.3f}) [{'PASS' if ok else 'FAIL'}]")
+
+    # Player goal rates scale with the team's expected goals
+    key = 'edm player 0'
+    column = simulation.columns[key]
+    row = simulator.players[simulator.players['key'] == key].iloc[0]
+    lam = simulation.games.loc[1, 'away_xg']
+    expected = row['goals_per_game'] * lam / simulator.team_rates('EDM')[0]
+    simulated = simulation.stats['goals'][:, column].mean()
+    ok = abs(simulated - expected) < 0.02
+    all_pass &= ok
+    print(f"  EDM Player 0 goals/game: {simulated:.3f} vs expected {expected:.3f} [{'PASS' if ok else 'FAIL'}]")
+
+    # Teammate stacks hit together more often than independence implies
+    a = simulation.hit_rate([('EDM Player 0', 'points', 0.5)])
+    b = simulation.hit_rate([('EDM Player 1', 'points', 0.5)])
+    both = simulation.hit_rate([('EDM Player 0', 'points', 0.5), ('EDM Player 1', 'points', 0.5)])
+    ok = both > a * b
+    all_pass &= ok
+    print(f"  Teammate points stack: {both:.3f} vs independent {a * b:.3f} [{'PASS' if ok else 'FAIL'}]")
+
+    # Pricer: cross-game rows keep the product, same-game rows use the lift
+    picks = pd.DataFrame({
+        'player_name': ['EDM Player 0', 'EDM Player 1', 'TOR Player 0', 'Unknown Player'],
+        'prop_type': ['points', 'points', 'shots', 'points'],
+        'line': [0.5, 0.5, 2.5, 0.5],
+        'model_probability': [0.62, 0.58, 0.55, 0.60],
+    })
+    pricer = simulation.joint_pricer(picks)
+    combos = np.array([[0, 1], [0, 2], [1, 3]])
+    probabilities = picks['model_probability'].to_numpy()
+    priced = pricer.joint_probabilities(combos, probabilities)
+    product = np.prod(probabilities[combos], axis=1)
+    lift = both / (a * b)
+    ok = (np.isclose(priced[0], product[0] * lift) and
+          np.array_equal(priced[1:], product[1:]))
+    all_pass &= ok
+    print(f"  Pricer: same-game {priced[0]:.4f} (lift {lift:.3f}), cross-game and "
+          f"unsimulated legs unchanged [{'PASS' if ok else 'FAIL'}]")
+
+    print()
+    print("[PASS]" if all_pass else "[FAIL]")
+
+
+if __name__ == "__main__":
+    test_game_simulator()
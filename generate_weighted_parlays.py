@@ -8,16 +8,14 @@ import sqlite3
 from datetime import datetime
 from itertools import combinations
 import random
+from prizepicks_payouts import PrizePicksPayoutCalculator
 
 DB_PATH = "database/nhl_predictions.db"
 
-# Parlay odds (standard PrizePicks/betting site multipliers)
+# Parlay odds for all-standard parlays (from the shared PrizePicks payout table)
 PARLAY_ODDS = {
-    2: 3.0,   # 2-leg parlay = 3x payout
-    3: 6.0,   # 3-leg parlay = 6x payout
-    4: 10.0,  # 4-leg parlay = 10x payout
-    5: 20.0,  # 5-leg parlay = 20x payout
-    6: 40.0,  # 6-leg parlay = 40x payout
+    num_legs: PrizePicksPayoutCalculator.get_payout_for_odds_type(num_legs, 'standard')
+    for num_legs in range(2, 7)
 }
 
 
@@ -32,7 +30,7 @@ def get_todays_picks(min_prob=0.70):
     cursor.execute("""
         SELECT
             player_name, team, opponent, prop_type, line,
-            probability, expected_value, reasoning
+            probability, expected_value, reasoning, odds_type
         FROM predictions
         WHERE game_date = ?
         AND confidence_tier = 'T1-ELITE'
@@ -50,6 +48,7 @@ def get_todays_picks(min_prob=0.70):
             'probability': row[5],
             'ev': row[6],
             'reasoning': row[7],
+            'odds_type': (row[8] or 'standard').lower(),
             'type': 'shots'
         }
         for row in cursor.fetchall()
@@ -59,7 +58,7 @@ def get_todays_picks(min_prob=0.70):
     cursor.execute("""
         SELECT
             player_name, team, opponent, prop_type, line,
-            probability, expected_value, reasoning
+            probability, expected_value, reasoning, odds_type
         FROM predictions
         WHERE game_date = ?
         AND confidence_tier = 'T1-ELITE'
@@ -77,6 +76,7 @@ def get_todays_picks(min_prob=0.70):
             'probability': row[5],
             'ev': row[6],
             'reasoning': row[7],
+            'odds_type': (row[8] or 'standard').lower(),
             'type': 'points'
         }
         for row in cursor.fetchall()
@@ -95,10 +95,17 @@ def calculate_parlay_probability(picks):
     return prob
 
 
+def calculate_parlay_payout(picks):
+    """Payout multiplier for the parlay's odds_type mix (shared payout table)"""
+    return PrizePicksPayoutCalculator.calculate_parlay_payout(
+        [pick.get('odds_type', 'standard') for pick in picks]
+    )
+
+
 def calculate_parlay_ev(picks, parlay_size):
     """Calculate expected value of parlay"""
     combined_prob = calculate_parlay_probability(picks)
-    payout_multiplier = PARLAY_ODDS.get(parlay_size, 1.0)
+    payout_multiplier = calculate_parlay_payout(picks)
 
     # EV = (probability of win * payout) - 1
     ev = (combined_prob * payout_multiplier) - 1
@@ -164,7 +171,7 @@ def generate_weighted_parlays(shots_picks, points_picks, parlay_size=3, num_parl
                 'picks': picks,
                 'probability': prob,
                 'ev': ev,
-                'payout_multiplier': PARLAY_ODDS[parlay_size]
+                'payout_multiplier': calculate_parlay_payout(picks)
             })
 
     # Sort by EV (best value first)
@@ -9,6 +9,8 @@ import requests
 import json
 from datetime import datetime
 
+from player_identity import get_player_index
+
 DB_PATH = "database/nhl_predictions.db"
 
 
@@ -65,6 +67,7 @@ def fetch_player_stats(game_id):
 
             # Process both teams
             for team_key in ['awayTeam', 'homeTeam']:
+                team_abbrev = data.get(team_key, {}).get('abbrev')
                 if team_key in stats_data:
                     for position_group in ['forwards', 'defense', 'goalies']:
                         if position_group in stats_data[team_key]:
@@ -77,7 +80,8 @@ def fetch_player_stats(game_id):
                                         'points': player.get('points', 0),
                                         'shots': player.get('sog', 0),
                                         'blocks': player.get('blockedShots', 0),
-                                        'hits': player.get('hits', 0)
+                                        'hits': player.get('hits', 0),
+                                        'team': team_abbrev
                                     }
 
         return player_stats
@@ -87,29 +91,35 @@ def fetch_player_stats(game_id):
         return {}
 
 
-def find_player_in_stats(player_name, all_stats):
-    """Find player in stats with fuzzy matching"""
-    if player_name in all_stats:
-        return player_name
+def build_player_lookup(all_stats):
+    """
+    Resolve every boxscore name ("C. McDavid") to a player_id once.
+
+    Returns:
+        Dictionary of player_id -> boxscore name
+    """
+    names = list(all_stats)
+    return get_player_index(DB_PATH).lookup_table(names, [all_stats[n].get('team') for n in names])
 
-    # Try variations
-    variations = [
-        player_name,
-        player_name.replace('.', ''),
-        player_name.replace(' Jr.', ''),
-        player_name.replace(' III', ''),
-        player_name.split()[-1]  # Last name only
-    ]
 
-    for var in variations:
-        matching = [p for p in all_stats.keys() if var.lower() in p.lower()]
-        if matching:
-            return matching[0]
+def find_player_in_stats(player_name, all_stats, player_lookup, team=None):
+    """
+    Find player in stats via the player identity index.
+
+    Args:
+        player_lookup: build_player_lookup(all_stats), so each lookup is a
+            hash lookup instead of a substring scan
+    """
+    if player_name in all_stats:
+        return player_name
 
-    return None
+    player_id = get_player_index(DB_PATH).resolve(player_name, team)
+    if player_id is None:
+        return None
+    return player_lookup.get(player_id)
 
 
-def grade_predictions(date, all_player_stats):
+def grade_predictions(date, all_player_stats, player_lookup):
     """Grade all predictions for the date"""
     print()
     print("="*80)
@@ -145,7 +155,7 @@ def grade_predictions(date, all_player_stats):
     for pred_id, player_name, team, opp, prop_type, line, prediction, probability in predictions:
 
         # Find player in stats
-        matched_name = find_player_in_stats(player_name, all_player_stats)
+        matched_name = find_player_in_stats(player_name, all_player_stats, player_lookup, team)
 
         if not matched_name:
             not_found += 1
@@ -204,7 +214,7 @@ def grade_predictions(date, all_player_stats):
     return {'graded': graded, 'hits': hits, 'misses': misses, 'not_found': not_found}
 
 
-def grade_prizepicks_edges(date, all_player_stats):
+def grade_prizepicks_edges(date, all_player_stats, player_lookup):
     """Grade PrizePicks edge plays"""
     print()
     print("="*80)
@@ -240,7 +250,7 @@ def grade_prizepicks_edges(date, all_player_stats):
     for edge_id, player_name, team, opp, prop_type, line, probability, edge_pct in edges:
 
         # Find player in stats
-        matched_name = find_player_in_stats(player_name, all_player_stats)
+        matched_name = find_player_in_stats(player_name, all_player_stats, player_lookup, team)
 
         if not matched_name:
             not_found += 1
@@ -296,7 +306,7 @@ def grade_prizepicks_edges(date, all_player_stats):
     return {'graded': graded, 'hits': hits, 'misses': misses, 'not_found': not_found}
 
 
-def grade_gto_parlays(date, all_player_stats):
+def grade_gto_parlays(date, all_player_stats, player_lookup):
     """Grade GTO parlays"""
     print()
     print("="*80)
@@ -343,7 +353,7 @@ def grade_gto_parlays(date, all_player_stats):
             line = pick['line']
 
             # Find player in stats
-            matched_name = find_player_in_stats(player_name, all_player_stats)
+            matched_name = find_player_in_stats(player_name, all_player_stats, player_lookup, pick.get('team'))
 
             if not matched_name:
                 legs_not_found += 1
@@ -438,21 +448,22 @@ def grade_all(date):
             all_player_stats.update(game_stats)
 
     print(f"[INFO] Loaded stats for {len(all_player_stats)} players")
+    player_lookup = build_player_lookup(all_player_stats)
 
     # Grade predictions
     print()
     print("[STEP 3] Grading predictions...")
-    pred_results = grade_predictions(date, all_player_stats)
+    pred_results = grade_predictions(date, all_player_stats, player_lookup)
 
     # Grade PrizePicks edges
     print()
     print("[STEP 4] Grading PrizePicks edges...")
-    edge_results = grade_prizepicks_edges(date, all_player_stats)
+    edge_results = grade_prizepicks_edges(date, all_player_stats, player_lookup)
 
     # Grade GTO parlays
     print()
     print("[STEP 5] Grading GTO parlays...")
-    parlay_results = grade_gto_parlays(date, all_player_stats)
+    parlay_results = grade_gto_parlays(date, all_player_stats, player_lookup)
 
     # Final summary
     print()
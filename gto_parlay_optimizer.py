@@ -9,11 +9,17 @@ import sqlite3
 import pandas as pd
 import numpy as np
 import json
-from itertools import combinations
-from typing import List, Tuple, Dict
+from math import comb
+from typing import List, Tuple
 from collections import defaultdict
 from datetime import datetime
 from prizepicks_payouts import PrizePicksPayoutCalculator
+from parlay_engine import (ParlayCandidateEngine, ParlayCandidateStore, ShardedCandidateScorer,
+                           frequency_contributions, lazy_greedy_select)
+from candidate_index import CandidateIndex
+from bankroll_manager import BankrollManager
+from joint_probability import GaussianCopula, slate_correlation_matrix
+from player_identity import get_player_index
 
 DB_PATH = "database/nhl_predictions.db"
 
@@ -24,7 +30,8 @@ class GTOParleyOptimizer:
     Uses GTO-style frequency allocation similar to poker solvers.
     """
 
-    def __init__(self, picks_df: pd.DataFrame, min_profitable_ev: float = 0.0):
+    def __init__(self, picks_df: pd.DataFrame, min_profitable_ev: float = 0.0,
+                 price_correlated: bool = False, simulation=None):
         """
         Initialize with picks dataframe.
 
@@ -41,16 +48,33 @@ class GTOParleyOptimizer:
 
         Args:
             min_profitable_ev: Minimum EV threshold for parlay inclusion (default 0.0 = breakeven)
+            price_correlated: Price same-game / same-team parlays with a Gaussian
+                copula over the empirical prop correlations instead of excluding
+                them (exhaustive search, single process, no incremental index)
+            simulation: Optional game_simulator.SlateSimulation for the slate -
+                correlated legs are priced from the simulated box scores instead
+                of the copula (implies price_correlated)
         """
         self.picks_df = picks_df.copy()
         self.min_profitable_ev = min_profitable_ev
-        self.parlays_2leg = []
-        self.parlays_3leg = []
-        self.parlays_4leg = []
-        self.filtered_parlays_2leg = []
-        self.filtered_parlays_3leg = []
-        self.filtered_parlays_4leg = []
-        self.selected_parlays = []
+        self.price_correlated = price_correlated or simulation is not None
+
+        # Candidate pools and the final selection are columnar stores
+        # (leg indices + float32 metrics); leg details come from picks_df
+        self.filtered_parlays_2leg = ParlayCandidateStore.empty()
+        self.filtered_parlays_3leg = ParlayCandidateStore.empty()
+        self.filtered_parlays_4leg = ParlayCandidateStore.empty()
+        self.filtered_parlays_5leg = ParlayCandidateStore.empty()
+        self.filtered_parlays_6leg = ParlayCandidateStore.empty()
+        self.selected_parlays = ParlayCandidateStore.empty()
+
+        # Vectorized scorer over the pick table (built once per slate)
+        copula = None
+        if simulation is not None:
+            copula = simulation.joint_pricer(self.picks_df)
+        elif price_correlated:
+            copula = GaussianCopula(slate_correlation_matrix(self.picks_df))
+        self.engine = ParlayCandidateEngine(self.picks_df, min_profitable_ev, copula=copula)
 
         # Calculate target frequencies for each pick (GTO-style)
         self._calculate_pick_frequencies()
@@ -86,6 +110,10 @@ class GTOParleyOptimizer:
         self.picks_df['target_frequency'] = self.picks_df['ev_score'].apply(frequency_for_ev)
         self.picks_df['actual_frequency'] = 0  # Track actual appearances
 
+        # Array copies used by selection (picks_df columns mirror them for display)
+        self.target_frequency = self.picks_df['target_frequency'].to_numpy(dtype=np.float64)
+        self.actual_frequency = np.zeros(len(self.picks_df), dtype=np.int64)
+
         print("\n" + "="*80)
         print("PICK FREQUENCY ALLOCATION (GTO-Style)")
         print("="*80)
@@ -109,9 +137,9 @@ class GTOParleyOptimizer:
             return int(-100 / (decimal_odds - 1))
 
     def calculate_parlay_probability(self, pick_indices: List[int]) -> float:
-        """Calculate combined probability for a parlay."""
-        probs = self.picks_df.iloc[list(pick_indices)]['model_probability'].values
-        return np.prod(probs)
+        """Calculate combined probability for a parlay (copula-priced when price_correlated)."""
+        combo = np.array([list(pick_indices)], dtype=np.intp)
+        return float(self.engine.parlay_probabilities(combo)[0])
 
     def calculate_parlay_payout(self, pick_indices: List[int]) -> float:
         """
@@ -158,231 +186,209 @@ class GTOParleyOptimizer:
         Similar to GTO solver balancing range frequencies.
         Higher score = better for achieving frequency targets.
         """
-        score = 0
-        for idx in pick_indices:
-            current_freq = self.picks_df.iloc[idx]['actual_frequency']
-            target_freq = self.picks_df.iloc[idx]['target_frequency']
-
-            # Reward parlays that help under-represented picks
-            if current_freq < target_freq:
-                # How much we need this pick (0 to 1 scale)
-                need_factor = (target_freq - current_freq) / target_freq
-                score += need_factor
-            else:
-                # Penalize over-represented picks
-                over_factor = (current_freq - target_freq) / target_freq
-                score -= over_factor * 0.5  # Penalty is less severe
-
-        return score / len(pick_indices)  # Normalize by parlay size
+        indices = list(pick_indices)
+        contributions = frequency_contributions(
+            self.actual_frequency[indices], self.target_frequency[indices]
+        )
+        return float(contributions.mean())  # Normalize by parlay size
 
     def is_correlated(self, pick_indices: List[int]) -> bool:
         """
-        Check if picks are correlated (same game).
-        Correlated parlays reduce true EV.
-        """
-        picks = self.picks_df.iloc[list(pick_indices)]
-        games = picks['game_id'].values
-        teams = picks['team'].values
-
-        # Same game = correlated
-        if len(set(games)) < len(games):
-            return True
+        Check if picks are correlated (same game or same team).
+        Correlated parlays reduce true EV. With price_correlated only a
+        repeated player counts - other correlations are priced instead.
 
-        # Same team = correlated
-        if len(set(teams)) < len(teams):
-            return True
-
-        return False
+        Uses the slate's precomputed conflict matrix (a few bit operations).
+        """
+        return not self.engine.conflicts.is_independent(pick_indices)
 
     def generate_candidate_parlays(self,
                                    num_2leg: int = 100,
                                    num_3leg: int = 100,
                                    num_4leg: int = 50,
                                    min_parlay_ev: float = 0.0,
-                                   max_combinations: int = 50000):
+                                   max_combinations: int = None,
+                                   search_mode: str = 'exhaustive',
+                                   num_5leg: int = 0,
+                                   num_6leg: int = 0,
+                                   workers: int = 1,
+                                   incremental_date: str = None):
         """
-        Generate candidate parlays with combination limits.
+        Generate candidate parlays by scoring every combination in NumPy blocks.
+
+        Every 2-6 leg combo is scored by the vectorized engine and streamed
+        through a fixed-size top-K buffer: the best num_Xleg * 3 uncorrelated,
+        profitable combos of each size are kept as the selection pool, so
+        memory stays flat even for the 5/6-leg spaces.
+
+        search_mode='branch_and_bound' returns the same pool without
+        enumerating the full space: legs are searched in probability order
+        and subtrees whose EV upper bound cannot reach the pool are pruned.
 
         Args:
-            num_2leg: Max number of 2-leg parlays to consider
-            num_3leg: Max number of 3-leg parlays to consider
-            num_4leg: Max number of 4-leg parlays to consider
+            num_2leg: Pool size target for 2-leg parlays (keeps top num_2leg * 3 by EV)
+            num_3leg: Pool size target for 3-leg parlays (keeps top num_3leg * 3 by EV)
+            num_4leg: Pool size target for 4-leg parlays (keeps top num_4leg * 3 by EV)
             min_parlay_ev: Minimum EV threshold for parlay inclusion
-            max_combinations: Maximum combinations to process per leg size (prevents hanging)
+            max_combinations: Optional cap on combinations scored per leg size (None = all,
+                exhaustive mode only)
+            search_mode: 'exhaustive' (score every combo) or 'branch_and_bound'
+                (exact top-K by EV with pruning; scales to 150+ picks)
+            num_5leg: Pool size target for 5-leg parlays (0 = skip)
+            num_6leg: Pool size target for 6-leg parlays (0 = skip)
+            workers: Exhaustive mode only - shard the combination space by
+                first leg across this many processes (same output as 1)
+            incremental_date: Reuse and update the persisted candidate index
+                for this date - only combos touching added, removed or changed
+                legs since the last run are rescored (same pools as a rebuild)
         """
+        if search_mode not in ('exhaustive', 'branch_and_bound'):
+            raise ValueError(f"Unknown search_mode: {search_mode}")
+        if max_combinations is not None and (workers > 1 or incremental_date is not None):
+            raise ValueError("max_combinations is only supported with workers=1 and no incremental_date")
+        if self.price_correlated and (search_mode != 'exhaustive' or workers > 1 or
+                                      incremental_date is not None):
+            raise ValueError("price_correlated requires search_mode='exhaustive', workers=1 "
+                             "and no incremental_date")
+
         n_picks = len(self.picks_df)
 
         if n_picks < 2:
             print("[WARNING] Need at least 2 picks to generate parlays")
             return
 
-        # Generate 2-leg parlays
-        print(f"\n[*] Generating 2-leg parlay candidates...")
-        print(f"    Possible combinations: {n_picks * (n_picks - 1) // 2}")
-        profitable_count = 0
-        processed_count = 0
-
-        for combo in combinations(range(n_picks), 2):
-            processed_count += 1
-
-            # Early stop if we have enough profitable parlays
-            if len(self.filtered_parlays_2leg) >= num_2leg * 3:
-                print(f"    Early stop: Found {len(self.filtered_parlays_2leg)} profitable parlays")
-                break
-
-            # Hard limit to prevent infinite loops
-            if processed_count >= max_combinations:
-                print(f"    Hit max combination limit ({max_combinations})")
-                break
-
-            if self.is_correlated(combo):
-                continue  # Skip correlated picks
-
-            parlay_ev = self.calculate_parlay_ev(combo)
-            actual_payout = self.calculate_parlay_payout(combo)
-            breakeven_payout = self.calculate_breakeven_payout(combo)
-            is_profitable = self.is_parlay_profitable(combo)
-
-            parlay_data = {
-                'picks': combo,
-                'pick_names': [self.picks_df.iloc[i]['player_name'] for i in combo],
-                'pick_types': [self.picks_df.iloc[i]['prop_type'] for i in combo],
-                'pick_lines': [self.picks_df.iloc[i]['line'] for i in combo],
-                'pick_evs': [self.picks_df.iloc[i]['ev_score'] for i in combo],
-                'ev': parlay_ev,
-                'probability': self.calculate_parlay_probability(combo),
-                'actual_payout': actual_payout,
-                'breakeven_payout': breakeven_payout,
-                'is_profitable': is_profitable,
-                'frequency_score': 0  # Will calculate during optimization
-            }
-
-            self.parlays_2leg.append(parlay_data)
-
-            if is_profitable and parlay_ev >= min_parlay_ev:
-                self.filtered_parlays_2leg.append(parlay_data)
-                profitable_count += 1
-
-        print(f"  Processed {processed_count} combinations")
-        print(f"  Total 2-leg saved: {len(self.parlays_2leg)}")
-        print(f"  Profitable (EV > {min_parlay_ev:.1%}): {profitable_count}")
-
-        # Generate 3-leg parlays (if enough picks)
-        if n_picks >= 3:
-            print(f"\n[*] Generating 3-leg parlay candidates...")
-            print(f"    Possible combinations: {n_picks * (n_picks - 1) * (n_picks - 2) // 6}")
-            profitable_count = 0
-            processed_count = 0
-
-            for combo in combinations(range(n_picks), 3):
-                processed_count += 1
-
-                # Early stop if we have enough profitable parlays
-                if len(self.filtered_parlays_3leg) >= num_3leg * 3:
-                    print(f"    Early stop: Found {len(self.filtered_parlays_3leg)} profitable parlays")
-                    break
-
-                # Hard limit to prevent infinite loops
-                if processed_count >= max_combinations:
-                    print(f"    Hit max combination limit ({max_combinations})")
-                    break
-
-                # Progress update for large datasets
-                if processed_count % 10000 == 0:
-                    print(f"    Processed {processed_count} combos, found {profitable_count} profitable...")
-
-                if self.is_correlated(combo):
-                    continue
+        pool_sizes = {2: num_2leg * 3, 3: num_3leg * 3, 4: num_4leg * 3,
+                      5: num_5leg * 3, 6: num_6leg * 3}
+
+        # Previous run's scored candidates for this date (diffed against these picks)
+        index = None
+        if incremental_date is not None:
+            index = CandidateIndex.load(incremental_date, self.picks_df,
+                                        min_parlay_ev, self.min_profitable_ev)
 
-                parlay_ev = self.calculate_parlay_ev(combo)
-                actual_payout = self.calculate_parlay_payout(combo)
-                breakeven_payout = self.calculate_breakeven_payout(combo)
-                is_profitable = self.is_parlay_profitable(combo)
-
-                parlay_data = {
-                    'picks': combo,
-                    'pick_names': [self.picks_df.iloc[i]['player_name'] for i in combo],
-                    'pick_types': [self.picks_df.iloc[i]['prop_type'] for i in combo],
-                    'pick_lines': [self.picks_df.iloc[i]['line'] for i in combo],
-                    'pick_evs': [self.picks_df.iloc[i]['ev_score'] for i in combo],
-                    'ev': parlay_ev,
-                    'probability': self.calculate_parlay_probability(combo),
-                    'actual_payout': actual_payout,
-                    'breakeven_payout': breakeven_payout,
-                    'is_profitable': is_profitable,
-                    'frequency_score': 0
-                }
-
-                self.parlays_3leg.append(parlay_data)
-
-                if is_profitable and parlay_ev >= min_parlay_ev:
-                    self.filtered_parlays_3leg.append(parlay_data)
-                    profitable_count += 1
-
-            print(f"  Processed {processed_count} combinations")
-            print(f"  Total 3-leg saved: {len(self.parlays_3leg)}")
-            print(f"  Profitable (EV > {min_parlay_ev:.1%}): {profitable_count}")
-
-        # Generate 4-leg parlays (if enough picks)
-        if n_picks >= 4:
-            print(f"\n[*] Generating 4-leg parlay candidates...")
-            print(f"    Possible combinations: {n_picks * (n_picks - 1) * (n_picks - 2) * (n_picks - 3) // 24}")
-            profitable_count = 0
-            processed_count = 0
-
-            for combo in combinations(range(n_picks), 4):
-                processed_count += 1
-
-                # Early stop if we have enough profitable parlays
-                if len(self.filtered_parlays_4leg) >= num_4leg * 3:
-                    print(f"    Early stop: Found {len(self.filtered_parlays_4leg)} profitable parlays")
-                    break
-
-                # Hard limit to prevent infinite loops (reduced for 4-leg due to exponential growth)
-                if processed_count >= max_combinations:
-                    print(f"    Hit max combination limit ({max_combinations})")
-                    break
-
-                # Progress update for large datasets
-                if processed_count % 10000 == 0:
-                    print(f"    Processed {processed_count} combos, found {profitable_count} profitable...")
-
-                if self.is_correlated(combo):
+        # Worker pool + shared pick arrays, reused across leg sizes
+        scorer = None
+        if search_mode == 'exhaustive' and workers > 1:
+            scorer = ShardedCandidateScorer(self.engine, workers=workers)
+            print(f"[*] Sharding candidate scoring across {workers} processes")
+
+        try:
+            for num_legs, pool_size in pool_sizes.items():
+                if n_picks < num_legs or pool_size <= 0:
                     continue
 
-                parlay_ev = self.calculate_parlay_ev(combo)
-                actual_payout = self.calculate_parlay_payout(combo)
-                breakeven_payout = self.calculate_breakeven_payout(combo)
-                is_profitable = self.is_parlay_profitable(combo)
-
-                parlay_data = {
-                    'picks': combo,
-                    'pick_names': [self.picks_df.iloc[i]['player_name'] for i in combo],
-                    'pick_types': [self.picks_df.iloc[i]['prop_type'] for i in combo],
-                    'pick_lines': [self.picks_df.iloc[i]['line'] for i in combo],
-                    'pick_evs': [self.picks_df.iloc[i]['ev_score'] for i in combo],
-                    'ev': parlay_ev,
-                    'probability': self.calculate_parlay_probability(combo),
-                    'actual_payout': actual_payout,
-                    'breakeven_payout': breakeven_payout,
-                    'is_profitable': is_profitable,
-                    'frequency_score': 0
-                }
-
-                self.parlays_4leg.append(parlay_data)
-
-                if is_profitable and parlay_ev >= min_parlay_ev:
-                    self.filtered_parlays_4leg.append(parlay_data)
-                    profitable_count += 1
-
-            print(f"  Processed {processed_count} combinations")
-            print(f"  Total 4-leg saved: {len(self.parlays_4leg)}")
-            print(f"  Profitable (EV > {min_parlay_ev:.1%}): {profitable_count}")
+                print(f"\n[*] Generating {num_legs}-leg parlay candidates...")
+                print(f"    Possible combinations: {comb(n_picks, num_legs)}")
+
+                def full_search(top_k, num_legs=num_legs):
+                    if search_mode == 'branch_and_bound':
+                        return self.engine.search_top_k(
+                            num_legs,
+                            top_k=top_k,
+                            min_parlay_ev=min_parlay_ev
+                        )
+                    if scorer is not None:
+                        return scorer.top_k(
+                            num_legs,
+                            top_k=top_k,
+                            min_parlay_ev=min_parlay_ev
+                        )
+                    return self.engine.stream_top_k(
+                        num_legs,
+                        top_k=top_k,
+                        min_parlay_ev=min_parlay_ev,
+                        max_combinations=max_combinations
+                    )
+
+                if index is not None:
+                    result = index.top_k(self.engine, num_legs, pool_size,
+                                         min_parlay_ev, search_mode, full_search)
+                    if result['incremental']:
+                        print(f"  Reused {result['reused']} indexed candidates, "
+                              f"rescored combos touching changed legs")
+                else:
+                    result = full_search(pool_size)
+
+                    if max_combinations is not None and result['processed'] >= max_combinations:
+                        print(f"    Hit max combination limit ({max_combinations})")
+
+                # Pool is already ranked by EV (ties keep combination order)
+                pool = ParlayCandidateStore.from_result(result)
+                pool.score_play_types(self.engine)  # Power + Flex EV / variance
+                setattr(self, f'filtered_parlays_{num_legs}leg', pool)
+
+                rate = result['processed'] / max(result['seconds'], 1e-9)
+                print(f"  Processed {result['processed']} combinations in {result['seconds']:.2f}s ({rate:,.0f}/s)")
+                if result['uncorrelated'] is not None:
+                    print(f"  Uncorrelated: {result['uncorrelated']}")
+                    print(f"  Profitable (EV > {min_parlay_ev:.1%}): {result['profitable']}")
+                if result.get('peak_rss_mb') is not None:
+                    print(f"  Process peak RSS so far: {result['peak_rss_mb']:.0f} MB")
+                print(f"  Kept top {len(pool)} by EV for selection")
+        finally:
+            if scorer is not None:
+                scorer.close()
+
+        if index is not None:
+            index.save()
+            print(f"\n[*] Candidate index ({incremental_date}): {index.summary()}")
+
+    def rank_play_types(self, top_n: int = 15) -> pd.DataFrame:
+        """
+        Rank the Power Play and Flex Play variants of every candidate side by side.
+
+        Each candidate appears once per play type it supports (Flex needs
+        3+ legs), ordered by EV. Pick names are resolved only for the rows
+        printed.
+
+        Args:
+            top_n: Number of variants to print
+
+        Returns:
+            DataFrame of all variants: Legs, Play_Type, EV, Std_Dev,
+            Power_EV, Flex_EV, Pool_Row (row in the concatenated pools)
+        """
+        pools = ParlayCandidateStore.concat([
+            getattr(self, f'filtered_parlays_{num_legs}leg') for num_legs in range(2, 7)
+        ])
+        if not len(pools):
+            print("[WARNING] No candidates to rank. Run generate_candidate_parlays() first.")
+            return pd.DataFrame()
+
+        ranking = pools.play_type_ranking()
+        rows = ranking['row']
+        df = pd.DataFrame({
+            'Legs': pools.num_legs[rows],
+            'Play_Type': ranking['play_type'],
+            'EV': ranking['ev'],
+            'Std_Dev': np.sqrt(ranking['variance']),
+            'Power_EV': pools['ev'][rows],
+            'Flex_EV': pools['flex_ev'][rows],
+            'Pool_Row': rows,
+        })
+
+        print("\n" + "="*80)
+        print("POWER vs FLEX PLAY (all candidates)")
+        print("="*80)
+        flex_better = np.nan_to_num(pools['flex_ev'], nan=-np.inf) > pools['ev']
+        print(f"Flex beats Power on {flex_better.sum()} of {len(pools)} candidates")
+        print()
+        for _, variant in df.head(top_n).iterrows():
+            legs = pools.resolve_legs(variant['Pool_Row'], self.picks_df)
+            names = ", ".join(f"{name} {prop} {line}" for name, prop, line in
+                              zip(legs['player_name'], legs['prop_type'], legs['line']))
+            print(f"  {variant['Legs']}-leg {variant['Play_Type'].upper():5} "
+                  f"EV {variant['EV']:+.1%} (SD {variant['Std_Dev']:.2f})  {names}")
+        print()
+
+        return df
 
     def optimize_parlay_selection(self,
                                   target_2leg: int = 10,
                                   target_3leg: int = 5,
-                                  target_4leg: int = 3):
+                                  target_4leg: int = 3,
+                                  target_5leg: int = 0,
+                                  target_6leg: int = 0):
         """
         Select optimal parlays using GTO-style frequency balancing.
 
@@ -395,6 +401,8 @@ class GTOParleyOptimizer:
             target_2leg: Number of 2-leg parlays to select
             target_3leg: Number of 3-leg parlays to select
             target_4leg: Number of 4-leg parlays to select
+            target_5leg: Number of 5-leg parlays to select
+            target_6leg: Number of 6-leg parlays to select
         """
         print("\n" + "="*80)
         print("GTO PARLAY OPTIMIZATION")
@@ -403,42 +411,26 @@ class GTOParleyOptimizer:
 
         selected = []
 
-        # Select 2-leg parlays
-        if self.filtered_parlays_2leg:
-            print(f"[*] Selecting {target_2leg} optimal 2-leg parlays...")
-            selected_2leg = self._select_parlays_greedy(
-                self.filtered_parlays_2leg,
-                target_2leg
-            )
-            selected.extend([{**p, 'legs': 2} for p in selected_2leg])
-            print(f"  Selected {len(selected_2leg)} parlays")
-
-        # Select 3-leg parlays
-        if self.filtered_parlays_3leg:
-            print(f"[*] Selecting {target_3leg} optimal 3-leg parlays...")
-            selected_3leg = self._select_parlays_greedy(
-                self.filtered_parlays_3leg,
-                target_3leg
-            )
-            selected.extend([{**p, 'legs': 3} for p in selected_3leg])
-            print(f"  Selected {len(selected_3leg)} parlays")
-
-        # Select 4-leg parlays
-        if self.filtered_parlays_4leg:
-            print(f"[*] Selecting {target_4leg} optimal 4-leg parlays...")
-            selected_4leg = self._select_parlays_greedy(
-                self.filtered_parlays_4leg,
-                target_4leg
-            )
-            selected.extend([{**p, 'legs': 4} for p in selected_4leg])
-            print(f"  Selected {len(selected_4leg)} parlays")
+        targets = {2: target_2leg, 3: target_3leg, 4: target_4leg,
+                   5: target_5leg, 6: target_6leg}
+
+        for num_legs, target in targets.items():
+            candidates = getattr(self, f'filtered_parlays_{num_legs}leg')
+            if not candidates or target <= 0:
+                continue
 
-        self.selected_parlays = selected
+            print(f"[*] Selecting {target} optimal {num_legs}-leg parlays...")
+            chosen = self._select_parlays_greedy(candidates, target)
+            selected.append(chosen)
+            print(f"  Selected {len(chosen)} parlays")
 
-        print(f"\n[SUCCESS] Total parlays selected: {len(selected)}")
+        self.selected_parlays = ParlayCandidateStore.concat(selected)
+
+        print(f"\n[SUCCESS] Total parlays selected: {len(self.selected_parlays)}")
         print()
 
-    def _select_parlays_greedy(self, candidates: List[Dict], target_count: int) -> List[Dict]:
+    def _select_parlays_greedy(self, candidates: ParlayCandidateStore,
+                               target_count: int) -> ParlayCandidateStore:
         """
         Greedy selection algorithm for parlay optimization.
 
@@ -446,33 +438,28 @@ class GTOParleyOptimizer:
         1. EV (higher is better)
         2. Frequency balancing (helps under-represented picks)
         """
-        if not candidates:
-            return []
-
-        selected = []
-        remaining = candidates.copy()
-
-        for _ in range(min(target_count, len(remaining))):
-            # Calculate frequency score for each remaining parlay
-            for parlay in remaining:
-                parlay['frequency_score'] = self.calculate_frequency_score(parlay['picks'])
-
-            # Sort by composite score (EV + frequency balance)
-            # Weight: 70% EV, 30% frequency balance
-            remaining.sort(
-                key=lambda p: (p['ev'] * 0.7) + (p['frequency_score'] * 0.3),
-                reverse=True
-            )
+        if not len(candidates):
+            return ParlayCandidateStore.empty()
+
+        legs = candidates.leg_matrix()
+        evs = candidates['ev'].astype(np.float64)
+
+        # Weight: 70% EV, 30% frequency balance (updates self.actual_frequency)
+        chosen = lazy_greedy_select(
+            legs, evs,
+            self.target_frequency,
+            self.actual_frequency,
+            target_count,
+            ev_weight=0.7,
+            frequency_weight=0.3
+        )
 
-            # Select best parlay
-            best = remaining.pop(0)
-            selected.append(best)
+        rows = [row for row, _ in chosen]
+        candidates['frequency_score'][rows] = [score for _, score in chosen]
 
-            # Update actual frequencies
-            for idx in best['picks']:
-                self.picks_df.at[idx, 'actual_frequency'] += 1
+        self.picks_df['actual_frequency'] = self.actual_frequency
 
-        return selected
+        return candidates.take(rows)
 
     def kelly_criterion(self, prob: float, payout: float, bankroll: float,
                        fraction: float = 0.25) -> float:
@@ -517,7 +504,10 @@ class GTOParleyOptimizer:
         return (1 + target_ev) / probability
 
     def generate_betting_recommendations(self, bankroll: float = 1000,
-                                        kelly_fraction: float = 0.25):
+                                        kelly_fraction: float = 0.25,
+                                        sizing: str = 'independent',
+                                        bankroll_manager: BankrollManager = None,
+                                        time_budget: float = 1.0):
         """
         Generate betting recommendations with MINIMUM PAYOUT thresholds.
         User validates actual payout on PrizePicks before betting.
@@ -525,11 +515,41 @@ class GTOParleyOptimizer:
         Args:
             bankroll: Total bankroll in dollars
             kelly_fraction: Fraction of Kelly to use (0.25 = quarter Kelly)
+            sizing: 'independent' (Kelly per parlay) or 'portfolio'
+                (simultaneous Kelly over all selected parlays, accounting for
+                shared legs)
+            bankroll_manager: BankrollManager whose max_bet_pct, max_daily_risk_pct
+                and open exposure for today cap portfolio sizing (default: one
+                on DB_PATH)
+            time_budget: Seconds allowed for portfolio sizing
         """
-        if not self.selected_parlays:
+        if not len(self.selected_parlays):
             print("[WARNING] No parlays selected. Run optimize_parlay_selection() first.")
             return
 
+        if sizing not in ('independent', 'portfolio'):
+            raise ValueError(f"Unknown sizing: {sizing}")
+
+        portfolio_bets = None
+        if sizing == 'portfolio':
+            if bankroll_manager is None:
+                bankroll_manager = BankrollManager(db_path=DB_PATH)
+            sizes = bankroll_manager.get_portfolio_bet_sizes(
+                self.selected_parlays.picks,
+                self.engine.probabilities,
+                self.selected_parlays['actual_payout'],
+                time_budget=time_budget,
+                bankroll=bankroll,
+                kelly_fraction=kelly_fraction
+            )
+            portfolio_bets = sizes['recommended_bets']
+            print(f"[*] Portfolio Kelly sizing: independent Kelly total "
+                  f"${sizes['independent_bets'].sum():.2f}, portfolio total: ${portfolio_bets.sum():.2f}")
+            print(f"    Already at risk today: ${sizes['daily_risk_used']:.2f}, "
+                  f"daily budget remaining: ${sizes['daily_risk_remaining']:.2f}")
+            for warning in sizes['warnings']:
+                print(f"[WARNING] {warning}")
+
         print("\n" + "="*80)
         print(f"BETTING RECOMMENDATIONS (Bankroll: ${bankroll:.0f})")
         print("="*80)
@@ -544,33 +564,40 @@ class GTOParleyOptimizer:
         print()
 
         total_risk = 0
+        store = self.selected_parlays
 
-        for i, parlay in enumerate(self.selected_parlays, 1):
+        for i, parlay in enumerate(store.iter_rows(), 1):
             # Calculate minimum required payouts at different EV thresholds
             min_payout_10 = self.calculate_minimum_payout(parlay['probability'], 0.10)
             min_payout_5 = self.calculate_minimum_payout(parlay['probability'], 0.05)
             min_payout_breakeven = self.calculate_minimum_payout(parlay['probability'], 0.0)
 
             # Calculate Kelly bet size (using assumed payout for now)
-            bet_size = self.kelly_criterion(
-                parlay['probability'],
-                parlay['actual_payout'],
-                bankroll,
-                kelly_fraction
-            )
+            if portfolio_bets is not None:
+                bet_size = float(portfolio_bets[i - 1])
+            else:
+                bet_size = self.kelly_criterion(
+                    parlay['probability'],
+                    parlay['actual_payout'],
+                    bankroll,
+                    kelly_fraction
+                )
 
             # Calculate expected profit
             expected_profit = bet_size * parlay['ev']
 
             total_risk += bet_size
 
+            # Kept with the parlay for save_to_database()
+            store['kelly_bet'][i - 1] = bet_size
+            store['kelly_fraction'][i - 1] = kelly_fraction
+
             # Display parlay with MINIMUM PAYOUT THRESHOLDS
             print(f"PARLAY #{i} ({parlay['legs']}-leg)")
             print(f"{'='*80}")
 
-            for j, idx in enumerate(parlay['picks'], 1):
-                pick = self.picks_df.iloc[idx]
-
+            legs = store.resolve_legs(i - 1, self.picks_df)
+            for j, (_, pick) in enumerate(legs.iterrows(), 1):
                 # Format odds type prominently
                 odds_type = pick['odds_type'].upper()
                 odds_icon = {
@@ -598,6 +625,11 @@ class GTOParleyOptimizer:
             print(f"       If <  {min_payout_5:.2f}x  -> SKIP (no edge)")
             print()
             print(f"  Estimated EV (if payout = {parlay['actual_payout']:.1f}x): {parlay['ev']:+.1%}")
+            if not np.isnan(parlay['flex_ev']):
+                play = 'FLEX' if parlay['flex_ev'] > parlay['ev'] else 'POWER'
+                print(f"  Flex Play EV: {parlay['flex_ev']:+.1%} "
+                      f"(SD {np.sqrt(parlay['flex_variance']):.2f} vs Power {np.sqrt(parlay['power_variance']):.2f})"
+                      f" -> {play} has the higher EV")
             print(f"  Expected profit: ${expected_profit:+.2f}")
             print()
 
@@ -608,19 +640,20 @@ class GTOParleyOptimizer:
 
     def export_to_csv(self, filename: str = "gto_parlays.csv"):
         """Export selected parlays with minimum payout thresholds."""
-        if not self.selected_parlays:
+        if not len(self.selected_parlays):
             print("[WARNING] No parlays to export")
             return
 
+        store = self.selected_parlays
         rows = []
-        for i, parlay in enumerate(self.selected_parlays, 1):
+        for i, parlay in enumerate(store.iter_rows(), 1):
             # Calculate minimum payouts
             min_payout_10 = self.calculate_minimum_payout(parlay['probability'], 0.10)
             min_payout_5 = self.calculate_minimum_payout(parlay['probability'], 0.05)
             min_payout_breakeven = self.calculate_minimum_payout(parlay['probability'], 0.0)
 
-            for j, idx in enumerate(parlay['picks'], 1):
-                pick = self.picks_df.iloc[idx]
+            legs = store.resolve_legs(i - 1, self.picks_df)
+            for j, (_, pick) in enumerate(legs.iterrows(), 1):
                 rows.append({
                     'Parlay_ID': i,
                     'Legs': parlay['legs'],
@@ -647,7 +680,7 @@ class GTOParleyOptimizer:
 
     def save_to_database(self, date: str = None):
         """Save selected parlays to database for tracking and grading."""
-        if not self.selected_parlays:
+        if not len(self.selected_parlays):
             print("[WARNING] No parlays to save")
             return
 
@@ -659,18 +692,19 @@ class GTOParleyOptimizer:
 
         saved_count = 0
 
-        for i, parlay in enumerate(self.selected_parlays, 1):
+        store = self.selected_parlays
+        for i, parlay in enumerate(store.iter_rows(), 1):
             # Build picks JSON
             picks_list = []
-            for idx in parlay['picks']:
-                pick = self.picks_df.iloc[idx]
+            for _, pick in store.resolve_legs(i - 1, self.picks_df).iterrows():
                 picks_list.append({
                     'player_name': pick['player_name'],
                     'prop_type': pick['prop_type'],
                     'line': float(pick['line']),
                     'team': pick['team'],
                     'opponent': pick['opponent'],
-                    'odds_type': pick.get('odds_type', 'standard')
+                    'odds_type': pick.get('odds_type', 'standard'),
+                    'probability': float(pick['model_probability'])
                 })
 
             picks_json = json.dumps(picks_list)
@@ -686,9 +720,9 @@ class GTOParleyOptimizer:
             else:
                 tier = 'T3'
 
-            # Get Kelly bet sizing if available
-            kelly_bet = parlay.get('kelly_bet', 0)
-            kelly_fraction = parlay.get('kelly_fraction', 0.25)
+            # Kelly bet sizing (set by generate_betting_recommendations)
+            kelly_bet = parlay['kelly_bet']
+            kelly_fraction = parlay['kelly_fraction'] or 0.25
 
             # Insert into database
             insert_query = """
@@ -740,30 +774,48 @@ def load_picks_from_database(date: str = None, min_edge: float = 0.07) -> pd.Dat
 
     query = """
         SELECT
-            e.player_name,
-            e.team,
-            e.opponent,
-            e.prop_type,
-            e.line,
-            e.our_probability as model_probability,
-            e.expected_value as ev_score,
-            e.edge,
-            e.odds_type,
-            p.game_id
-        FROM prizepicks_edges e
-        LEFT JOIN predictions p ON (
-            e.player_name = p.player_name AND
-            e.prop_type = p.prop_type AND
-            e.date = p.game_date
-        )
-        WHERE e.date = ?
-        AND e.edge >= ?
-        ORDER BY e.edge DESC
+            player_name,
+            team,
+            opponent,
+            prop_type,
+            line,
+            our_probability as model_probability,
+            expected_value as ev_score,
+            edge,
+            odds_type
+        FROM prizepicks_edges
+        WHERE date = ?
+        AND edge >= ?
+        ORDER BY edge DESC
     """
 
     df = pd.read_sql_query(query, conn, params=(date, min_edge))
+
+    # game_id from our predictions, joined on player identity rather than the
+    # exact player_name string (PrizePicks and NHL API spellings differ)
+    games = pd.read_sql_query("""
+        SELECT player_name, team, prop_type, game_id
+        FROM predictions
+        WHERE game_date = ? AND game_id IS NOT NULL
+    """, conn, params=(date,))
     conn.close()
 
+    index = get_player_index(DB_PATH)
+
+    def player_keys(frame):
+        ids = index.resolve_many(frame['player_name'], frame['team'])
+        return [f"id:{pid}" if pid is not None else f"name:{name}"
+                for pid, name in zip(ids, frame['player_name'])]
+
+    df['player_key'] = player_keys(df)
+    if not games.empty:
+        games['player_key'] = player_keys(games)
+        games = games.drop_duplicates(['player_key', 'prop_type'])[['player_key', 'prop_type', 'game_id']]
+        df = df.merge(games, on=['player_key', 'prop_type'], how='left')
+    else:
+        df['game_id'] = None
+    df = df.drop(columns='player_key')
+
     # Fill missing game_ids with dummy values (team_opponent)
     if 'game_id' in df.columns:
         df['game_id'] = df.apply(
@@ -851,20 +903,9 @@ def main():
     # Initialize optimizer
     optimizer = GTOParleyOptimizer(picks_df, min_profitable_ev=0.0)
 
-    # Generate candidate parlays with smart limits based on dataset size
+    # Generate candidate parlays (exact top-EV pool per leg count - no truncation)
     n_picks = len(picks_df)
     print(f"[*] Dataset size: {n_picks} edge plays")
-
-    # Adjust max_combinations based on pick count to prevent hanging
-    if n_picks > 50:
-        max_combos = 25000  # Aggressive limit for large datasets (95 picks = 138k+ 3-leg combos)
-        print(f"[*] Large dataset detected - using max {max_combos} combos per leg size")
-    elif n_picks > 30:
-        max_combos = 50000  # Moderate limit
-        print(f"[*] Medium dataset detected - using max {max_combos} combos per leg size")
-    else:
-        max_combos = 100000  # Generous limit for small datasets
-
     print()
 
     optimizer.generate_candidate_parlays(
@@ -872,9 +913,14 @@ def main():
         num_3leg=50,
         num_4leg=25,
         min_parlay_ev=0.05,  # Only parlays with 5%+ EV
-        max_combinations=max_combos
+        search_mode='branch_and_bound',  # Exact best-EV pool without full enumeration
+        # Intraday reruns only rescore combos touching lines that moved
+        incremental_date=date or datetime.now().strftime('%Y-%m-%d')
     )
 
+    # Power vs Flex for every candidate
+    optimizer.rank_play_types()
+
     # Optimize selection
     optimizer.optimize_parlay_selection(
         target_2leg=8,
@@ -885,7 +931,8 @@ def main():
     # Generate betting recommendations
     optimizer.generate_betting_recommendations(
         bankroll=bankroll,
-        kelly_fraction=0.25  # Quarter Kelly for safety
+        kelly_fraction=0.25,  # Quarter Kelly for safety
+        sizing='portfolio'    # Size overlapping parlays together
     )
 
     # Export to CSV
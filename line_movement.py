@@ -0,0 +1,346 @@
+"""
+PrizePicks Line Movement Store
+
+Append-only history of the PrizePicks board. Each fetched snapshot is
+diffed against the board as last recorded, and only the deltas are
+stored, keyed by projection id and fetch time:
+
+    added    - projection appeared (line = opening line)
+    moved    - line or odds type changed (previous_line = line before)
+    removed  - projection left the board (line = NULL)
+
+Every snapshot (even one without changes) is logged in
+prizepicks_snapshot_log, so "the board as of T" and "what moved between
+T1 and T2" are index range queries instead of scans over raw snapshots.
+
+Usage:
+    from line_movement import LineMovementStore
+
+    store = LineMovementStore()
+    store.record_snapshot(board, fetched_at, league='NHL')   # board = get_projections('NHL')
+    store.board_as_of('2025-11-03T12:00:00')                # live lines at noon
+    store.movement('2025-11-03T08:00:00')                   # every change since 8 AM
+    store.net_movement('2025-11-03T08:00:00')               # opening vs latest line per projection
+    store.close()
+"""
+
+import sqlite3
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Optional, Union
+
+DB_PATH = "database/nhl_predictions.db"
+
+# Change types
+ADDED, MOVED, REMOVED = 'added', 'moved', 'removed'
+
+# Descriptive columns stored with every delta (so queries need no joins)
+DESCRIPTION_COLUMNS = ['player_name', 'team', 'opponent', 'prop_type', 'stat_type', 'odds_type', 'game_time']
+
+HISTORY_COLUMNS = ['projection_id', 'league', 'fetched_at', 'change', 'line', 'previous_line'] + DESCRIPTION_COLUMNS
+
+
+def _timestamp(value: Union[str, datetime, None]) -> Optional[str]:
+    """Fetch times are stored as sortable ISO text (YYYY-MM-DDTHH:MM:SS)."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.replace(microsecond=0).isoformat()
+    return pd.Timestamp(value).to_pydatetime().replace(microsecond=0).isoformat()
+
+
+def create_line_history_tables(conn: sqlite3.Connection):
+    """Create the line history tables and their indexes if they do not exist."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS prizepicks_line_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            projection_id TEXT NOT NULL,
+            league TEXT NOT NULL,
+            fetched_at TEXT NOT NULL,
+            change TEXT NOT NULL,  -- added / moved / removed
+            line REAL,             -- NULL when removed
+            previous_line REAL,    -- NULL when added
+            player_name TEXT,
+            team TEXT,
+            opponent TEXT,
+            prop_type TEXT,
+            stat_type TEXT,
+            odds_type TEXT,
+            game_time TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS prizepicks_snapshot_log (
+            league TEXT NOT NULL,
+            fetched_at TEXT NOT NULL,
+            projections INTEGER,
+            added INTEGER,
+            moved INTEGER,
+            removed INTEGER,
+            PRIMARY KEY (league, fetched_at)
+        )
+    """)
+    # Latest as-of T: newest row per projection at or before T
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_line_history_projection
+        ON prizepicks_line_history(league, projection_id, fetched_at)
+    """)
+    # Movement in a window: range scan on fetch time
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_line_history_time
+        ON prizepicks_line_history(league, fetched_at)
+    """)
+    conn.commit()
+
+
+class LineMovementStore:
+    """Append-only PrizePicks line history (one connection per store)."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        """
+        Args:
+            db_path: SQLite database path
+        """
+        self.conn = sqlite3.connect(db_path)
+        create_line_history_tables(self.conn)
+
+    def last_fetch(self, league: str = 'NHL', before: Union[str, datetime] = None) -> Optional[str]:
+        """Most recent recorded fetch time for a league (strictly before `before` if given)."""
+        if before is None:
+            row = self.conn.execute(
+                "SELECT MAX(fetched_at) FROM prizepicks_snapshot_log WHERE league = ?", (league,)
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT MAX(fetched_at) FROM prizepicks_snapshot_log WHERE league = ? AND fetched_at < ?",
+                (league, _timestamp(before))
+            ).fetchone()
+        return row[0]
+
+    def record_snapshot(self, board: pd.DataFrame, fetched_at: Union[str, datetime],
+                        league: str = 'NHL') -> Optional[Dict]:
+        """
+        Append the deltas between a fetched board and the recorded board.
+
+        Args:
+            board: Normalized projections (prizepicks_projections.PROJECTION_COLUMNS)
+            fetched_at: When the board was fetched
+            league: League key
+
+        Returns:
+            Dict with projections/added/moved/removed counts, or None if this
+            snapshot is already recorded or older than the latest one (the
+            history is append-only)
+        """
+        fetched_at = _timestamp(fetched_at)
+        latest = self.last_fetch(league)
+        if latest is not None and fetched_at <= latest:
+            return None
+
+        current = board.drop_duplicates(subset='projection_id', keep='last')
+        current = current.assign(projection_id=current['projection_id'].astype(str))
+        previous = self.board_as_of(latest, league) if latest is not None else \
+            pd.DataFrame(columns=HISTORY_COLUMNS)
+
+        merged = current[['projection_id', 'line'] + DESCRIPTION_COLUMNS].merge(
+            previous[['projection_id', 'line', 'odds_type']].rename(
+                columns={'line': 'previous_line', 'odds_type': 'previous_odds_type'}),
+            on='projection_id', how='left', indicator=True
+        )
+        is_new = (merged['_merge'] == 'left_only').to_numpy()
+        line = merged['line'].to_numpy(dtype=np.float64)
+        previous_line = merged['previous_line'].to_numpy(dtype=np.float64)
+        line_changed = ~((line == previous_line) | (np.isnan(line) & np.isnan(previous_line)))
+        odds_changed = (merged['odds_type'].astype(object) != merged['previous_odds_type'].astype(object)).to_numpy()
+
+        added = merged[is_new].assign(change=ADDED, previous_line=np.nan)
+        moved = merged[~is_new & (line_changed | odds_changed)].assign(change=MOVED)
+        removed = previous[~previous['projection_id'].isin(current['projection_id'])].assign(
+            change=REMOVED, previous_line=lambda frame: frame['line'], line=np.nan)
+
+        deltas = pd.concat([frame[['projection_id', 'change', 'line', 'previous_line'] + DESCRIPTION_COLUMNS]
+                            for frame in (added, moved, removed)], ignore_index=True)
+        deltas = deltas.astype(object).where(deltas.notna(), None)
+
+        self.conn.executemany(f"""
+            INSERT INTO prizepicks_line_history
+            (league, fetched_at, {', '.join(['projection_id', 'change', 'line', 'previous_line'] + DESCRIPTION_COLUMNS)})
+            VALUES (?, ?, {', '.join('?' * (4 + len(DESCRIPTION_COLUMNS)))})
+        """, [(league, fetched_at) + tuple(row) for row in deltas.itertuples(index=False)])
+
+        counts = {'projections': len(current), 'added': len(added), 'moved': len(moved), 'removed': len(removed)}
+        self.conn.execute("""
+            INSERT INTO prizepicks_snapshot_log (league, fetched_at, projections, added, moved, removed)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (league, fetched_at, counts['projections'], counts['added'], counts['moved'], counts['removed']))
+        self.conn.commit()
+
+        return counts
+
+    def board_as_of(self, as_of: Union[str, datetime], league: str = 'NHL') -> pd.DataFrame:
+        """
+        Every projection on the board as of a time (latest row per projection
+        at or before as_of, removed projections excluded).
+        """
+        return pd.read_sql_query(f"""
+            SELECT {', '.join('h.' + column for column in HISTORY_COLUMNS)}
+            FROM prizepicks_line_history h
+            JOIN (
+                SELECT projection_id, MAX(fetched_at) AS fetched_at
+                FROM prizepicks_line_history
+                WHERE league = ? AND fetched_at <= ?
+                GROUP BY projection_id
+            ) latest ON latest.projection_id = h.projection_id AND latest.fetched_at = h.fetched_at
+            WHERE h.league = ? AND h.change != ?
+            ORDER BY h.projection_id
+        """, self.conn, params=(league, _timestamp(as_of), league, REMOVED))
+
+    def movement(self, start: Union[str, datetime], end: Union[str, datetime] = None,
+                 league: str = 'NHL', changes: tuple = (ADDED, MOVED, REMOVED)) -> pd.DataFrame:
+        """
+        Every recorded change in (start, end], oldest first.
+
+        Args:
+            start: Window start (exclusive) - e.g. the previous run's fetch time
+            end: Window end (inclusive, default: now)
+            league: League key
+            changes: Change types to return
+        """
+        end = _timestamp(end or datetime.now())
+        placeholders = ','.join('?' * len(changes))
+        return pd.read_sql_query(f"""
+            SELECT {', '.join(HISTORY_COLUMNS)}
+            FROM prizepicks_line_history
+            WHERE league = ? AND fetched_at > ? AND fetched_at <= ? AND change IN ({placeholders})
+            ORDER BY fetched_at, id
+        """, self.conn, params=(league, _timestamp(start), end) + tuple(changes))
+
+    def net_movement(self, start: Union[str, datetime], end: Union[str, datetime] = None,
+                     league: str = 'NHL') -> pd.DataFrame:
+        """
+        Line at the start of a window vs at its end, for projections that changed in it.
+
+        Returns:
+            One row per projection: player_name, prop_type, odds_type,
+            opening_line (NaN if added in the window), latest_line (NaN if
+            removed), line_change and moves (number of changes)
+        """
+        events = self.movement(start, end, league)
+        if len(events) == 0:
+            return pd.DataFrame(columns=['projection_id', 'player_name', 'prop_type', 'odds_type',
+                                         'opening_line', 'latest_line', 'line_change', 'moves'])
+
+        grouped = events.groupby('projection_id', sort=False)
+        net = grouped.agg(player_name=('player_name', 'last'), prop_type=('prop_type', 'last'),
+                          odds_type=('odds_type', 'last'), opening_line=('previous_line', 'first'),
+                          latest_line=('line', 'last'), moves=('change', 'size')).reset_index()
+        net['line_change'] = net['latest_line'] - net['opening_line']
+        return net[['projection_id', 'player_name', 'prop_type', 'odds_type',
+                    'opening_line', 'latest_line', 'line_change', 'moves']]
+
+    def latest_changes(self, league: str = 'NHL') -> pd.DataFrame:
+        """Changes recorded by the most recent snapshot (vs the one before it)."""
+        latest = self.last_fetch(league)
+        if latest is None:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        previous = self.last_fetch(league, before=latest) or ''
+        return self.movement(previous, latest, league)
+
+    def snapshot_log(self, league: str = 'NHL', since: Union[str, datetime] = None) -> pd.DataFrame:
+        """Recorded snapshots with their change counts (for charts / status)."""
+        return pd.read_sql_query("""
+            SELECT fetched_at, projections, added, moved, removed
+            FROM prizepicks_snapshot_log
+            WHERE league = ? AND fetched_at >= ?
+            ORDER BY fetched_at
+        """, self.conn, params=(league, _timestamp(since) or ''))
+
+    def close(self):
+        """Close database connection"""
+        self.conn.close()
+
+
+def test_line_movement():
+    """Replay a day of synthetic snapshots and check the store against them."""
+    import os
+    import tempfile
+    from prizepicks_projections import make_sample_payload, parse_projections
+
+    print("\n" + "="*80)
+    print("LINE MOVEMENT STORE TEST")
+    print("="*80)
+    print()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'line_movement_test.db')
+    store = LineMovementStore(db_path)
+    rng = np.random.default_rng(7)
+    all_pass = True
+
+    board = parse_projections(make_sample_payload(1200, seed=3))
+    board = board[board['line'].notna()].reset_index(drop=True)
+    snapshots = []
+    for hour in range(8, 20):
+        if snapshots:
+            # A few lines move, odds types flip, projections come and go
+            board = board.copy()
+            moving = rng.random(len(board)) < 0.03
+            board.loc[moving, 'line'] += rng.choice([-1.0, 1.0], moving.sum())
+            flipping = rng.random(len(board)) < 0.01
+            board.loc[flipping, 'odds_type'] = 'demon'
+            board = board[rng.random(len(board)) > 0.01]
+            extra = parse_projections(make_sample_payload(20, seed=hour)).dropna(subset=['line'])
+            extra['projection_id'] = [f"new-{hour}-{i}" for i in range(len(extra))]
+            board = pd.concat([board, extra], ignore_index=True)
+        fetched_at = f"2025-11-03T{hour:02d}:00:00"
+        store.record_snapshot(board, fetched_at)
+        snapshots.append((fetched_at, board))
+
+    def same_board(stored, expected):
+        stored = stored.set_index('projection_id').sort_index()
+        expected = expected.set_index(expected['projection_id'].astype(str)).sort_index()
+        return (stored.index.equals(expected.index)
+                and np.allclose(stored['line'], expected['line'])
+                and (stored['odds_type'] == expected['odds_type']).all())
+
+    ok = all(same_board(store.board_as_of(t), b) for t, b in snapshots)
+    ok &= same_board(store.board_as_of('2025-11-03T12:30:00'), snapshots[4][1])
+    all_pass &= ok
+    print(f"  Board as-of every snapshot (and between snapshots) matches: {ok}")
+
+    full_rows = sum(len(b) for _, b in snapshots)
+    stored_rows = store.conn.execute("SELECT COUNT(*) FROM prizepicks_line_history").fetchone()[0]
+    ok = stored_rows < full_rows / 5
+    all_pass &= ok
+    print(f"  Rows stored: {stored_rows:,} deltas vs {full_rows:,} snapshot rows [{'PASS' if ok else 'FAIL'}]")
+
+    ok = store.record_snapshot(snapshots[-1][1], snapshots[-1][0]) is None
+    ok &= store.record_snapshot(snapshots[0][1], snapshots[0][0]) is None
+    all_pass &= ok
+    print(f"  Re-recorded / out-of-order snapshots ignored: {ok}")
+
+    opening, latest = snapshots[0][1].set_index('projection_id'), snapshots[-1][1].set_index('projection_id')
+    net = store.net_movement(snapshots[0][0], snapshots[-1][0]).set_index('projection_id')
+    both = opening.index.intersection(latest.index)
+    changed = both[(opening.loc[both, 'line'] != latest.loc[both, 'line'])]
+    ok = all(np.isclose(net.loc[p, 'latest_line'] - net.loc[p, 'opening_line'],
+                        latest.loc[p, 'line'] - opening.loc[p, 'line']) for p in changed)
+    all_pass &= ok
+    print(f"  Net movement 8 AM -> 7 PM matches for {len(changed)} moved lines: {ok}")
+
+    expected = store.snapshot_log().iloc[-1]
+    counts = store.latest_changes()['change'].value_counts()
+    ok = all(counts.get(change, 0) == expected[change] for change in (ADDED, MOVED, REMOVED))
+    all_pass &= ok
+    print(f"  Latest changes match the snapshot log: {ok}")
+
+    store.close()
+
+    print()
+    print("[PASS]" if all_pass else "[FAIL]")
+    return all_pass
+
+
+if __name__ == "__main__":
+    test_line_movement()
@@ -18,8 +18,10 @@ Supports:
 """
 
 import sqlite3
+import numpy as np
 from datetime import datetime
 from typing import Dict, List, Tuple
+from prediction_cache import get_prediction_cache
 
 DB_PATH = "database/nhl_predictions.db"
 
@@ -72,51 +74,35 @@ class MarketVsModelAnalyzer:
             return raw_prob * 0.85  # ~15% juice on high multipliers
 
     def get_model_predictions(self, game_date: str, stars_only: bool = True) -> List[Dict]:
-        """Get predictions from your model"""
+        """Get predictions from your model (shared compact prediction cache)"""
+
+        cache = get_prediction_cache(self.conn, game_date)
+
+        # High-confidence tiers only
+        tiers = [cache.code("confidence_tier", tier) for tier in ("T1-ELITE", "T2-STRONG")]
+        keep = np.isin(cache.codes["confidence_tier"], tiers)
 
         # Optional: Filter to stars only
-        stars_filter = ""
         if stars_only:
             from stars_only_filter import STARS
-            placeholders = ",".join(["?" for _ in STARS])
-            stars_filter = f"AND player_name IN ({placeholders})"
-            params = [game_date] + (STARS if stars_only else [])
-        else:
-            params = [game_date]
-
-        query = f"""
-            SELECT
-                player_name,
-                team,
-                opponent,
-                prop_type,
-                line,
-                prediction,
-                probability,
-                confidence_tier,
-                reasoning
-            FROM predictions
-            WHERE game_date = ?
-            {stars_filter}
-            AND confidence_tier IN ('T1-ELITE', 'T2-STRONG')
-            ORDER BY probability DESC
-        """
+            stars = [cache.code("player_name", name) for name in STARS]
+            keep &= np.isin(cache.codes["player_name"], stars)
 
-        cursor = self.conn.cursor()
-        cursor.execute(query, params)
+        rows = cache.in_load_order()
+        rows = rows[keep[rows]]
 
         predictions = []
-        for row in cursor.fetchall():
+        for row, reasoning in zip(rows, cache.reasonings(rows)):
             predictions.append({
-                "player": row[0],
-                "team": row[1],
-                "opponent": row[2],
-                "prop_type": row[3],
-                "line": row[4],
-                "prediction": row[5],
-                "model_prob": row[6],
-                "tier": row[7],
-                "reasoning": row[8]
+                "player": cache.value("player_name", row),
+                "team": cache.value("team", row),
+                "opponent": cache.value("opponent", row),
+                "prop_type": cache.value("prop_type", row),
+                "line": float(cache.line[row]),
+                "prediction": cache.value("prediction", row),
+                "model_prob": float(cache.probability[row]),
+                "tier": cache.value("confidence_tier", row),
+                "reasoning": reasoning
             })
 
         return predictions
@@ -203,7 +189,28 @@ class MarketVsModelAnalyzer:
             }
         }
 
-    def calculate_edges(self, predictions: List[Dict], market_lines: Dict) -> List[Dict]:
+    def simulate_slate(self, predictions: List[Dict], game_date: str):
+        """
+        Simulate the games behind the predictions (game_simulator)
+
+        Returns a SlateSimulation, or None if player/team data isn't available
+        """
+        from game_simulator import GameSimulator
+
+        matchups = {(pred["team"], pred["opponent"]) for pred in predictions
+                    if pred.get("team") and pred.get("opponent")}
+        if not matchups:
+            return None
+
+        try:
+            simulator = GameSimulator.from_database(DB_PATH, game_date=game_date)
+        except sqlite3.DatabaseError as e:
+            print(f"[WARN] Game simulation unavailable: {e}")
+            return None
+        return simulator.simulate(sorted(matchups))
+
+    def calculate_edges(self, predictions: List[Dict], market_lines: Dict,
+                        simulation=None) -> List[Dict]:
         """
         Compare model predictions to market lines (handles MULTIPLE lines per prop)
 
@@ -215,6 +222,10 @@ class MarketVsModelAnalyzer:
             Best Match: 3.5 (closest to 3.8)
             Compare: Model prob of OVER 3.5 vs Market prob
 
+        If a game simulation (simulate_slate) is passed, each bet also gets
+        sim_prob - the simulated hit rate at the market line (None when the
+        player isn't simulated)
+
         Returns list of bets with calculated edges
         """
         edges = []
@@ -263,6 +274,11 @@ class MarketVsModelAnalyzer:
             # Check if our model's line matches the market line
             line_match = abs(closest_market["line"] - model_line) < 0.1
 
+            sim_prob = None
+            if simulation is not None:
+                sim_prob = simulation.hit_rate([(player, prop, closest_market["line"],
+                                                 pred.get("prediction") or "OVER")])
+
             edges.append({
                 **pred,
                 "market_prob": market_prob,
@@ -272,6 +288,7 @@ class MarketVsModelAnalyzer:
                 "market_line": closest_market["line"],
                 "market_multiplier": closest_market.get("over_multiplier", 2.0),
                 "line_match": line_match,
+                "sim_prob": sim_prob,
                 "all_market_lines": [ml["line"] for ml in market_line_list],
                 "market_source": "PrizePicks" if "over_multiplier" in closest_market else "Sportsbook"
             })
@@ -314,6 +331,8 @@ class MarketVsModelAnalyzer:
             print(f"YOUR MODEL:")
             print(f"  Line:        {edge['line']}")
             print(f"  Probability: {edge['model_prob']*100:.1f}%")
+            if edge.get('sim_prob') is not None:
+                print(f"  Simulated:   {edge['sim_prob']*100:.1f}% (at market line {edge['market_line']})")
             print(f"  Reasoning:   {edge['reasoning']}")
             print(f"")
 
@@ -390,9 +409,15 @@ def main():
     market_lines = analyzer.get_market_lines(target_date, source="prizepicks")
     print(f"Found market lines for {len(market_lines)} players\n")
 
+    # Simulate the slate's games (simulated hit rate per line)
+    print("Simulating games...")
+    simulation = analyzer.simulate_slate(predictions, target_date)
+    if simulation is not None:
+        print(f"Simulated {len(simulation.games)} games x {simulation.n_sims:,} in {simulation.seconds:.2f}s\n")
+
     # Calculate edges
     print("Calculating edges...")
-    edges = analyzer.calculate_edges(predictions, market_lines)
+    edges = analyzer.calculate_edges(predictions, market_lines, simulation)
 
     # Display results
     analyzer.display_edges(edges, min_edge_pct=5.0)
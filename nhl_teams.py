@@ -0,0 +1,45 @@
+"""
+NHL team names
+
+Full team name -> abbreviation (odds_api_game_odds and other odds feeds use
+full names; our tables use abbreviations).
+"""
+
+# NHL Team Name Mapping: Full Name -> Abbreviation
+NHL_TEAM_MAP = {
+    'Anaheim Ducks': 'ANA',
+    'Boston Bruins': 'BOS',
+    'Buffalo Sabres': 'BUF',
+    'Calgary Flames': 'CGY',
+    'Carolina Hurricanes': 'CAR',
+    'Chicago Blackhawks': 'CHI',
+    'Colorado Avalanche': 'COL',
+    'Columbus Blue Jackets': 'CBJ',
+    'Dallas Stars': 'DAL',
+    'Detroit Red Wings': 'DET',
+    'Edmonton Oilers': 'EDM',
+    'Florida Panthers': 'FLA',
+    'Los Angeles Kings': 'LAK',
+    'Minnesota Wild': 'MIN',
+    'Montreal Canadiens': 'MTL',
+    'Nashville Predators': 'NSH',
+    'New Jersey Devils': 'NJD',
+    'New York Islanders': 'NYI',
+    'New York Rangers': 'NYR',
+    'Ottawa Senators': 'OTT',
+    'Philadelphia Flyers': 'PHI',
+    'Pittsburgh Penguins': 'PIT',
+    'San Jose Sharks': 'SJS',
+    'Seattle Kraken': 'SEA',
+    'St Louis Blues': 'STL',
+    'Tampa Bay Lightning': 'TBL',
+    'Toronto Maple Leafs': 'TOR',
+    'Vancouver Canucks': 'VAN',
+    'Vegas Golden Knights': 'VGK',
+    'Washington Capitals': 'WSH',
+    'Winnipeg Jets': 'WPG',
+    'Utah Hockey Club': 'UTA'
+}
+
+# Reverse mapping for abbreviation -> full name
+NHL_ABBR_TO_FULL = {v: k for k, v in NHL_TEAM_MAP.items()}
@@ -0,0 +1,1284 @@
+"""
+Vectorized Parlay Candidate Engine
+
+Turns the pick table into NumPy arrays once and scores whole blocks of
+parlay index tuples at a time (probability, payout, EV, breakeven,
+correlation and profitability masks). Replaces the per-combo pandas
+lookups that forced the optimizer to truncate its search.
+
+Usage:
+    from parlay_engine import ParlayCandidateEngine
+
+    engine = ParlayCandidateEngine(picks_df, min_profitable_ev=0.0)
+    for combos in engine.iter_combination_blocks(3):
+        scores = engine.score_block(combos)
+        keep = scores['is_profitable'] & ~scores['is_correlated']
+
+    # Large slates: shard exhaustive top-K scoring across processes
+    with ShardedCandidateScorer(engine, workers=8) as scorer:
+        result = scorer.top_k(5, top_k=300, min_parlay_ev=0.05)
+"""
+
+import heapq
+import math
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, chain, islice
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from prizepicks_payouts import PrizePicksPayoutCalculator
+from correlation_detector import ConflictMatrix
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Integer codes for PrizePicks odds_types (shared with the payout table)
+ODDS_TYPE_CODES = PrizePicksPayoutCalculator.ODDS_TYPE_CODES
+
+# Score arrays carried for every kept combo
+SCORE_KEYS = ('probability', 'actual_payout', 'ev', 'breakeven_payout')
+
+# Rows per scored block - large enough to amortize NumPy overhead,
+# small enough to keep peak memory in the tens of MB
+DEFAULT_BLOCK_SIZE = 200000
+
+
+def encode_odds_types(odds_types: Iterable[str]) -> np.ndarray:
+    """Map odds_type strings to payout-table codes (unknown types are scored as standard)."""
+    codes = PrizePicksPayoutCalculator.encode_odds_types(odds_types)
+    codes[codes == PrizePicksPayoutCalculator.OTHER_CODE] = ODDS_TYPE_CODES['standard']
+    return codes
+
+
+def hit_distribution(leg_probabilities: np.ndarray) -> np.ndarray:
+    """
+    Poisson-binomial distribution of hits for many parlays at once.
+
+    Dynamic program over the legs: after leg j, column h holds
+    P(h hits among the first j + 1 legs). One vectorized pass per leg.
+
+    Args:
+        leg_probabilities: Hit probability per leg, shape (parlays, legs)
+
+    Returns:
+        P(hits = h) for h = 0..legs, shape (parlays, legs + 1)
+    """
+    leg_probabilities = np.asarray(leg_probabilities, dtype=np.float64)
+    parlays, num_legs = leg_probabilities.shape
+
+    dist = np.zeros((parlays, num_legs + 1))
+    dist[:, 0] = 1.0
+    for leg in range(num_legs):
+        p = leg_probabilities[:, leg:leg + 1]
+        # h hits now = (h hits before, miss) + (h - 1 hits before, hit);
+        # the right-hand side is built from the previous leg's columns
+        dist[:, 1:leg + 2] = dist[:, 1:leg + 2] * (1 - p) + dist[:, :leg + 1] * p
+        dist[:, 0:1] *= 1 - p
+    return dist
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident memory of this process in MB (None if it cannot be read).
+
+    This is the high-water mark since the process started, not the memory
+    used by any single call.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS reports bytes
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    return None
+
+
+class TopKAccumulator:
+    """
+    Fixed-size buffer of the K best parlays by EV.
+
+    Fed one scored block at a time; ties keep the earlier-arriving combo,
+    so with combos streamed in lexicographic order the buffer matches a
+    stable sort of the full result.
+    """
+
+    def __init__(self, top_k: int, num_legs: int):
+        self.top_k = top_k
+        self.picks = np.empty((0, num_legs), dtype=np.int32)
+        self.scores = {key: np.empty(0, dtype=np.float64) for key in SCORE_KEYS}
+        self.arrival = np.empty(0, dtype=np.int64)
+        self.seen = 0
+
+    def threshold(self) -> float:
+        """EV a new combo must beat to enter a full buffer."""
+        if len(self.picks) < self.top_k:
+            return -np.inf
+        return float(self.scores['ev'][-1])
+
+    def push(self, picks: np.ndarray, scores: Dict[str, np.ndarray]):
+        """Merge a block of scored combos into the buffer."""
+        arrival = np.arange(self.seen, self.seen + len(picks), dtype=np.int64)
+        self.seen += len(picks)
+        if self.top_k <= 0 or len(picks) == 0:
+            return
+
+        ev = scores['ev']
+        if len(self.picks) >= self.top_k:
+            # Ties lose to the earlier combo already in the buffer
+            keep = ev > self.threshold()
+        else:
+            keep = np.ones(len(ev), dtype=bool)
+        if len(ev) > self.top_k:
+            # Anything below the block's own K-th best can never make it
+            kth = np.partition(ev, len(ev) - self.top_k)[len(ev) - self.top_k]
+            keep &= ev >= kth
+        if not keep.any():
+            return
+
+        picks = np.concatenate((self.picks, picks[keep]))
+        merged = {key: np.concatenate((self.scores[key], scores[key][keep])) for key in SCORE_KEYS}
+        arrival = np.concatenate((self.arrival, arrival[keep]))
+
+        order = np.lexsort((arrival, -merged['ev']))[:self.top_k]
+        self.picks = picks[order]
+        self.scores = {key: values[order] for key, values in merged.items()}
+        self.arrival = arrival[order]
+
+    def result(self) -> Dict:
+        """Buffer contents, best first."""
+        result = {'picks': self.picks}
+        result.update(self.scores)
+        return result
+
+
+class ParlayCandidateEngine:
+    """
+    Batch scorer for parlay candidates.
+
+    All per-pick data is held as contiguous arrays so that a block of
+    index tuples (shape: combos x legs) can be scored with a handful of
+    NumPy operations instead of one pandas lookup per leg per metric.
+    """
+
+    def __init__(self, picks_df: pd.DataFrame, min_profitable_ev: float = 0.0,
+                 copula=None):
+        """
+        Build the pick arrays.
+
+        Args:
+            picks_df: Picks with model_probability, odds_type, game_id, team
+            min_profitable_ev: Minimum EV margin over breakeven (same meaning
+                as GTOParleyOptimizer.min_profitable_ev)
+            copula: Optional joint pricer over the picks
+                (joint_probability.GaussianCopula or
+                game_simulator.SimulatedJointPricer). When set, same-game /
+                same-team combos are priced jointly instead of excluded
+                (only same-player legs conflict)
+        """
+        self.n_picks = len(picks_df)
+        self.min_profitable_ev = min_profitable_ev
+        self.copula = copula
+
+        self.probabilities = picks_df['model_probability'].to_numpy(dtype=np.float64)
+
+        if 'odds_type' in picks_df.columns:
+            self.odds_codes = encode_odds_types(picks_df['odds_type'])
+        else:
+            self.odds_codes = np.zeros(self.n_picks, dtype=np.int8)
+
+        # Same-game / same-team conflicts, built once per slate
+        if copula is None:
+            self.conflicts = ConflictMatrix.from_slate(picks_df['game_id'], picks_df['team'])
+        else:
+            self.conflicts = ConflictMatrix.from_players(picks_df['player_name'])
+
+    @classmethod
+    def from_arrays(cls,
+                    probabilities: np.ndarray,
+                    odds_codes: np.ndarray,
+                    conflicts: np.ndarray,
+                    min_profitable_ev: float = 0.0) -> 'ParlayCandidateEngine':
+        """
+        Engine over existing pick arrays (used as-is, not copied).
+
+        Used by worker processes to score against arrays held in shared memory.
+        """
+        engine = cls.__new__(cls)
+        engine.n_picks = len(probabilities)
+        engine.min_profitable_ev = min_profitable_ev
+        engine.probabilities = probabilities
+        engine.odds_codes = odds_codes
+        engine.copula = None
+        engine.conflicts = ConflictMatrix(conflicts)
+        return engine
+
+    def iter_combination_blocks(self,
+                                num_legs: int,
+                                first_legs: Optional[Iterable[int]] = None,
+                                block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[np.ndarray]:
+        """
+        Yield all index combinations of size num_legs as int32 blocks.
+
+        Combos are produced in lexicographic order, grouped by first leg.
+
+        Args:
+            num_legs: Parlay size
+            first_legs: Restrict to combos starting at these pick indices
+                (default: all picks)
+            block_size: Maximum rows per yielded block
+        """
+        n = self.n_picks
+        if num_legs < 2 or n < num_legs:
+            return
+
+        if first_legs is None:
+            first_legs = range(n - num_legs + 1)
+
+        for first in first_legs:
+            tails = combinations(range(first + 1, n), num_legs - 1)
+            while True:
+                flat = np.fromiter(
+                    chain.from_iterable(islice(tails, block_size)),
+                    dtype=np.int32
+                )
+                if flat.size == 0:
+                    break
+
+                rows = len(flat) // (num_legs - 1)
+                block = np.empty((rows, num_legs), dtype=np.int32)
+                block[:, 0] = first
+                block[:, 1:] = flat.reshape(rows, num_legs - 1)
+                yield block
+
+                if rows < block_size:
+                    break
+
+    def correlated_mask(self, combos: np.ndarray) -> np.ndarray:
+        """True where any two legs conflict (share a game or a team; same player with a copula)."""
+        return ~self.conflicts.independent_mask(combos)
+
+    def parlay_probabilities(self, combos: np.ndarray) -> np.ndarray:
+        """Combined probability of each combo (copula-priced if set, else independent legs)."""
+        if self.copula is not None:
+            return self.copula.joint_probabilities(combos, self.probabilities)
+        return np.prod(self.probabilities[combos], axis=1)
+
+    def parlay_payouts(self, combos: np.ndarray) -> np.ndarray:
+        """PrizePicks payout multiplier of each combo from its odds_type mix."""
+        return PrizePicksPayoutCalculator.lookup_payouts(self.odds_codes[combos])
+
+    def score_block(self, combos: np.ndarray, check_correlation: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Score a block of combos.
+
+        Args:
+            combos: Pick indices (combos x legs)
+            check_correlation: Compute is_correlated (skip for combos already
+                known to be independent)
+
+        Returns:
+            Dict of arrays aligned with combos rows: probability,
+            actual_payout, ev, breakeven_payout, is_correlated, is_profitable
+        """
+        probability = self.parlay_probabilities(combos)
+        payout = self.parlay_payouts(combos)
+        breakeven = 1 / probability
+
+        scores = {
+            'probability': probability,
+            'actual_payout': payout,
+            'ev': probability * payout - 1,
+            'breakeven_payout': breakeven,
+            'is_profitable': payout >= breakeven * (1 + self.min_profitable_ev),
+        }
+        if check_correlation:
+            scores['is_correlated'] = self.correlated_mask(combos)
+        return scores
+
+    def score_play_types(self, combos: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Power Play and Flex Play EV / variance for a block of same-size combos.
+
+        Flex needs the full hit-count distribution, computed for the whole
+        block by hit_distribution(). Returns are per $1 entry; Flex values
+        are NaN for 2-leg combos (Power Play only) and, with a copula, for
+        combos with correlated legs (the hit-count distribution assumes
+        independent legs).
+
+        Returns:
+            Dict of arrays aligned with combos rows: power_ev, power_variance,
+            flex_ev, flex_variance, and hit_distribution (combos x legs + 1)
+        """
+        num_legs = combos.shape[1]
+        probability = self.parlay_probabilities(combos)
+        payout = self.parlay_payouts(combos)
+
+        scores = {
+            'power_ev': probability * payout - 1,
+            # single payout with probability p: Var = p (1 - p) payout^2
+            'power_variance': probability * (1 - probability) * payout ** 2,
+        }
+
+        dist = hit_distribution(self.probabilities[combos])
+        scores['hit_distribution'] = dist
+
+        if num_legs < PrizePicksPayoutCalculator.MIN_FLEX_LEGS:
+            scores['flex_ev'] = np.full(len(combos), np.nan)
+            scores['flex_variance'] = np.full(len(combos), np.nan)
+            return scores
+
+        flex_payouts = PrizePicksPayoutCalculator.lookup_flex_payouts(self.odds_codes[combos])
+        expected = (dist * flex_payouts).sum(axis=1)
+        scores['flex_ev'] = expected - 1
+        scores['flex_variance'] = (dist * flex_payouts ** 2).sum(axis=1) - expected ** 2
+
+        if self.copula is not None:
+            correlated = self.copula.correlated_rows(combos)
+            scores['flex_ev'][correlated] = np.nan
+            scores['flex_variance'][correlated] = np.nan
+        return scores
+
+    def iter_profitable_blocks(self,
+                               num_legs: int,
+                               min_parlay_ev: float = 0.0,
+                               max_combinations: Optional[int] = None,
+                               block_size: int = DEFAULT_BLOCK_SIZE,
+                               first_legs: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, np.ndarray, Dict]]:
+        """
+        Stream the profitable, uncorrelated combos of num_legs block by block.
+
+        Combos are enumerated as independent sets of the conflict matrix, so
+        same-game / same-team combos are never generated or scored. Only one
+        block is alive at a time, whatever the size of the combination space.
+
+        Yields:
+            (combos scored in the block, kept combos, score arrays for kept combos)
+        """
+        processed = 0
+        for combos in self.conflicts.iter_independent_sets(num_legs, first_legs=first_legs,
+                                                           block_size=block_size):
+            if max_combinations is not None:
+                remaining = max_combinations - processed
+                if remaining <= 0:
+                    return
+                combos = combos[:remaining]
+
+            processed += len(combos)
+            scores = self.score_block(combos, check_correlation=False)
+
+            keep = scores['is_profitable'] & (scores['ev'] >= min_parlay_ev)
+            yield len(combos), combos[keep], {key: scores[key][keep] for key in SCORE_KEYS}
+
+    def find_profitable(self,
+                        num_legs: int,
+                        min_parlay_ev: float = 0.0,
+                        max_combinations: Optional[int] = None,
+                        block_size: int = DEFAULT_BLOCK_SIZE) -> Dict:
+        """
+        Score every uncorrelated combo of num_legs and keep all profitable ones.
+
+        Memory grows with the number of profitable combos - use stream_top_k()
+        when only the best parlays are needed.
+
+        Args:
+            num_legs: Parlay size
+            min_parlay_ev: Minimum parlay EV to keep
+            max_combinations: Optional cap on combos scored (None = all)
+            block_size: Rows per scored block
+
+        Returns:
+            Dict with 'picks' (int32 array, kept combos x legs), the score
+            arrays for the kept combos, and counters: processed,
+            uncorrelated, profitable, seconds
+        """
+        start = time.perf_counter()
+        processed = 0
+        kept_picks = []
+        kept_scores = []
+
+        for scored, combos, scores in self.iter_profitable_blocks(
+                num_legs, min_parlay_ev, max_combinations, block_size):
+            processed += scored
+            if len(combos):
+                kept_picks.append(combos)
+                kept_scores.append(scores)
+
+        result = {
+            'picks': (np.concatenate(kept_picks) if kept_picks
+                      else np.empty((0, num_legs), dtype=np.int32)),
+        }
+        for key in SCORE_KEYS:
+            result[key] = (np.concatenate([s[key] for s in kept_scores]) if kept_scores
+                           else np.empty(0, dtype=np.float64))
+
+        result['processed'] = processed
+        result['uncorrelated'] = processed
+        result['profitable'] = len(result['picks'])
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+    def stream_top_k(self,
+                     num_legs: int,
+                     top_k: int,
+                     min_parlay_ev: float = 0.0,
+                     max_combinations: Optional[int] = None,
+                     block_size: int = DEFAULT_BLOCK_SIZE,
+                     first_legs: Optional[Iterable[int]] = None) -> Dict:
+        """
+        Score every uncorrelated combo of num_legs, keeping only the best K.
+
+        Blocks stream through a fixed-size top-K buffer, so memory stays flat
+        no matter how many combos are scored (2-6 legs). The result matches
+        ranking find_profitable() by EV (ties in combination order).
+        first_legs restricts the search to combos starting at those picks
+        (one shard of the space, see ShardedCandidateScorer).
+
+        Returns:
+            Same layout as find_profitable() restricted to the top K, plus
+            combos_per_sec and peak_rss_mb (process peak so far, None if
+            unavailable)
+        """
+        start = time.perf_counter()
+        processed = 0
+        profitable = 0
+        top = TopKAccumulator(top_k, num_legs)
+
+        for scored, combos, scores in self.iter_profitable_blocks(
+                num_legs, min_parlay_ev, max_combinations, block_size, first_legs):
+            processed += scored
+            profitable += len(combos)
+            top.push(combos, scores)
+
+        result = top.result()
+        result['processed'] = processed
+        result['uncorrelated'] = processed
+        result['profitable'] = profitable
+        result['seconds'] = time.perf_counter() - start
+        result['combos_per_sec'] = processed / max(result['seconds'], 1e-9)
+        result['peak_rss_mb'] = peak_rss_mb()
+        return result
+
+    def search_top_k(self,
+                     num_legs: int,
+                     top_k: int,
+                     min_parlay_ev: float = 0.0,
+                     required_legs: Optional[Iterable[int]] = None,
+                     seed: Optional[Dict] = None) -> Dict:
+        """
+        Exact top-K search by EV using branch-and-bound.
+
+        Legs are sorted by model_probability (then odds_type payout weight),
+        so the best probability reachable from any partial parlay is the
+        product of the next legs in order. Combined with the best payout
+        still reachable from the partial odds_type mix, that bounds the EV
+        of the whole subtree; subtrees that cannot beat the current K-th
+        best parlay are skipped. The last leg is scored in one NumPy pass.
+
+        Returns the same result layout as find_profitable(), restricted to
+        the K best uncorrelated, profitable parlays (ordered by EV, ties in
+        combination order), so the result matches a full enumeration.
+
+        Args:
+            num_legs: Parlay size
+            top_k: Number of parlays to return
+            min_parlay_ev: Minimum parlay EV to keep
+            required_legs: Only consider combos containing at least one of
+                these picks (default: no restriction)
+            seed: Already-scored combos (result layout) to start the top K
+                from - they raise the pruning floor and are kept in the result
+        """
+        if self.copula is not None:
+            # The product-of-legs bound does not hold for positively correlated legs
+            raise ValueError("search_top_k does not support copula pricing - use stream_top_k")
+
+        start = time.perf_counter()
+        n = self.n_picks
+        empty = {
+            'picks': np.empty((0, num_legs), dtype=np.int32),
+            'probability': np.empty(0), 'actual_payout': np.empty(0),
+            'ev': np.empty(0), 'breakeven_payout': np.empty(0),
+            'processed': 0, 'uncorrelated': None, 'profitable': None, 'seconds': 0.0,
+        }
+        if num_legs < 2 or n < num_legs or top_k <= 0:
+            return empty
+
+        table = PrizePicksPayoutCalculator.payout_grid(num_legs)
+        leg_weights = np.array([
+            1.0,
+            PrizePicksPayoutCalculator.GOBLIN_FACTORS.get(num_legs, 0.67),
+            PrizePicksPayoutCalculator.DEMON_FACTORS.get(num_legs, 1.33),
+        ])[self.odds_codes]
+
+        # Search order: probability descending, payout weight descending
+        order = np.lexsort((-leg_weights, -self.probabilities))
+        probs = self.probabilities[order]
+        is_goblin = (self.odds_codes[order] == ODDS_TYPE_CODES['goblin']).astype(np.intp)
+        is_demon = (self.odds_codes[order] == ODDS_TYPE_CODES['demon']).astype(np.intp)
+        conflicts = self.conflicts.conflicts[np.ix_(order, order)]
+        game_masks = [self.conflicts.game_masks[i] for i in order]
+        team_masks = [self.conflicts.team_masks[i] for i in order]
+        probs_list = probs.tolist()
+        goblin_list = is_goblin.tolist()
+        demon_list = is_demon.tolist()
+
+        # Required legs in search order; once past the last one, a combo
+        # without any can no longer get one
+        if required_legs is None:
+            is_required = np.ones(n, dtype=bool)
+        else:
+            required = np.zeros(self.n_picks, dtype=bool)
+            required[np.asarray(list(required_legs), dtype=np.intp)] = True
+            is_required = required[order]
+        if not is_required.any():
+            empty['seconds'] = time.perf_counter() - start
+            return empty
+        required_list = is_required.tolist()
+        last_required = int(np.flatnonzero(is_required)[-1])
+        # best (first) required leg at or after each position
+        next_required = np.full(n + 1, n, dtype=np.intp)
+        for pos in np.flatnonzero(is_required)[::-1].tolist():
+            next_required[:pos + 1] = pos
+        next_required_prob = np.append(probs, 0.0)[next_required].tolist()
+
+        # prefix log-probabilities: product of probs[j:j+r] in O(1)
+        log_cumsum = np.concatenate(([0.0], np.cumsum(np.log(probs)))).tolist()
+        # goblin/demon legs still available at or after each position
+        goblins_after = np.concatenate((np.cumsum(is_goblin[::-1])[::-1], [0])).tolist()
+        demons_after = np.concatenate((np.cumsum(is_demon[::-1])[::-1], [0])).tolist()
+
+        payout_bounds = {}
+
+        def best_payout(goblins, demons, remaining, goblins_avail, demons_avail):
+            """Highest table payout reachable by adding `remaining` legs."""
+            key = (goblins, demons, remaining, min(goblins_avail, remaining), min(demons_avail, remaining))
+            if key not in payout_bounds:
+                best = 0.0
+                for g in range(key[3] + 1):
+                    for d in range(min(remaining - g, key[4]) + 1):
+                        best = max(best, table[goblins + g, demons + d])
+                payout_bounds[key] = best
+            return payout_bounds[key]
+
+        heap = []  # min-heap of (ev, negated combo) - worst kept parlay on top
+        if seed is not None and len(seed['ev']):
+            heap = heapq.nlargest(top_k, (
+                (float(ev), tuple(-int(i) for i in combo))
+                for ev, combo in zip(seed['ev'], seed['picks'])
+            ))
+            heapq.heapify(heap)
+        ev_floor = max(min_parlay_ev, self.min_profitable_ev)
+        # Bound slack so float rounding never prunes an exact tie
+        slack = 1 + 1e-9
+        evaluated = 0
+
+        def floor():
+            if len(heap) < top_k:
+                return ev_floor
+            return max(ev_floor, heap[0][0])
+
+        def last_leg(pos, prob, goblins, demons, chosen, has_required):
+            nonlocal evaluated
+            evaluated += n - pos
+            ok = ~conflicts[chosen, pos:].any(axis=0)
+            if not has_required:
+                ok &= is_required[pos:]
+            probability = prob * probs[pos:]
+            payout = table[goblins + is_goblin[pos:], demons + is_demon[pos:]]
+            ev = probability * payout - 1
+            ok &= payout >= (1 / probability) * (1 + self.min_profitable_ev)
+            ok &= ev >= min_parlay_ev
+            ok &= ev >= floor()
+
+            for j in np.flatnonzero(ok).tolist():
+                combo = tuple(sorted(int(order[c]) for c in chosen + [pos + j]))
+                entry = (float(ev[j]), tuple(-i for i in combo))
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+
+        def extend(pos, prob, goblins, demons, chosen, chosen_games, chosen_teams, has_required):
+            remaining = num_legs - len(chosen)
+            if remaining == 1:
+                last_leg(pos, prob, goblins, demons, chosen, has_required)
+                return
+
+            for j in range(pos, n - remaining + 1):
+                if not has_required and j > last_required:
+                    break
+                # Bound is non-increasing in j: fewer and weaker legs remain
+                if has_required:
+                    best_prob = math.exp(log_cumsum[j + remaining] - log_cumsum[j])
+                else:
+                    # One of the legs must be a required one
+                    best_prob = (math.exp(log_cumsum[j + remaining - 1] - log_cumsum[j]) *
+                                 next_required_prob[j])
+                bound = (prob * best_prob *
+                         best_payout(goblins, demons, remaining, goblins_after[j], demons_after[j]))
+                if bound * slack - 1 < floor():
+                    break
+                if (chosen_games & game_masks[j]) or (chosen_teams & team_masks[j]):
+                    continue
+                extend(j + 1, prob * probs_list[j], goblins + goblin_list[j],
+                       demons + demon_list[j], chosen + [j],
+                       chosen_games | game_masks[j], chosen_teams | team_masks[j],
+                       has_required or required_list[j])
+
+        extend(0, 1.0, 0, 0, [], 0, 0, required_legs is None)
+
+        if not heap:
+            empty['processed'] = evaluated
+            empty['seconds'] = time.perf_counter() - start
+            return empty
+
+        # Rescore in canonical (ascending index) order so values match find_profitable()
+        picks = np.array([[-i for i in neg] for _, neg in heap], dtype=np.int32)
+        scores = self.score_block(picks)
+        rank = np.lexsort(tuple(picks[:, col] for col in range(num_legs - 1, -1, -1)) + (-scores['ev'],))
+
+        result = {'picks': picks[rank]}
+        for key in SCORE_KEYS:
+            result[key] = scores[key][rank]
+        result['processed'] = evaluated
+        result['uncorrelated'] = None  # not tracked: pruned subtrees are never scored
+        result['profitable'] = None
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+
+def merge_top_k(results: List[Dict], top_k: int, num_legs: int) -> Dict:
+    """
+    Merge per-shard top-K results into the global top K.
+
+    Ranked by EV, ties broken by combination order - the same order the
+    serial stream_top_k() produces, whatever the shard layout.
+    """
+    picks = [r['picks'] for r in results if len(r['picks'])]
+    if not picks:
+        merged = {'picks': np.empty((0, num_legs), dtype=np.int32)}
+        merged.update({key: np.empty(0, dtype=np.float64) for key in SCORE_KEYS})
+        return merged
+
+    picks = np.concatenate(picks)
+    scores = {key: np.concatenate([r[key] for r in results if len(r['picks'])]) for key in SCORE_KEYS}
+
+    # lexsort: last key is primary -> EV desc, then legs left to right
+    keys = tuple(picks[:, col] for col in reversed(range(num_legs))) + (-scores['ev'],)
+    order = np.lexsort(keys)[:top_k]
+
+    merged = {'picks': picks[order]}
+    merged.update({key: values[order] for key, values in scores.items()})
+    return merged
+
+
+# Per-process engine for pool workers (attached to the parent's shared memory)
+_worker_engine = None
+_worker_buffers = []
+
+
+def _attach_worker(specs: Dict, min_profitable_ev: float):
+    """Pool initializer: map the shared pick arrays and build the engine once."""
+    global _worker_engine
+    arrays = {}
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_buffers.append(shm)  # keep the mapping alive for the worker's lifetime
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    _worker_engine = ParlayCandidateEngine.from_arrays(
+        arrays['probabilities'], arrays['odds_codes'], arrays['conflicts'], min_profitable_ev
+    )
+
+
+def _score_shard(num_legs: int, first_legs: List[int], top_k: int,
+                 min_parlay_ev: float, block_size: int) -> Dict:
+    """Pool task: stream one shard of the combination space into its own top K."""
+    result = _worker_engine.stream_top_k(num_legs, top_k, min_parlay_ev,
+                                         block_size=block_size, first_legs=first_legs)
+    return {key: result[key] for key in ('picks',) + SCORE_KEYS + ('processed', 'profitable', 'peak_rss_mb')}
+
+
+class ShardedCandidateScorer:
+    """
+    Exhaustive top-K scoring sharded by first-leg index across processes.
+
+    The pick arrays (probabilities, odds codes, conflict matrix) are copied
+    once into shared memory and mapped zero-copy by every worker. Each task
+    streams the combos starting at its first legs into a local top K; the
+    shard results are merged deterministically, so the output is identical
+    to ParlayCandidateEngine.stream_top_k().
+
+    Usage:
+        with ShardedCandidateScorer(engine, workers=8) as scorer:
+            result = scorer.top_k(5, top_k=300, min_parlay_ev=0.05)
+    """
+
+    # Shards per worker - early first legs own far more combos, so finer
+    # shards keep the pool busy until the end
+    SHARDS_PER_WORKER = 4
+
+    def __init__(self, engine: ParlayCandidateEngine, workers: Optional[int] = None):
+        """
+        Args:
+            engine: Engine for the slate (its arrays are shared with the workers)
+            workers: Worker processes (default: CPU count)
+        """
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self._buffers = []
+
+        specs = {}
+        for key, array in (('probabilities', engine.probabilities),
+                           ('odds_codes', engine.odds_codes),
+                           ('conflicts', engine.conflicts.conflicts)):
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._buffers.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+            specs[key] = (shm.name, array.shape, array.dtype.str)
+
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_attach_worker,
+            initargs=(specs, engine.min_profitable_ev)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut down the pool and release the shared memory."""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        for shm in self._buffers:
+            shm.close()
+            shm.unlink()
+        self._buffers = []
+
+    def shards(self, num_legs: int) -> List[List[int]]:
+        """Split valid first legs round-robin into SHARDS_PER_WORKER * workers shards."""
+        first_legs = list(range(self.engine.n_picks - num_legs + 1))
+        n_shards = min(len(first_legs), self.workers * self.SHARDS_PER_WORKER)
+        return [first_legs[i::n_shards] for i in range(n_shards)]
+
+    def top_k(self,
+              num_legs: int,
+              top_k: int,
+              min_parlay_ev: float = 0.0,
+              block_size: int = DEFAULT_BLOCK_SIZE) -> Dict:
+        """
+        Parallel equivalent of ParlayCandidateEngine.stream_top_k().
+
+        Returns:
+            Same layout as stream_top_k(); peak_rss_mb is the largest of the
+            parent and worker peaks
+        """
+        start = time.perf_counter()
+        shards = self.shards(num_legs)
+        futures = [
+            self.pool.submit(_score_shard, num_legs, shard, top_k, min_parlay_ev, block_size)
+            for shard in shards
+        ]
+        # Collected in submission order so the merge input is fixed
+        results = [future.result() for future in futures]
+
+        result = merge_top_k(results, top_k, num_legs)
+        result['processed'] = sum(r['processed'] for r in results)
+        result['uncorrelated'] = result['processed']
+        result['profitable'] = sum(r['profitable'] for r in results)
+        result['seconds'] = time.perf_counter() - start
+        result['combos_per_sec'] = result['processed'] / max(result['seconds'], 1e-9)
+
+        peaks = [peak for peak in [peak_rss_mb()] + [r['peak_rss_mb'] for r in results] if peak is not None]
+        result['peak_rss_mb'] = max(peaks) if peaks else None
+        result['workers'] = self.workers
+        result['shards'] = len(shards)
+        return result
+
+
+class ParlayCandidateStore:
+    """
+    Columnar (struct-of-arrays) store of parlay candidates.
+
+    Leg indices live in one small int matrix padded with -1 up to 6 legs,
+    metrics in float32 columns - a few dozen bytes per candidate instead
+    of a dict with four per-leg lists. Player names, lines and other pick
+    details are resolved from the pick table only for the rows that are
+    actually printed, exported or saved.
+    """
+
+    MAX_LEGS = PrizePicksPayoutCalculator.MAX_LEGS
+
+    # float32 metric columns (the rest after the engine scores are filled in later)
+    COLUMNS = ('probability', 'actual_payout', 'ev', 'breakeven_payout',
+               'power_variance', 'flex_ev', 'flex_variance',
+               'frequency_score', 'kelly_bet', 'kelly_fraction')
+
+    def __init__(self, picks: np.ndarray, num_legs: np.ndarray, columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            picks: Leg indices (candidates x MAX_LEGS), unused slots = -1
+            num_legs: Legs per candidate
+            columns: Metric arrays keyed by COLUMNS
+        """
+        self.picks = picks
+        self.num_legs = num_legs
+        self.columns = columns
+
+    @classmethod
+    def from_result(cls, result: Dict) -> 'ParlayCandidateStore':
+        """Store from an engine result dict (rows keep the result's order)."""
+        legs = np.asarray(result['picks'])
+        picks = np.full((len(legs), cls.MAX_LEGS), -1, dtype=np.int16)
+        picks[:, :legs.shape[1]] = legs
+
+        columns = {key: np.zeros(len(legs), dtype=np.float32) for key in cls.COLUMNS}
+        for key in SCORE_KEYS:
+            columns[key][:] = result[key]
+        for key in ('power_variance', 'flex_ev', 'flex_variance'):
+            columns[key][:] = np.nan  # until score_play_types()
+
+        return cls(picks, np.full(len(legs), legs.shape[1], dtype=np.int8), columns)
+
+    @classmethod
+    def empty(cls) -> 'ParlayCandidateStore':
+        return cls.from_result({'picks': np.empty((0, 2), dtype=np.int32),
+                                **{key: np.empty(0) for key in SCORE_KEYS}})
+
+    @classmethod
+    def concat(cls, stores: List['ParlayCandidateStore']) -> 'ParlayCandidateStore':
+        """Stack several stores (e.g. one per leg count) into one."""
+        stores = [store for store in stores if len(store)]
+        if not stores:
+            return cls.empty()
+        return cls(
+            np.concatenate([store.picks for store in stores]),
+            np.concatenate([store.num_legs for store in stores]),
+            {key: np.concatenate([store.columns[key] for store in stores]) for key in cls.COLUMNS}
+        )
+
+    def __len__(self) -> int:
+        return len(self.num_legs)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def take(self, rows) -> 'ParlayCandidateStore':
+        """Subset of rows (in the given order)."""
+        rows = np.asarray(rows, dtype=np.intp)
+        return ParlayCandidateStore(
+            self.picks[rows], self.num_legs[rows],
+            {key: values[rows] for key, values in self.columns.items()}
+        )
+
+    def leg_matrix(self) -> np.ndarray:
+        """Leg indices as (candidates x legs) for a store of one parlay size."""
+        if len(self) == 0:
+            return np.empty((0, 0), dtype=np.intp)
+        sizes = np.unique(self.num_legs)
+        if len(sizes) > 1:
+            raise ValueError(f"Store mixes parlay sizes: {sizes.tolist()}")
+        return self.picks[:, :sizes[0]].astype(np.intp)
+
+    def score_play_types(self, engine: ParlayCandidateEngine):
+        """Fill the Power/Flex EV and variance columns for a store of one parlay size."""
+        if len(self) == 0:
+            return
+        scores = engine.score_play_types(self.leg_matrix())
+        for key in ('power_variance', 'flex_ev', 'flex_variance'):
+            self.columns[key][:] = scores[key]
+
+    def play_type_ranking(self) -> Dict[str, np.ndarray]:
+        """
+        Power and Flex variants of every candidate, ranked side by side.
+
+        Returns:
+            Dict of arrays over 2 x candidates variants (Flex rows only where
+            Flex exists), best EV first: row (candidate), play_type
+            ('power' / 'flex'), ev, variance
+        """
+        rows = np.arange(len(self))
+        has_flex = ~np.isnan(self.columns['flex_ev'])
+
+        row = np.concatenate((rows, rows[has_flex]))
+        play_type = np.concatenate((np.full(len(rows), 'power'), np.full(has_flex.sum(), 'flex')))
+        ev = np.concatenate((self.columns['ev'], self.columns['flex_ev'][has_flex]))
+        variance = np.concatenate((self.columns['power_variance'],
+                                   self.columns['flex_variance'][has_flex]))
+
+        order = np.lexsort((row, -ev))
+        return {'row': row[order], 'play_type': play_type[order],
+                'ev': ev[order], 'variance': variance[order]}
+
+    def leg_indices(self, row: int) -> Tuple[int, ...]:
+        """Pick indices of one candidate."""
+        return tuple(int(i) for i in self.picks[row, :self.num_legs[row]])
+
+    def row(self, row: int) -> Dict:
+        """
+        One candidate as a plain dict: picks, legs (count) and the metric
+        columns as Python floats.
+        """
+        parlay = {'picks': self.leg_indices(row), 'legs': int(self.num_legs[row])}
+        parlay.update({key: float(values[row]) for key, values in self.columns.items()})
+        return parlay
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """Candidates as dicts, in store order."""
+        for row in range(len(self)):
+            yield self.row(row)
+
+    def resolve_legs(self, row: int, picks_df: pd.DataFrame) -> pd.DataFrame:
+        """Pick table rows (names, lines, teams, ...) for one candidate's legs."""
+        return picks_df.iloc[list(self.leg_indices(row))]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the store's arrays."""
+        return (self.picks.nbytes + self.num_legs.nbytes +
+                sum(values.nbytes for values in self.columns.values()))
+
+
+def frequency_contributions(actual_frequency: np.ndarray,
+                            target_frequency: np.ndarray) -> np.ndarray:
+    """
+    Per-pick frequency score contribution (GTO balancing).
+
+    Under-represented picks score their remaining need (0 to 1);
+    over-represented picks are penalized at half their overshoot.
+    """
+    actual = actual_frequency.astype(np.float64)
+    need = (target_frequency - actual) / target_frequency
+    over = (actual - target_frequency) / target_frequency
+    return np.where(actual < target_frequency, need, -over * 0.5)
+
+
+def lazy_greedy_select(legs: np.ndarray,
+                       evs: np.ndarray,
+                       target_frequency: np.ndarray,
+                       actual_frequency: np.ndarray,
+                       target_count: int,
+                       ev_weight: float = 0.7,
+                       frequency_weight: float = 0.3) -> List[Tuple[int, float]]:
+    """
+    Greedy parlay selection with a lazy-update priority queue.
+
+    Each round picks the candidate with the highest composite score
+    (ev_weight * EV + frequency_weight * frequency score) and increments
+    the frequency of its legs. Selecting a parlay can only lower the
+    frequency score of other parlays, so heap entries are rescored only
+    when they reach the top after one of their legs changed - the first
+    up-to-date entry on top is the true best.
+
+    Args:
+        legs: Candidate leg indices (candidates x legs)
+        evs: Candidate EVs
+        target_frequency: Target appearances per pick
+        actual_frequency: Current appearances per pick (updated in place)
+        target_count: Number of parlays to select
+
+    Returns:
+        List of (candidate row, frequency score at selection) in selection order
+    """
+    n_candidates = len(legs)
+    if n_candidates == 0 or target_count <= 0:
+        return []
+
+    contributions = frequency_contributions(actual_frequency, target_frequency)
+    frequency_scores = contributions[legs].mean(axis=1)
+    composite = ev_weight * evs + frequency_weight * frequency_scores
+
+    # (negated score, row, version scored at) - ties go to the earlier row
+    heap = list(zip((-composite).tolist(), range(n_candidates), [0] * n_candidates))
+    heapq.heapify(heap)
+
+    leg_version = np.zeros(len(actual_frequency), dtype=np.int64)
+    version = 0
+    selected = []
+
+    while heap and len(selected) < target_count:
+        neg_score, row, scored_at = heapq.heappop(heap)
+        row_legs = legs[row]
+
+        if leg_version[row_legs].max() > scored_at:
+            # Stale: a leg's frequency changed since this entry was scored
+            score = float(contributions[row_legs].mean())
+            heapq.heappush(heap, (-(ev_weight * evs[row] + frequency_weight * score), row, version))
+            continue
+
+        selected.append((row, float(contributions[row_legs].mean())))
+
+        version += 1
+        actual_frequency[row_legs] += 1
+        leg_version[row_legs] = version
+        contributions[row_legs] = frequency_contributions(
+            actual_frequency[row_legs], target_frequency[row_legs]
+        )
+
+    return selected
+
+
+def _make_test_slate(n_picks: int, seed: int = 7) -> pd.DataFrame:
+    """Synthetic slate: ~2 picks per team, teams paired into games."""
+    rng = np.random.default_rng(seed)
+    teams = [f"T{i:02d}" for i in range(32)]
+    rows = []
+    for i in range(n_picks):
+        team_idx = int(rng.integers(0, 32))
+        opp_idx = team_idx ^ 1
+        rows.append({
+            'player_name': f"Player {i}",
+            'prop_type': ['points', 'shots'][i % 2],
+            'line': 0.5 + (i % 4),
+            'model_probability': float(rng.uniform(0.55, 0.85)),
+            'ev_score': float(rng.uniform(0.0, 0.2)),
+            'odds_type': ['standard', 'goblin', 'demon'][int(rng.integers(0, 3))],
+            'team': teams[team_idx],
+            'opponent': teams[opp_idx],
+            'game_id': f"G{min(team_idx, opp_idx):02d}",
+        })
+    return pd.DataFrame(rows)
+
+
+def test_engine():
+    """Check the batch scorer against per-combo reference math and time it."""
+    print("\n" + "="*80)
+    print("PARLAY ENGINE TEST")
+    print("="*80)
+    print()
+
+    picks = _make_test_slate(30)
+    engine = ParlayCandidateEngine(picks)
+
+    mismatches = 0
+    for num_legs in (2, 3, 4):
+        combos = np.concatenate(list(engine.iter_combination_blocks(num_legs, block_size=500)))
+        expected = list(combinations(range(len(picks)), num_legs))
+        assert [tuple(c) for c in combos.tolist()] == expected, "combination order mismatch"
+
+        scores = engine.score_block(combos)
+        for row, combo in enumerate(expected):
+            legs = picks.iloc[list(combo)]
+            prob = np.prod(legs['model_probability'].values)
+            payout = PrizePicksPayoutCalculator.calculate_parlay_payout(legs['odds_type'].tolist())
+            correlated = (legs['game_id'].nunique() < num_legs or
+                          legs['team'].nunique() < num_legs)
+            if (scores['probability'][row] != prob or
+                    scores['actual_payout'][row] != payout or
+                    bool(scores['is_correlated'][row]) != correlated or
+                    bool(scores['is_profitable'][row]) != (payout >= 1 / prob)):
+                mismatches += 1
+        print(f"  {num_legs}-leg: {len(expected):>6} combos checked")
+
+    print(f"  Mismatches vs reference: {mismatches}")
+    print()
+
+    # Throughput on a full-size slate
+    picks = _make_test_slate(100)
+    engine = ParlayCandidateEngine(picks)
+    for num_legs in (2, 3, 4):
+        result = engine.find_profitable(num_legs, min_parlay_ev=0.05)
+        rate = result['processed'] / max(result['seconds'], 1e-9)
+        print(f"  100 picks, {num_legs}-leg: scored {result['processed']:>9,} combos "
+              f"in {result['seconds']:.2f}s ({rate:,.0f}/s), kept {len(result['picks']):,}")
+
+        # Branch-and-bound must return exactly the top of the full enumeration
+        top = np.argsort(-result['ev'], kind='stable')[:75]
+        bounded = engine.search_top_k(num_legs, 75, min_parlay_ev=0.05)
+        if not np.array_equal(result['picks'][top], bounded['picks']):
+            mismatches += 1
+        print(f"    branch-and-bound top 75: {bounded['processed']:,} combos "
+              f"in {bounded['seconds']:.3f}s, same as full search: "
+              f"{np.array_equal(result['picks'][top], bounded['picks'])}")
+
+        # Required legs: same as the full ranking restricted to combos holding one
+        required = [3, 40, 77]
+        holding = np.flatnonzero(np.isin(result['picks'], required).any(axis=1))
+        top_required = holding[np.argsort(-result['ev'][holding], kind='stable')][:75]
+        restricted = engine.search_top_k(num_legs, 75, min_parlay_ev=0.05, required_legs=required)
+        if not np.array_equal(result['picks'][top_required], restricted['picks']):
+            mismatches += 1
+        print(f"    branch-and-bound top 75 holding legs {required}: {restricted['processed']:,} combos, "
+              f"same as full search: {np.array_equal(result['picks'][top_required], restricted['picks'])}")
+
+        # Streaming top-K must match the same ranking with a flat buffer
+        streamed = engine.stream_top_k(num_legs, 75, min_parlay_ev=0.05, block_size=20000)
+        if not np.array_equal(result['picks'][top], streamed['picks']):
+            mismatches += 1
+        print(f"    streamed top 75: same as full search: "
+              f"{np.array_equal(result['picks'][top], streamed['picks'])}")
+
+    print()
+    picks = _make_test_slate(150)
+    engine = ParlayCandidateEngine(picks)
+    for num_legs in (5, 6):
+        bounded = engine.search_top_k(num_legs, 75, min_parlay_ev=0.05)
+        print(f"  150 picks, {num_legs}-leg branch-and-bound top 75: "
+              f"{bounded['processed']:,} combos in {bounded['seconds']:.3f}s "
+              f"(full space {math.comb(150, num_legs):,})")
+
+    # Exhaustive streaming over the 5-leg space keeps memory flat
+    picks = _make_test_slate(60)
+    engine = ParlayCandidateEngine(picks)
+    for num_legs in (5, 6):
+        streamed = engine.stream_top_k(num_legs, 75, min_parlay_ev=0.05)
+        bounded = engine.search_top_k(num_legs, 75, min_parlay_ev=0.05)
+        if not np.array_equal(streamed['picks'], bounded['picks']):
+            mismatches += 1
+        rss = streamed['peak_rss_mb']
+        print(f"  60 picks, {num_legs}-leg streamed top 75: {streamed['processed']:,} combos "
+              f"in {streamed['seconds']:.2f}s ({streamed['combos_per_sec']:,.0f}/s), "
+              f"profitable {streamed['profitable']:,}, process peak RSS "
+              f"{'n/a' if rss is None else f'{rss:.0f} MB'}, "
+              f"same as branch-and-bound: {np.array_equal(streamed['picks'], bounded['picks'])}")
+
+    print()
+
+    # Sharded process-pool scoring must reproduce the serial stream exactly
+    with ShardedCandidateScorer(engine, workers=2) as scorer:
+        for num_legs in (3, 5):
+            serial = engine.stream_top_k(num_legs, 75, min_parlay_ev=0.05)
+            sharded = scorer.top_k(num_legs, 75, min_parlay_ev=0.05)
+            same = (np.array_equal(serial['picks'], sharded['picks']) and
+                    np.array_equal(serial['ev'], sharded['ev']) and
+                    serial['processed'] == sharded['processed'])
+            if not same:
+                mismatches += 1
+            print(f"  60 picks, {num_legs}-leg sharded ({sharded['workers']} workers, "
+                  f"{sharded['shards']} shards): {sharded['seconds']:.2f}s "
+                  f"vs serial {serial['seconds']:.2f}s, same as serial: {same}")
+
+    print()
+
+    # Columnar store vs one dict (with per-leg lists) per candidate
+    import tracemalloc
+    picks = _make_test_slate(100)
+    engine = ParlayCandidateEngine(picks)
+    result = engine.stream_top_k(4, 150000, min_parlay_ev=0.05)
+    names, types = picks['player_name'].tolist(), picks['prop_type'].tolist()
+    lines, pick_evs = picks['line'].tolist(), picks['ev_score'].tolist()
+
+    tracemalloc.start()
+    dicts = []
+    for row in range(len(result['ev'])):
+        combo = tuple(int(i) for i in result['picks'][row])
+        dicts.append({
+            'picks': combo,
+            'pick_names': [names[i] for i in combo],
+            'pick_types': [types[i] for i in combo],
+            'pick_lines': [lines[i] for i in combo],
+            'pick_evs': [pick_evs[i] for i in combo],
+            'ev': float(result['ev'][row]),
+            'probability': float(result['probability'][row]),
+            'actual_payout': float(result['actual_payout'][row]),
+            'breakeven_payout': float(result['breakeven_payout'][row]),
+            'is_profitable': True,
+            'frequency_score': 0
+        })
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del dicts
+
+    store = ParlayCandidateStore.from_result(result)
+    if store.leg_indices(0) != tuple(result['picks'][0].tolist()):
+        mismatches += 1
+    print(f"  {len(store):,} 4-leg candidates: dicts {dict_bytes / 1e6:.1f} MB, "
+          f"columnar store {store.memory_bytes() / 1e6:.1f} MB "
+          f"({dict_bytes / store.memory_bytes():.0f}x smaller)")
+
+    print()
+
+    # Poisson-binomial DP vs brute force over every hit/miss pattern
+    from itertools import product
+    rng = np.random.default_rng(5)
+    leg_probs = rng.uniform(0.3, 0.8, size=(500, 6))
+    brute = np.zeros((500, 7))
+    for pattern in product((0, 1), repeat=6):
+        hits = np.array(pattern, dtype=bool)
+        brute[:, hits.sum()] += np.prod(np.where(hits, leg_probs, 1 - leg_probs), axis=1)
+    dp_ok = np.allclose(hit_distribution(leg_probs), brute, rtol=0, atol=1e-12)
+    if not dp_ok:
+        mismatches += 1
+    print(f"  Hit distribution DP matches brute force (500 x 6 legs): {dp_ok}")
+
+    picks = _make_test_slate(150)
+    engine = ParlayCandidateEngine(picks)
+    combos = next(engine.conflicts.iter_independent_sets(5, block_size=1000000))
+    start = time.perf_counter()
+    play_types = engine.score_play_types(combos)
+    print(f"  Power + Flex EV/variance for {len(combos):,} 5-leg parlays: "
+          f"{time.perf_counter() - start:.2f}s, Flex better on "
+          f"{(play_types['flex_ev'] > play_types['power_ev']).mean():.1%}")
+
+    print()
+
+    # Lazy greedy must pick what a full rescore-and-sort every round picks
+    rng = np.random.default_rng(11)
+    target = rng.integers(3, 21, size=100).astype(np.float64)
+    legs = np.array([rng.choice(100, 3, replace=False) for _ in range(2000)])
+    evs = rng.uniform(0.05, 1.5, size=len(legs))
+
+    actual = np.zeros(100, dtype=np.int64)
+    reference = []
+    remaining = list(range(len(legs)))
+    for _ in range(40):
+        contributions = frequency_contributions(actual, target)
+        best = max(remaining, key=lambda r: 0.7 * evs[r] + 0.3 * contributions[legs[r]].mean())
+        remaining.remove(best)
+        reference.append(best)
+        actual[legs[best]] += 1
+
+    lazy = [row for row, _ in lazy_greedy_select(legs, evs, target, np.zeros(100, dtype=np.int64), 40)]
+    if lazy != reference:
+        mismatches += 1
+    print(f"  Lazy greedy matches full rescore (40 of 2,000): {lazy == reference}")
+
+    legs = np.array([rng.choice(150, 4, replace=False) for _ in range(500000)])
+    evs = rng.uniform(0.05, 3.0, size=len(legs))
+    start = time.perf_counter()
+    lazy_greedy_select(legs, evs, rng.integers(3, 21, size=150).astype(np.float64),
+                       np.zeros(150, dtype=np.int64), 50)
+    print(f"  Lazy greedy 50 of 500,000: {time.perf_counter() - start:.2f}s")
+    print()
+
+    # Copula pricing: same-game combos are scored instead of excluded
+    from joint_probability import GaussianCopula, nearest_correlation_matrix
+    picks = _make_test_slate(30)
+    games = pd.factorize(picks['game_id'])[0]
+    correlation = nearest_correlation_matrix(np.where(games[:, None] == games[None, :], 0.25, 0.0))
+    copula_engine = ParlayCandidateEngine(picks, copula=GaussianCopula(correlation))
+
+    result = copula_engine.stream_top_k(3, top_k=200)
+    same_game = ~ConflictMatrix.from_slate(picks['game_id'], picks['team']).independent_mask(result['picks'])
+    repriced = copula_engine.copula.joint_probabilities(result['picks'], copula_engine.probabilities)
+    if not np.array_equal(result['probability'], repriced):
+        mismatches += 1
+    print(f"  Copula top 200 3-leg: {same_game.sum()} same-game parlays priced, "
+          f"{copula_engine.conflicts.independent_mask(result['picks']).all()} without repeated players")
+
+    independent = ParlayCandidateEngine(picks, copula=GaussianCopula(np.eye(len(picks))))
+    combos = np.concatenate(list(independent.conflicts.iter_independent_sets(4)))
+    if not np.array_equal(independent.parlay_probabilities(combos), np.prod(independent.probabilities[combos], axis=1)):
+        mismatches += 1
+    print(f"  Identity copula equals independent pricing ({len(combos):,} 4-leg combos)")
+
+    print()
+    print("[PASS]" if mismatches == 0 else "[FAIL]")
+
+
+if __name__ == "__main__":
+    test_engine()
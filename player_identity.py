@@ -0,0 +1,557 @@
+"""
+Player Identity Index
+
+Canonical player identities plus every observed spelling of their names,
+so PrizePicks, our predictions, player_stats and NHL API boxscores can be
+joined on a player_id instead of ad-hoc string matching.
+
+    player_identities: player_id -> canonical name, teams ("COL,CAR,DAL",
+                       most recent last, as in player_stats for traded players)
+    player_aliases:    observed spelling -> player_id
+
+In memory, each identity is indexed under normalized keys (accents,
+periods, apostrophes, hyphens and Jr./Sr./II/III suffixes removed):
+
+    full     "elias lindholm"      exact name
+    initial  "e lindholm"          NHL API style abbreviation ("E. Lindholm")
+    last     "lindholm"            bare last name only, when unambiguous
+
+resolve() checks the exact alias, then the full, initial and last-name
+keys with dictionary lookups. Initial / last-name matches must agree with
+the first name and one of the player's known teams; several candidates are
+narrowed by team and otherwise left unresolved rather than guessed.
+
+Usage:
+    from player_identity import get_player_index
+
+    index = get_player_index()
+    index.resolve("E. Lindholm", team="BOS")      # -> player_id or None
+    index.same_player("Elias Lindholm", "E. Lindholm")
+"""
+
+import sqlite3
+import unicodedata
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DB_PATH = "database/nhl_predictions.db"
+
+# Name suffixes ignored when matching
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv'}
+
+# Tables whose player names seed / refresh the identity table (if present)
+NAME_SOURCES = [
+    ('player_stats', 'player_name', 'team'),
+    ('predictions', 'player_name', 'team'),
+    ('prizepicks_edges', 'player_name', 'team'),
+    ('prizepicks_lines', 'player_name', 'team'),
+]
+
+# Shared instances keyed by database path
+_INDEXES = {}
+
+
+def normalize_name(name: str) -> List[str]:
+    """
+    Name tokens used for matching.
+
+    "Tim Stützle" -> ['tim', 'stutzle'], "T.J. Oshie" -> ['tj', 'oshie'],
+    "Oliver Ekman-Larsson" -> ['oliver', 'ekman', 'larsson'],
+    "Martin St. Louis Jr." -> ['martin', 'st', 'louis']
+    """
+    if not name:
+        return []
+
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace('.', '').replace("'", '').replace('’', '').replace('-', ' ').replace(',', ' ')
+
+    tokens = text.split()
+    while len(tokens) > 1 and tokens[-1] in NAME_SUFFIXES:
+        tokens.pop()
+    return tokens
+
+
+def name_keys(name: str) -> Tuple[Optional[str], List[str], Optional[str]]:
+    """
+    Index keys of a full name.
+
+    Returns:
+        (full key, initial keys, last-name key). Initial keys cover the
+        first initial with the rest of the name and with the last token
+        ("P. Luc Dubois" / "P. Dubois" for "Pierre-Luc Dubois").
+    """
+    tokens = normalize_name(name)
+    if not tokens:
+        return None, [], None
+
+    full = ' '.join(tokens)
+    if len(tokens) == 1:
+        return full, [], tokens[0]
+
+    initials = [f"{tokens[0][0]} {' '.join(tokens[1:])}", f"{tokens[0][0]} {tokens[-1]}"]
+    return full, list(dict.fromkeys(initials)), tokens[-1]
+
+
+def split_teams(team: Optional[str]) -> List[str]:
+    """Team abbreviations of a team field ('COL,CAR,DAL' for traded players)."""
+    if not team:
+        return []
+    return [abbrev.strip() for abbrev in str(team).split(',') if abbrev.strip()]
+
+
+def create_player_identity_tables(conn: sqlite3.Connection):
+    """Create the identity tables if they do not exist."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS player_identities (
+            player_id INTEGER PRIMARY KEY,
+            canonical_name TEXT NOT NULL,
+            team TEXT,
+            created_at TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS player_aliases (
+            alias TEXT PRIMARY KEY,
+            player_id INTEGER NOT NULL,
+            source TEXT,
+            created_at TEXT
+        )
+    """)
+    conn.commit()
+
+
+class PlayerIdentityIndex:
+    """
+    In-memory hash index over player_identities / player_aliases.
+
+    New identities and aliases are kept in memory until save().
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        """
+        Args:
+            db_path: SQLite database path (None = in-memory only)
+        """
+        self.db_path = db_path
+        self.players = {}      # player_id -> {'canonical_name', 'team' (current), 'teams', 'first'}
+        self.aliases = {}      # observed spelling -> player_id
+
+        self._full = {}        # normalized keys -> set of player_ids
+        self._initial = {}
+        self._last = {}
+
+        self._pending_players = set()
+        self._pending_aliases = []
+        self._next_id = 1
+
+    # ------------------------------------------------------------------
+    # Loading / saving
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, db_path: str = DB_PATH, refresh: bool = True) -> 'PlayerIdentityIndex':
+        """
+        Load the identity table (creating it if needed).
+
+        Args:
+            db_path: SQLite database path
+            refresh: Register names from NAME_SOURCES that are not known yet
+                (bootstraps an empty table) and save them
+        """
+        index = cls(db_path)
+
+        conn = sqlite3.connect(db_path)
+        create_player_identity_tables(conn)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT player_id, canonical_name, team FROM player_identities ORDER BY player_id")
+        for player_id, canonical_name, team in cursor.fetchall():
+            index._add_player(player_id, canonical_name, team)
+
+        cursor.execute("SELECT alias, player_id FROM player_aliases")
+        for alias, player_id in cursor.fetchall():
+            if player_id in index.players:
+                index.aliases[alias] = player_id
+
+        if refresh:
+            index.refresh_from_database(conn)
+
+        conn.close()
+
+        if refresh:
+            index.save()
+        return index
+
+    def refresh_from_database(self, conn: sqlite3.Connection) -> int:
+        """
+        Register every (name, team) in NAME_SOURCES not seen yet, and record
+        teams reported for known players (rows read oldest first, so the
+        last team reported becomes the current one).
+
+        Returns:
+            Number of new identities
+        """
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        before = len(self.players)
+
+        for table, name_column, team_column in NAME_SOURCES:
+            if table not in existing:
+                continue
+            try:
+                rows = conn.execute(f"""
+                    SELECT {name_column}, {team_column}
+                    FROM {table}
+                    WHERE {name_column} IS NOT NULL
+                    GROUP BY {name_column}, {team_column}
+                    ORDER BY MAX(rowid)
+                """).fetchall()
+            except sqlite3.Error as e:
+                print(f"[WARNING] Could not read player names from {table}: {e}")
+                continue
+
+            for name, team in rows:
+                self.register(name, team, source=table)
+
+        return len(self.players) - before
+
+    def save(self) -> int:
+        """
+        Write identities / aliases added since load.
+
+        Returns:
+            Number of rows written
+        """
+        if self.db_path is None or not (self._pending_players or self._pending_aliases):
+            return 0
+
+        now = datetime.now().isoformat()
+        conn = sqlite3.connect(self.db_path)
+        create_player_identity_tables(conn)
+        conn.executemany(
+            "INSERT OR REPLACE INTO player_identities (player_id, canonical_name, team, created_at) VALUES (?, ?, ?, ?)",
+            [(player_id, self.players[player_id]['canonical_name'], ','.join(self.players[player_id]['teams']), now)
+             for player_id in sorted(self._pending_players)]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO player_aliases (alias, player_id, source, created_at) VALUES (?, ?, ?, ?)",
+            [(alias, player_id, source, now) for alias, player_id, source in self._pending_aliases]
+        )
+        conn.commit()
+        conn.close()
+
+        written = len(self._pending_players) + len(self._pending_aliases)
+        self._pending_players = set()
+        self._pending_aliases = []
+        return written
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _add_player(self, player_id: int, canonical_name: str, team: Optional[str]):
+        teams = split_teams(team)
+        self.players[player_id] = {'canonical_name': canonical_name, 'team': teams[-1] if teams else None,
+                                   'teams': teams, 'first': normalize_name(canonical_name)[0]}
+        self.aliases.setdefault(canonical_name, player_id)
+        self._next_id = max(self._next_id, player_id + 1)
+
+        full, initials, last = name_keys(canonical_name)
+        if full:
+            self._full.setdefault(full, set()).add(player_id)
+        for key in initials:
+            self._initial.setdefault(key, set()).add(player_id)
+        if last:
+            self._last.setdefault(last, set()).add(player_id)
+
+    def register(self, name: str, team: Optional[str] = None, source: str = None) -> Optional[int]:
+        """
+        Identity of a full name from one of our data sources, created if new.
+
+        A name that resolves to an existing player (same normalized full
+        name, or an unambiguous abbreviation) becomes an alias of it, and
+        `team` is recorded as that player's current team.
+        """
+        if not name or not normalize_name(name):
+            return None
+
+        player_id = self.aliases.get(name)
+        if player_id is None:
+            full, _, _ = name_keys(name)
+            player_id = self._pick(self._full.get(full), team)
+            if player_id is None and self._looks_abbreviated(name):
+                player_id = self.resolve(name, team)
+
+        if player_id is None:
+            player_id = self._next_id
+            self._add_player(player_id, name, team)
+            self._pending_players.add(player_id)
+        else:
+            self.add_teams(player_id, team)
+
+        self.add_alias(name, player_id, source)
+        return player_id
+
+    def add_teams(self, player_id: int, team: Optional[str]):
+        """Record team(s) reported for a player; the last one becomes current."""
+        player = self.players[player_id]
+        for abbrev in split_teams(team):
+            if player['team'] != abbrev:
+                if abbrev in player['teams']:
+                    player['teams'].remove(abbrev)
+                player['teams'].append(abbrev)
+                player['team'] = abbrev
+                self._pending_players.add(player_id)
+
+    def add_alias(self, alias: str, player_id: int, source: str = None):
+        """Record an observed spelling of a player (e.g. a nickname)."""
+        if self.aliases.get(alias) != player_id:
+            self.aliases[alias] = player_id
+            self._pending_aliases.append((alias, player_id, source))
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _looks_abbreviated(name: str) -> bool:
+        tokens = normalize_name(name)
+        return len(tokens) >= 2 and len(tokens[0]) == 1
+
+    def _pick(self, candidates: Optional[Set[int]], team: Optional[str], strict_team: bool = False) -> Optional[int]:
+        """
+        Single candidate, or the single one on `team`; None if ambiguous.
+
+        With strict_team (partial-name matches), a candidate with known
+        teams none of which is `team` is never accepted.
+        """
+        if not candidates:
+            return None
+        if strict_team and team:
+            candidates = [player_id for player_id in candidates
+                          if not self.players[player_id]['teams'] or team in self.players[player_id]['teams']]
+        if len(candidates) == 1:
+            return next(iter(candidates))
+        if team:
+            on_team = [player_id for player_id in candidates if team in self.players[player_id]['teams']]
+            if len(on_team) == 1:
+                return on_team[0]
+        return None
+
+    def _first_name_agrees(self, candidates: Optional[Set[int]], first: str) -> Set[int]:
+        """
+        Candidates whose first name is compatible with `first`: same initial
+        for an abbreviation ("E."), otherwise one name a prefix of the other
+        ("Mitch" / "Mitchell", but not "Jake" / "Jack").
+        """
+        if not candidates:
+            return set()
+        if len(first) == 1:
+            return {player_id for player_id in candidates if self.players[player_id]['first'][0] == first}
+        return {player_id for player_id in candidates
+                if self.players[player_id]['first'].startswith(first) or first.startswith(self.players[player_id]['first'])}
+
+    def resolve(self, name: str, team: Optional[str] = None) -> Optional[int]:
+        """
+        player_id of a name in any known spelling or abbreviation.
+
+        Args:
+            name: Player name as written by any source
+            team: Team abbreviation, used to break ties between candidates
+                and to reject partial-name matches on another team
+
+        Returns:
+            player_id, or None if unknown / ambiguous
+        """
+        if not name:
+            return None
+
+        player_id = self.aliases.get(name)
+        if player_id is not None:
+            return player_id
+
+        full, initials, last = name_keys(name)
+        if full is None:
+            return None
+
+        # Exact name (modulo accents, punctuation and suffixes)
+        candidates = self._full.get(full)
+        if candidates:
+            return self._pick(candidates, team)
+
+        # Bare last name ("Lindholm"): last resort, only without a first name
+        if not initials:
+            return self._pick(self._last.get(last), team, strict_team=True)
+
+        # "E. Lindholm" style abbreviation, or a different first-name
+        # spelling ("Mitch" / "Mitchell") with the same initial + last name
+        first = normalize_name(name)[0]
+        keys = [full] if self._looks_abbreviated(name) else initials
+        for key in keys:
+            candidates = self._first_name_agrees(self._initial.get(key), first)
+            if candidates:
+                return self._pick(candidates, team, strict_team=True)
+
+        return None
+
+    def resolve_many(self, names: Iterable[str], teams: Iterable[Optional[str]] = None) -> List[Optional[int]]:
+        """resolve() for many names (teams aligned with names, optional)."""
+        names = list(names)
+        teams = [None] * len(names) if teams is None else list(teams)
+        return [self.resolve(name, team) for name, team in zip(names, teams)]
+
+    def resolve_unique(self, names: Iterable[str], teams: Iterable[Optional[str]] = None) -> List[Optional[int]]:
+        """
+        resolve() for the players of one source (e.g. a night's boxscores),
+        where each player_id may belong to at most one name.
+
+        When several names resolve to the same player_id, only the one on
+        that player's known team keeps it; the others (and all of them, if
+        that does not single one out) are left unresolved.
+        """
+        names = list(names)
+        teams = [None] * len(names) if teams is None else list(teams)
+        player_ids = self.resolve_many(names, teams)
+
+        positions = {}
+        for position, player_id in enumerate(player_ids):
+            if player_id is not None:
+                positions.setdefault(player_id, []).append(position)
+
+        for player_id, claims in positions.items():
+            if len(claims) == 1:
+                continue
+            # Current team first, then any team the player has played for
+            player = self.players[player_id]
+            on_team = [position for position in claims if player['team'] and teams[position] == player['team']]
+            if len(on_team) != 1:
+                on_team = [position for position in claims if teams[position] in player['teams']]
+            for position in claims:
+                if len(on_team) != 1 or position != on_team[0]:
+                    player_ids[position] = None
+
+        return player_ids
+
+    def same_player(self, name_a: str, name_b: str, team: Optional[str] = None) -> bool:
+        """Whether two spellings resolve to the same known player."""
+        player_a = self.resolve(name_a, team)
+        return player_a is not None and player_a == self.resolve(name_b, team)
+
+    def canonical_name(self, player_id: int) -> Optional[str]:
+        player = self.players.get(player_id)
+        return player['canonical_name'] if player else None
+
+    def lookup_table(self, names: Iterable[str], teams: Iterable[Optional[str]] = None) -> Dict[int, str]:
+        """
+        player_id -> name for a set of names from one source (e.g. a night's
+        boxscore), so names from another source can be matched in O(1).
+        """
+        names = list(names)
+        return {player_id: name for name, player_id in zip(names, self.resolve_unique(names, teams))
+                if player_id is not None}
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+
+def get_player_index(db_path: str = DB_PATH) -> PlayerIdentityIndex:
+    """
+    Shared PlayerIdentityIndex for a database.
+
+    Loaded (and refreshed from NAME_SOURCES) once per process; falls back
+    to an empty in-memory index if the database cannot be read.
+    """
+    index = _INDEXES.get(db_path)
+    if index is None:
+        try:
+            index = PlayerIdentityIndex.load(db_path)
+        except sqlite3.Error as e:
+            print(f"[WARNING] Player identity table unavailable ({e}) - names resolve in memory only")
+            index = PlayerIdentityIndex(None)
+        _INDEXES[db_path] = index
+    return index
+
+
+def test_player_identity():
+    """Resolution of the spellings seen across PrizePicks, predictions and the NHL API."""
+    import os
+    import tempfile
+
+    print("\n" + "="*80)
+    print("PLAYER IDENTITY INDEX TEST")
+    print("="*80)
+    print()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'player_identity_test.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE player_stats (player_name TEXT, team TEXT)")
+    conn.executemany("INSERT INTO player_stats VALUES (?, ?)", [
+        ('Elias Lindholm', 'BOS'), ('Connor McDavid', 'EDM'), ('Tim Stützle', 'OTT'),
+        ('T.J. Oshie', 'WSH'), ('Jack Hughes', 'NJD'), ('Luke Hughes', 'NJD'),
+        ('Quinn Hughes', 'VAN'), ('Pierre-Luc Dubois', 'WSH'), ('Mitchell Marner', 'TOR'),
+        ('Oliver Ekman-Larsson', 'TOR'), ('Martin St. Louis Jr.', 'MTL'),
+        ('Brady Tkachuk', 'OTT'), ('Matthew Tkachuk', 'FLA'), ('Reilly Smith', 'PIT'),
+        ('Mikko Rantanen', 'COL,CAR,DAL'), ('Martin Necas', 'CAR'), ('Martin Necas', 'COL'),
+    ])
+    conn.commit()
+    conn.close()
+
+    index = PlayerIdentityIndex.load(db_path)
+    all_pass = True
+
+    def check(label, got, expected):
+        nonlocal all_pass
+        ok = got == expected
+        all_pass &= ok
+        print(f"  {label}: {'PASS' if ok else 'FAIL'}")
+
+    lindholm = index.resolve('Elias Lindholm')
+    check("Abbreviation 'E. Lindholm'", index.resolve('E. Lindholm'), lindholm)
+    check("Accents 'Tim Stutzle'", index.resolve('Tim Stutzle'), index.resolve('Tim Stützle'))
+    check("Periods 'TJ Oshie'", index.resolve('TJ Oshie'), index.resolve('T.J. Oshie'))
+    check("Suffix 'Martin St. Louis'", index.resolve('Martin St. Louis'), index.resolve('Martin St. Louis Jr.'))
+    check("Hyphenated 'P. Dubois'", index.resolve('P. Dubois'), index.resolve('Pierre-Luc Dubois'))
+    check("Hyphenated 'O. Ekman-Larsson'", index.resolve('O. Ekman-Larsson'), index.resolve('Oliver Ekman-Larsson'))
+    check("Nickname 'Mitch Marner'", index.resolve('Mitch Marner'), index.resolve('Mitchell Marner'))
+    check("'J. Hughes' vs 'L. Hughes'", index.resolve('J. Hughes', team='NJD') != index.resolve('L. Hughes'), True)
+    check("'Q. Hughes' resolved", index.resolve('Q. Hughes'), index.resolve('Quinn Hughes'))
+    check("Last name 'Hughes' unresolved", index.resolve('Hughes'), None)
+    check("Last name 'Tkachuk' + team", index.resolve('Tkachuk', team='OTT'), index.resolve('Brady Tkachuk'))
+    check("Unknown player", index.resolve('Wayne Gretzky'), None)
+    check("'Jake Hughes' is not Jack Hughes", index.resolve('Jake Hughes'), None)
+    check("'E. Lindholm' on another team rejected", index.resolve('E. Lindholm', team='NJD'), None)
+    check("'B. Tkachuk' not matched by last name", index.resolve('B. Tkachuk', team='FLA'), None)
+    check("'B. Smith' not matched by last name", index.resolve('B. Smith', team='NJD'), None)
+    check("'Brendan Smith' not matched by last name", index.resolve('Brendan Smith'), None)
+    check("same_player()", index.same_player('Connor McDavid', 'C. McDavid'), True)
+
+    reloaded = PlayerIdentityIndex.load(db_path, refresh=False)
+    check("Persisted identities reload", (len(reloaded), reloaded.resolve('E. Lindholm'),
+                                          reloaded.resolve('M. Rantanen', 'CAR')), (len(index), lindholm, index.resolve('Mikko Rantanen')))
+    rantanen = index.resolve('Mikko Rantanen')
+    check("Traded player ('COL,CAR,DAL') resolved on every team",
+          [index.resolve('M. Rantanen', team) for team in ('DAL', 'COL', 'CAR')], [rantanen] * 3)
+    check("Traded player not resolved on another team", index.resolve('M. Rantanen', 'TOR'), None)
+    necas = index.resolve('Martin Necas')
+    check("Newest team reported becomes current",
+          (index.players[necas]['team'], index.resolve('M. Necas', 'CAR'), index.resolve('M. Necas', 'COL')),
+          ('COL', necas, necas))
+
+    reilly = index.resolve('Reilly Smith')
+    check("Boxscore lookup keeps the real player",
+          index.lookup_table(['B. Smith', 'R. Smith'], ['NJD', 'PIT']), {reilly: 'R. Smith'})
+    check("Same-id collision resolved by team",
+          index.lookup_table(['Reilly Smith', 'R. Smith'], ['NJD', 'PIT']), {reilly: 'R. Smith'})
+    check("Same-id collision without a team match dropped",
+          index.lookup_table(['Reilly Smith', 'R. Smith']), {})
+    check("'B. Smith' registered as a new player, not a Reilly Smith alias",
+          index.register('B. Smith', 'NJD') not in (None, index.resolve('Reilly Smith')), True)
+
+    print()
+    print("[PASS]" if all_pass else "[FAIL]")
+    return all_pass
+
+
+if __name__ == "__main__":
+    test_player_identity()
@@ -0,0 +1,223 @@
+"""
+Compact Prediction Cache
+
+One day's model predictions held as NumPy columns instead of one pandas
+Series per row. Rows are grouped by integer-coded (player, prop) keys and
+sorted by line inside each group, so every player/prop is a contiguous
+slice of the line / probability arrays. Reasoning text (the bulk of a
+prediction row) is only read from the database for rows that are shown.
+
+Shared by MultiLineEVCalculator, PrizePicksIntegration.compare_predictions
+and market_vs_model.py: get_prediction_cache() returns the same instance
+for a database + date until the predictions for that date change.
+
+Usage:
+    from prediction_cache import get_prediction_cache
+
+    cache = get_prediction_cache(conn, '2025-11-03')
+    rows = cache.rows('Connor McDavid', 'points')     # slice, sorted by line
+    cache.line[rows], cache.probability[rows]
+    cache.reasoning(rows.start)                         # loaded on demand
+"""
+
+import sqlite3
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DB_PATH = "database/nhl_predictions.db"
+
+# Categorical columns kept as integer codes + a lookup table
+CODED_COLUMNS = ('player_name', 'team', 'opponent', 'prop_type', 'prediction', 'confidence_tier')
+
+# Numeric columns kept as float arrays
+NUMERIC_COLUMNS = ('line', 'probability', 'expected_value', 'kelly_score')
+
+# Shared instances keyed by (database, date)
+_CACHES = {}
+
+
+def _database_key(conn: sqlite3.Connection) -> str:
+    """File behind a connection (in-memory databases are keyed by connection)."""
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == 'main' and path:
+            return path
+    return f"memory:{id(conn)}"
+
+
+def _fingerprint(conn: sqlite3.Connection, date: str) -> Tuple:
+    """Cheap change marker for a date's predictions."""
+    return tuple(conn.execute(
+        "SELECT COUNT(*), MAX(rowid), TOTAL(probability), TOTAL(line) FROM predictions WHERE game_date = ?",
+        (date,)
+    ).fetchone())
+
+
+class PredictionCache:
+    """
+    Columnar index over one date's predictions.
+
+    Attributes are aligned arrays (one entry per prediction): line,
+    probability, expected_value, kelly_score, rowid, load_order, plus
+    integer codes for the categorical columns (see code() / value()).
+    """
+
+    def __init__(self, frame: pd.DataFrame, conn: sqlite3.Connection, date: str):
+        """
+        Args:
+            frame: Predictions in load order (probability DESC), with rowid
+            conn: Connection used for lazy reasoning lookups
+            date: Game date
+        """
+        self.conn = conn
+        self.date = date
+        self.fingerprint = None
+
+        self.codes = {}
+        self.uniques = {}
+        for column in CODED_COLUMNS:
+            codes, uniques = pd.factorize(frame[column], use_na_sentinel=False)
+            self.codes[column] = codes.astype(np.int32)
+            self.uniques[column] = list(uniques)
+
+        # Group rows by (player, prop); lines ascending, ties keep load order
+        player = self.codes['player_name'].astype(np.int64)
+        prop = self.codes['prop_type'].astype(np.int64)
+        group_key = player * max(len(self.uniques['prop_type']), 1) + prop
+        line = frame['line'].to_numpy(dtype=np.float64)
+        order = np.lexsort((line, group_key))
+
+        for column in CODED_COLUMNS:
+            self.codes[column] = self.codes[column][order]
+        for column in NUMERIC_COLUMNS:
+            setattr(self, column, frame[column].to_numpy(dtype=np.float64)[order])
+        self.rowid = frame['rowid'].to_numpy(dtype=np.int64)[order]
+        self.load_order = order.astype(np.int64)
+
+        sorted_keys = group_key[order]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        if len(order):
+            self.group_start = np.concatenate(([0], boundaries)).astype(np.int64)
+            self.group_end = np.concatenate((boundaries, [len(order)])).astype(np.int64)
+        else:
+            self.group_start = self.group_end = np.empty(0, dtype=np.int64)
+        self.group_of_row = np.repeat(np.arange(len(self.group_start)), self.group_end - self.group_start)
+
+        self._player_codes = {name: i for i, name in enumerate(self.uniques['player_name'])}
+        self._prop_codes = {name: i for i, name in enumerate(self.uniques['prop_type'])}
+        self._groups = {
+            (int(self.codes['player_name'][start]), int(self.codes['prop_type'][start])): g
+            for g, start in enumerate(self.group_start)
+        }
+        self._reasoning = {}
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection, date: str) -> 'PredictionCache':
+        """Read a date's predictions (everything but reasoning text)."""
+        frame = pd.read_sql_query("""
+            SELECT rowid, player_name, team, opponent, prop_type, line, prediction,
+                   probability, expected_value, kelly_score, confidence_tier
+            FROM predictions
+            WHERE game_date = ?
+            ORDER BY probability DESC
+        """, conn, params=(date,))
+        return cls(frame, conn, date)
+
+    def __len__(self) -> int:
+        """Number of (player, prop) groups."""
+        return len(self.group_start)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.line)
+
+    def group(self, player_name: str, prop_type: str) -> int:
+        """Group id of a player/prop (-1 if we have no prediction)."""
+        player = self._player_codes.get(player_name)
+        prop = self._prop_codes.get(prop_type)
+        if player is None or prop is None:
+            return -1
+        return self._groups.get((player, prop), -1)
+
+    def groups(self, player_names: Iterable[str], prop_types: Iterable[str]) -> np.ndarray:
+        """Vectorized group() for many lines."""
+        return np.array([self.group(player, prop) for player, prop in zip(player_names, prop_types)],
+                        dtype=np.int64)
+
+    def rows(self, player_name: str, prop_type: str) -> slice:
+        """Rows of a player/prop (sorted by line; empty slice if unknown)."""
+        g = self.group(player_name, prop_type)
+        if g < 0:
+            return slice(0, 0)
+        return slice(int(self.group_start[g]), int(self.group_end[g]))
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return self.group(*key) >= 0
+
+    def value(self, column: str, row: int):
+        """Decoded categorical value of a row."""
+        return self.uniques[column][self.codes[column][row]]
+
+    def code(self, column: str, value) -> int:
+        """Integer code of a categorical value (-1 if absent)."""
+        try:
+            return self.uniques[column].index(value)
+        except ValueError:
+            return -1
+
+    def in_load_order(self) -> np.ndarray:
+        """Row indices in load order (probability DESC)."""
+        rows = np.empty_like(self.load_order)
+        rows[self.load_order] = np.arange(len(rows))
+        return rows
+
+    def reasonings(self, rows: Iterable[int]) -> List[str]:
+        """Reasoning text for rows, read from the database on first use."""
+        rows = [int(row) for row in rows]
+        missing = sorted({int(self.rowid[row]) for row in rows} - self._reasoning.keys())
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for rowid, text in self.conn.execute(
+                    f"SELECT rowid, reasoning FROM predictions WHERE rowid IN ({placeholders})", chunk):
+                self._reasoning[rowid] = text
+        return [self._reasoning.get(int(self.rowid[row])) for row in rows]
+
+    def reasoning(self, row: int) -> Optional[str]:
+        """Reasoning text of one row (lazy)."""
+        return self.reasonings([row])[0]
+
+    def record(self, row: int) -> Dict:
+        """One prediction as a dict (without reasoning)."""
+        record = {column: self.value(column, row) for column in CODED_COLUMNS}
+        for column in NUMERIC_COLUMNS:
+            record[column] = float(getattr(self, column)[row])
+        return record
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the arrays (excluding lookup tables)."""
+        arrays = [self.rowid, self.load_order, self.group_start, self.group_end, self.group_of_row]
+        arrays += [getattr(self, column) for column in NUMERIC_COLUMNS]
+        arrays += list(self.codes.values())
+        return sum(array.nbytes for array in arrays)
+
+
+def get_prediction_cache(conn: sqlite3.Connection, date: str) -> PredictionCache:
+    """
+    Shared PredictionCache for a database + date.
+
+    Reloaded when the date's predictions change (row count, last rowid or
+    probability / line totals differ), so re-running prediction generation
+    during the day is picked up. Lazy reasoning lookups use the latest
+    caller's connection.
+    """
+    key = (_database_key(conn), date)
+    fingerprint = _fingerprint(conn, date)
+
+    cache = _CACHES.get(key)
+    if cache is None or cache.fingerprint != fingerprint:
+        cache = PredictionCache.load(conn, date)
+        cache.fingerprint = fingerprint
+        _CACHES[key] = cache
+    cache.conn = conn
+    return cache
@@ -11,8 +11,8 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from typing import Dict, List, Optional
-import requests
-import json
+from prediction_cache import get_prediction_cache
+from prizepicks_projections import CACHE_TTL_SECONDS, LEAGUE_IDS, get_projections, parse_projections
 
 DB_PATH = "database/nhl_predictions.db"
 
@@ -20,119 +20,44 @@ DB_PATH = "database/nhl_predictions.db"
 class PrizePicksClient:
     """Enhanced PrizePicks API client"""
 
-    LEAGUE_IDS = {'NHL': 8, 'NFL': 9, 'NBA': 7, 'MLB': 2}
-    
-    def __init__(self):
-        self.base_url = "https://api.prizepicks.com/projections"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://app.prizepicks.com/',
-            'Origin': 'https://app.prizepicks.com'
-        }
-    
-    def get_projections(self, sport: str = 'NHL') -> List[Dict]:
+    LEAGUE_IDS = LEAGUE_IDS
+
+    # Fields of each returned projection
+    FIELDS = ['player_name', 'team', 'opponent', 'prop_type', 'line', 'odds_type', 'stat_type']
+
+    def __init__(self, cache_ttl: float = CACHE_TTL_SECONDS):
+        """
+        Args:
+            cache_ttl: Seconds a PrizePicks snapshot is reused (shared with the
+                other PrizePicks clients, see prizepicks_projections.py)
+        """
+        self.cache_ttl = cache_ttl
+
+    def get_projections(self, sport: str = 'NHL', force_refresh: bool = False) -> List[Dict]:
         """Fetch NHL projections from PrizePicks"""
-        
-        league_id = self.LEAGUE_IDS.get(sport.upper(), 8)
-        params = {'league_id': league_id, 'per_page': 250, 'single_stat': 'true'}
-        
+
         print(f"\n[*] Fetching {sport} lines from PrizePicks...")
-        
+
         try:
-            response = requests.get(self.base_url, params=params, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            
-            api_data = response.json()
-            projections = self._parse_response(api_data)
-            
+            projections = self._to_records(
+                get_projections(sport, ttl=self.cache_ttl, force_refresh=force_refresh))
+
             print(f"[+] Fetched {len(projections)} player projections")
             return projections
-            
+
         except Exception as e:
             print(f"[!] Failed to fetch PrizePicks: {e}")
             return []
-    
+
     def _parse_response(self, api_data: Dict) -> List[Dict]:
         """Parse PrizePicks API response"""
-        
-        projections_raw = api_data.get('data', [])
-        included = api_data.get('included', [])
-        
-        # Build lookups
-        players = {}
-        games = {}
-        
-        for item in included:
-            item_type = item.get('type')
-            item_id = item.get('id')
-            attrs = item.get('attributes', {})
-            
-            if item_type == 'new_player':
-                players[item_id] = {
-                    'name': attrs.get('name', 'Unknown'),
-                    'team': attrs.get('team', 'UNK'),
-                    'position': attrs.get('position', 'UNK')
-                }
-            elif item_type == 'game':
-                games[item_id] = {
-                    'away_team': attrs.get('away_team', 'UNK'),
-                    'home_team': attrs.get('home_team', 'UNK'),
-                    'game_time': attrs.get('game_time')
-                }
-        
-        # Parse projections
-        result = []
-        
-        for proj in projections_raw:
-            attrs = proj.get('attributes', {})
-            relationships = proj.get('relationships', {})
-            
-            # Get player
-            player_id = relationships.get('new_player', {}).get('data', {}).get('id')
-            player_info = players.get(player_id, {'name': 'Unknown', 'team': 'UNK'})
-            
-            # Get game
-            game_id = relationships.get('game', {}).get('data', {}).get('id')
-            game_info = games.get(game_id, {})
-            
-            # Determine opponent
-            player_team = player_info['team']
-            opponent = 'UNK'
-            if game_info:
-                if player_team == game_info.get('away_team'):
-                    opponent = game_info.get('home_team', 'UNK')
-                elif player_team == game_info.get('home_team'):
-                    opponent = game_info.get('away_team', 'UNK')
-            
-            # Extract projection
-            stat_type = attrs.get('stat_type', 'Unknown')
-            line_score = attrs.get('line_score')
-            odds_type = attrs.get('odds_type', 'standard')
-            
-            # Map stat types
-            stat_map = {
-                'Points': 'points',
-                'Shots On Goal': 'shots',
-                'SOG': 'shots',
-                'Goals': 'goals',
-                'Assists': 'assists'
-            }
-            
-            prop_type = stat_map.get(stat_type, stat_type.lower())
-            
-            result.append({
-                'player_name': player_info['name'],
-                'team': player_team,
-                'opponent': opponent,
-                'prop_type': prop_type,
-                'line': float(line_score) if line_score else None,
-                'odds_type': odds_type,
-                'stat_type': stat_type
-            })
-        
-        return result
+        return self._to_records(parse_projections(api_data))
+
+    def _to_records(self, projections: pd.DataFrame) -> List[Dict]:
+        """Normalized projections -> list of dicts (line None when missing)"""
+        records = projections[self.FIELDS].astype(object)
+        records['line'] = records['line'].where(projections['line'].notna(), None)
+        return records.to_dict('records')
 
 
 class EdgeCalculator:
@@ -297,68 +222,66 @@ class PrizePicksIntegration:
         print("="*80)
         print()
 
-        # Get our predictions
-        query = """
-            SELECT
-                player_name, team, opponent, prop_type, line,
-                probability, expected_value, kelly_score,
-                confidence_tier, reasoning
-            FROM predictions
-            WHERE game_date = ?
-            ORDER BY probability DESC
-        """
-
-        our_preds = pd.read_sql_query(query, self.conn, params=(date,))
+        # Get our predictions (shared compact cache)
+        cache = get_prediction_cache(self.conn, date)
 
-        if len(our_preds) == 0:
+        if cache.n_rows == 0:
             print("[WARNING] No predictions found for today")
             print("   Run: python enhanced_predictions.py")
             return []
 
-        print(f"Comparing {len(our_preds)} predictions against PrizePicks...")
+        print(f"Comparing {cache.n_rows} predictions against PrizePicks...")
         print()
         
         # Find matches and calculate edge
         edge_plays = []
         
-        for _, pred in our_preds.iterrows():
-            key = f"{pred['player_name']}_{pred['prop_type']}"
+        for row in cache.in_load_order():
+            player_name = cache.value('player_name', row)
+            prop_type = cache.value('prop_type', row)
+            key = f"{player_name}_{prop_type}"
             
             if key in self.prizepicks_lines:
                 pp_lines = self.prizepicks_lines[key]
+                probability = float(cache.probability[row])
                 
                 for pp_line in pp_lines:
                     # Check if lines match (within 0.5)
-                    line_diff = abs(pred['line'] - pp_line['line'])
+                    line_diff = abs(cache.line[row] - pp_line['line'])
                     
                     if line_diff <= 0.5:
                         # Calculate edge
                         edge_data = self.edge_calculator.calculate_edge(
-                            pred['probability'],
+                            probability,
                             pp_line['line'],
                             pp_line['odds_type']
                         )
                         
                         if edge_data['bet_recommended']:
                             edge_plays.append({
-                                'player': pred['player_name'],
-                                'team': pred['team'],
-                                'opponent': pred['opponent'],
-                                'prop_type': pred['prop_type'],
+                                'player': player_name,
+                                'team': cache.value('team', row),
+                                'opponent': cache.value('opponent', row),
+                                'prop_type': prop_type,
                                 'line': pp_line['line'],
                                 'odds_type': pp_line['odds_type'],
-                                'our_prob': pred['probability'],
+                                'our_prob': probability,
                                 'pp_implied_prob': edge_data['pp_implied_prob'],
                                 'edge': edge_data['edge'],
                                 'ev': edge_data['ev'],
-                                'kelly': pred['kelly_score'],
-                                'tier': pred['confidence_tier'],
-                                'reasoning': pred['reasoning'],
+                                'kelly': float(cache.kelly_score[row]),
+                                'tier': cache.value('confidence_tier', row),
+                                'row': int(row),
                                 'payout': edge_data['payout_multiplier']
                             })
         
         # Sort by edge
         edge_plays.sort(key=lambda x: x['edge'], reverse=True)
+
+        # Reasoning text is only read for the plays we return
+        rows = [play.pop('row') for play in edge_plays]
+        for play, reasoning in zip(edge_plays, cache.reasonings(rows)):
+            play['reasoning'] = reasoning
         
         # Display results
         if edge_plays:
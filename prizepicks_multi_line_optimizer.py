@@ -9,9 +9,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from typing import Dict, List, Tuple
-import requests
-import json
 from scipy import stats as scipy_stats
+from prediction_cache import PredictionCache, get_prediction_cache
+from prizepicks_projections import CACHE_TTL_SECONDS, LEAGUE_IDS, get_projections, parse_projections
 
 
 DB_PATH = "database/nhl_predictions.db"
@@ -20,35 +20,30 @@ DB_PATH = "database/nhl_predictions.db"
 class PrizePicksMultiLineClient:
     """Enhanced PrizePicks API client that fetches ALL available lines"""
 
-    LEAGUE_IDS = {'NHL': 8, 'NFL': 9, 'NBA': 7, 'MLB': 2}
+    LEAGUE_IDS = LEAGUE_IDS
 
-    def __init__(self):
-        self.base_url = "https://api.prizepicks.com/projections"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://app.prizepicks.com/',
-            'Origin': 'https://app.prizepicks.com'
-        }
+    # Columns of the returned board
+    COLUMNS = ['player_name', 'team', 'opponent', 'prop_type', 'line', 'odds_type', 'stat_type']
 
-    def get_all_projections(self, sport: str = 'NHL') -> pd.DataFrame:
+    def __init__(self, cache_ttl: float = CACHE_TTL_SECONDS):
+        """
+        Args:
+            cache_ttl: Seconds a PrizePicks snapshot is reused (shared with the
+                other PrizePicks clients, see prizepicks_projections.py)
+        """
+        self.cache_ttl = cache_ttl
+
+    def get_all_projections(self, sport: str = 'NHL', force_refresh: bool = False) -> pd.DataFrame:
         """
         Fetch ALL NHL projections from PrizePicks.
         Returns DataFrame with one row per line (not grouped by player).
         """
 
-        league_id = self.LEAGUE_IDS.get(sport.upper(), 8)
-        params = {'league_id': league_id, 'per_page': 250, 'single_stat': 'true'}
-
         print(f"\n[*] Fetching ALL {sport} lines from PrizePicks...")
 
         try:
-            response = requests.get(self.base_url, params=params, headers=self.headers, timeout=15)
-            response.raise_for_status()
-
-            api_data = response.json()
-            projections = self._parse_to_dataframe(api_data)
+            projections = get_projections(sport, ttl=self.cache_ttl, force_refresh=force_refresh)
+            projections = self._to_board(projections)
 
             print(f"[+] Fetched {len(projections)} total lines (all players/props/lines)")
             return projections
@@ -59,94 +54,12 @@ class PrizePicksMultiLineClient:
 
     def _parse_to_dataframe(self, api_data: Dict) -> pd.DataFrame:
         """Parse PrizePicks API response into flat DataFrame"""
+        return self._to_board(parse_projections(api_data))
 
-        projections_raw = api_data.get('data', [])
-        included = api_data.get('included', [])
-
-        # Build lookups
-        players = {}
-        games = {}
-
-        for item in included:
-            item_type = item.get('type')
-            item_id = item.get('id')
-            attrs = item.get('attributes', {})
-
-            if item_type == 'new_player':
-                players[item_id] = {
-                    'name': attrs.get('name', 'Unknown'),
-                    'team': attrs.get('team', 'UNK'),
-                    'position': attrs.get('position', 'UNK')
-                }
-            elif item_type == 'game':
-                games[item_id] = {
-                    'away_team': attrs.get('away_team', 'UNK'),
-                    'home_team': attrs.get('home_team', 'UNK'),
-                    'game_time': attrs.get('game_time')
-                }
-
-        # Parse projections to list
-        rows = []
-
-        for proj in projections_raw:
-            attrs = proj.get('attributes', {})
-            relationships = proj.get('relationships', {})
-
-            # Get player
-            player_id = relationships.get('new_player', {}).get('data', {}).get('id')
-            player_info = players.get(player_id, {'name': 'Unknown', 'team': 'UNK'})
-
-            # Get game
-            game_id = relationships.get('game', {}).get('data', {}).get('id')
-            game_info = games.get(game_id, {})
-
-            # Determine opponent
-            player_team = player_info['team']
-            opponent = 'UNK'
-            if game_info:
-                if player_team == game_info.get('away_team'):
-                    opponent = game_info.get('home_team', 'UNK')
-                elif player_team == game_info.get('home_team'):
-                    opponent = game_info.get('away_team', 'UNK')
-
-            # Extract projection
-            stat_type = attrs.get('stat_type', 'Unknown')
-            line_score = attrs.get('line_score')
-            odds_type = attrs.get('odds_type', 'standard')
-
-            # Map stat types
-            stat_map = {
-                'Points': 'points',
-                'Shots On Goal': 'shots',
-                'SOG': 'shots',
-                'Goals': 'goals',
-                'Assists': 'assists',
-                'Blocked Shots': 'blocks',
-                'Hits': 'hits',
-                'Time On Ice': 'toi',
-                'TOI': 'toi',
-                'Saves': 'goalie_saves',
-                'Goalie Saves': 'goalie_saves'
-            }
-
-            prop_type = stat_map.get(stat_type, stat_type.lower())
-
-            rows.append({
-                'player_name': player_info['name'],
-                'team': player_team,
-                'opponent': opponent,
-                'prop_type': prop_type,
-                'line': float(line_score) if line_score else None,
-                'odds_type': odds_type,
-                'stat_type': stat_type
-            })
-
-        df = pd.DataFrame(rows)
-
-        # Remove any rows with missing lines
-        df = df[df['line'].notna()].reset_index(drop=True)
-
-        return df
+    def _to_board(self, projections: pd.DataFrame) -> pd.DataFrame:
+        """Normalized projections -> one row per line, rows without a line removed"""
+        board = projections[self.COLUMNS]
+        return board[board['line'].notna()].reset_index(drop=True)
 
 
 class MultiLineEVCalculator:
@@ -164,50 +77,231 @@ class MultiLineEVCalculator:
         'demon': 2.0        # Rough estimate (50% implied)
     }
 
-    def __init__(self, conn):
-        self.conn = conn
-        self.predictions_cache = {}
-        self.multiplier_learner = None
+    # Binary events (points, goals, assists) extrapolate with EXPONENTIAL decay
+    BINARY_DECAY_RATES = {
+        'points': 0.60,    # 2 points is MUCH harder than 1
+        'goals': 0.55,     # Even harder
+        'assists': 0.65,   # Harder but more achievable
+    }
 
-        # TEMPORARILY DISABLED: Use fallback multipliers to test exponential decay fix
-        # Load multiplier learner
-        # try:
-        #     from prizepicks_multiplier_learner import PrizePicksMultiplierLearner
-        #     self.multiplier_learner = PrizePicksMultiplierLearner()
-        #     print("[+] Loaded multiplier learner - will use ACTUAL learned multipliers")
-        # except:
-        #     print("[WARNING] Multiplier learner not available - using fallback assumptions")
-        #     self.multiplier_learner = None
+    # Counting stats (shots, blocks, hits, saves) extrapolate with a NORMAL
+    # distribution, std_dev = ratio * mean
+    STD_DEV_RATIOS = {
+        'shots': 0.40,
+        'blocks': 0.45,
+        'hits': 0.45,
+        'saves': 0.35,
+        'goalie_saves': 0.35,
+        'toi': 0.30  # TOI has lower variance (more predictable)
+    }
+
+    # How a line's probability was estimated
+    EXACT, INTERPOLATED, EXTRAPOLATED_UP, EXTRAPOLATED_DOWN = range(4)
+
+    # Spacing between player+prop groups in the flat line index (> any line)
+    LINE_GROUP_OFFSET = 10000.0
 
+    def __init__(self, conn, use_learned_multipliers: bool = False):
+        """
+        Args:
+            conn: Database connection
+            use_learned_multipliers: Look up learned individual multipliers
+                (PrizePicksMultiplierLearner, indexed in memory) before the
+                fallback assumptions
+        """
+        self.conn = conn
+        self.predictions_cache = None
+        self._index = None
         self.multiplier_learner = None
-        print("[!] Using fallback multipliers (learned multipliers temporarily disabled for testing)")
 
-    def load_predictions(self, date: str = None) -> pd.DataFrame:
-        """Load our model's predictions for the date"""
+        if use_learned_multipliers:
+            try:
+                from prizepicks_multiplier_learner import PrizePicksMultiplierLearner
+                self.multiplier_learner = PrizePicksMultiplierLearner()
+                print(f"[+] Loaded multiplier learner - {self.multiplier_learner.count_learned()} learned multipliers in memory")
+            except Exception as e:
+                print(f"[WARNING] Multiplier learner not available ({e}) - using fallback assumptions")
+                self.multiplier_learner = None
+        else:
+            print("[!] Using fallback multipliers (learned multipliers temporarily disabled for testing)")
+
+    def load_predictions(self, date: str = None) -> PredictionCache:
+        """Load our model's predictions for the date (shared compact cache)"""
 
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
 
-        query = """
-            SELECT
-                player_name, team, opponent, prop_type, line,
-                probability, expected_value, kelly_score,
-                confidence_tier, reasoning
-            FROM predictions
-            WHERE game_date = ?
-            ORDER BY probability DESC
-        """
+        self.predictions_cache = get_prediction_cache(self.conn, date)
+        self._index = None
+        return self.predictions_cache
 
-        df = pd.read_sql_query(query, self.conn, params=(date,))
+    def _line_index(self) -> Dict:
+        """
+        Line index over the prediction cache.
 
-        # Cache predictions by player+prop for faster lookup
-        for _, row in df.iterrows():
-            key = f"{row['player_name']}_{row['prop_type']}"
-            if key not in self.predictions_cache:
-                self.predictions_cache[key] = []
-            self.predictions_cache[key].append(row)
+        The cache already holds each player+prop as a contiguous slice
+        sorted by line (ties in load order, probability DESC). Each group's
+        lines are shifted by group * LINE_GROUP_OFFSET so one searchsorted()
+        call resolves targets of every group at once.
+        """
+        if self._index is None:
+            cache = self.predictions_cache
+            self._index = {
+                'lines': cache.line,
+                'shifted': cache.line + cache.group_of_row * self.LINE_GROUP_OFFSET,
+                'probabilities': cache.probability,
+                'start': cache.group_start,
+                'end': cache.group_end,
+            }
+        return self._index
 
-        return df
+    def estimate_lines(self, player_names, prop_types, target_lines) -> Dict:
+        """
+        Estimate our model's probability at many lines (any players / props).
+
+        Same rules as estimate_probability_at_line(), resolved for all lines
+        at once: exact match, linear interpolation between the closest
+        predictions below/above, or extrapolation from the closest prediction
+        (exponential decay for points/goals/assists, normal distribution for
+        counting stats).
+
+        Args:
+            player_names: Player per line
+            prop_types: Prop type per line
+            target_lines: Line values
+
+        Returns:
+            Dict of arrays aligned with the inputs: probability (NaN without a
+            prediction), method (EXACT / INTERPOLATED / EXTRAPOLATED_UP /
+            EXTRAPOLATED_DOWN), lower / upper / anchor (indices into the
+            line index), mean / std_dev (normal extrapolation). Use
+            describe_estimate() for the reasoning text.
+        """
+        targets = np.asarray(target_lines, dtype=np.float64)
+        prop_types = list(prop_types)
+        props = [str(prop).lower() for prop in prop_types]
+        if self.predictions_cache is None:
+            codes = np.full(len(targets), -1, dtype=np.intp)
+        else:
+            codes = self.predictions_cache.groups(player_names, prop_types)
+        found = codes >= 0
+
+        result = {
+            'probability': np.full(len(targets), np.nan),
+            'method': np.zeros(len(targets), dtype=np.int8),
+            'lower': np.zeros(len(targets), dtype=np.intp),
+            'upper': np.zeros(len(targets), dtype=np.intp),
+            'anchor': np.zeros(len(targets), dtype=np.intp),
+            'mean': np.full(len(targets), np.nan),
+            'std_dev': np.full(len(targets), np.nan),
+            'targets': targets,
+            'props': props,
+        }
+        if not found.any():
+            return result
+
+        index = self._line_index()
+        lines, shifted, probs = index['lines'], index['shifted'], index['probabilities']
+
+        rows = np.flatnonzero(found)
+        group = codes[rows]
+        t = targets[rows]
+        start, end = index['start'][group], index['end'][group]
+        query = t + group * self.LINE_GROUP_OFFSET
+
+        # Closest prediction above: first line > target
+        right = np.searchsorted(shifted, query, side='right')
+        has_upper = right < end
+        upper = np.minimum(right, end - 1)
+        # Closest prediction at or below: first of the max line <= target
+        has_lower = right > start
+        lower = np.searchsorted(shifted, shifted[np.maximum(right - 1, start)], side='left')
+
+        # Exact match: first line with |line - target| < 0.01. The shifted
+        # search only locates the window; the test is on the unshifted lines
+        # (neighbours included, since the offset rounds the boundary)
+        first = np.searchsorted(shifted, query - 0.01, side='left')
+        exact = np.zeros(len(rows), dtype=bool)
+        exact_row = np.zeros(len(rows), dtype=np.intp)
+        for step in (-1, 0, 1):
+            candidate = first + step
+            valid = (candidate >= start) & (candidate < end)
+            candidate = np.clip(candidate, start, end - 1)
+            hit = valid & ~exact & (np.abs(lines[candidate] - t) < 0.01)
+            exact_row = np.where(hit, candidate, exact_row)
+            exact |= hit
+
+        method = np.where(exact, self.EXACT,
+                 np.where(has_lower & has_upper, self.INTERPOLATED,
+                 np.where(has_lower, self.EXTRAPOLATED_UP, self.EXTRAPOLATED_DOWN)))
+        anchor = np.where(method == self.EXTRAPOLATED_DOWN, upper, lower)
+        anchor = np.where(exact, exact_row, anchor)
+
+        prop = [props[r] for r in rows]
+        decay_rate = np.array([self.BINARY_DECAY_RATES.get(p, np.nan) for p in prop])
+        std_dev_ratio = np.array([self.STD_DEV_RATIOS.get(p, 0.40) for p in prop])
+        binary = ~np.isnan(decay_rate)
+        up = method == self.EXTRAPOLATED_UP
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            # Interpolation: probability decreases as the line increases (OVER bets)
+            span = lines[upper] - lines[lower]
+            weight = np.where(span > 0, (t - lines[lower]) / span, 0.5)
+            interpolated = probs[lower] - (probs[lower] - probs[upper]) * weight
+
+            line_diff = np.abs(t - lines[anchor])
+            anchor_prob = probs[anchor]
+
+            # BINARY EVENTS: exponential decay (up) / increase (down)
+            decayed = np.where(up, np.fmax(0.05, anchor_prob * decay_rate ** line_diff),
+                               np.fmin(0.95, anchor_prob / decay_rate ** line_diff))
+
+            # COUNTING STATS: normal with std_dev = ratio * mean, mean fitted
+            # to the closest prediction (line = mean * (1 + ratio * z))
+            z_score = scipy_stats.norm.ppf(1 - anchor_prob)
+            mean = lines[anchor] / (1 + std_dev_ratio * z_score)
+            std_dev = mean * std_dev_ratio
+            over = 1 - scipy_stats.norm.cdf(t, mean, std_dev)
+            normal = np.where(up, np.fmax(0.05, over), np.fmin(0.95, over))
+
+        extrapolated = np.where(binary, decayed, normal)
+        result['probability'][rows] = np.where(
+            exact, anchor_prob, np.where(method == self.INTERPOLATED, interpolated, extrapolated))
+        result['method'][rows] = method
+        result['lower'][rows] = lower
+        result['upper'][rows] = upper
+        result['anchor'][rows] = anchor
+        result['mean'][rows] = np.where(binary, np.nan, mean)
+        result['std_dev'][rows] = np.where(binary, np.nan, std_dev)
+        return result
+
+    def describe_estimate(self, estimate: Dict, i: int) -> str:
+        """Reasoning text for line i of an estimate_lines() result."""
+        index = self._line_index()
+        lines, probs = index['lines'], index['probabilities']
+        method = estimate['method'][i]
+        anchor = estimate['anchor'][i]
+
+        if method == self.EXACT:
+            return self.predictions_cache.reasoning(anchor)
+
+        if method == self.INTERPOLATED:
+            lower, upper = estimate['lower'][i], estimate['upper'][i]
+            return (f"Interpolated between {lines[lower]} ({probs[lower]:.1%}) and "
+                    f"{lines[upper]} ({probs[upper]:.1%})")
+
+        line_diff = abs(estimate['targets'][i] - lines[anchor])
+        prop = estimate['props'][i]
+        if prop in self.BINARY_DECAY_RATES:
+            decay_rate = self.BINARY_DECAY_RATES[prop]
+            if method == self.EXTRAPOLATED_UP:
+                return (f"Extrapolated from {lines[anchor]} ({probs[anchor]:.1%}), exponential decay "
+                        f"for +{line_diff:.1f} line (decay rate: {decay_rate})")
+            return (f"Extrapolated from {lines[anchor]} ({probs[anchor]:.1%}), exponential increase "
+                    f"for -{line_diff:.1f} line (decay rate: {decay_rate})")
+
+        return (f"Extrapolated from {lines[anchor]} ({probs[anchor]:.1%}), normal distribution "
+                f"(mean={estimate['mean'][i]:.1f}, sd={estimate['std_dev'][i]:.1f})")
 
     def estimate_probability_at_line(self, player_name: str, prop_type: str,
                                     target_line: float) -> Tuple[float, str]:
@@ -217,141 +311,10 @@ class MultiLineEVCalculator:
 
         Returns: (probability, reasoning)
         """
-
-        key = f"{player_name}_{prop_type}"
-
-        if key not in self.predictions_cache:
+        estimate = self.estimate_lines([player_name], [prop_type], [target_line])
+        if np.isnan(estimate['probability'][0]):
             return None, "No prediction available"
-
-        preds = self.predictions_cache[key]
-
-        # Find predictions bracketing this line
-        lower_preds = [p for p in preds if p['line'] <= target_line]
-        upper_preds = [p for p in preds if p['line'] > target_line]
-
-        # Exact match
-        exact = [p for p in preds if abs(p['line'] - target_line) < 0.01]
-        if exact:
-            return exact[0]['probability'], exact[0]['reasoning']
-
-        # Interpolation (between two predictions)
-        if lower_preds and upper_preds:
-            lower = max(lower_preds, key=lambda x: x['line'])
-            upper = min(upper_preds, key=lambda x: x['line'])
-
-            # Linear interpolation
-            line_diff = upper['line'] - lower['line']
-            target_diff = target_line - lower['line']
-            weight = target_diff / line_diff if line_diff > 0 else 0.5
-
-            # Probability decreases as line increases (OVER bets)
-            prob = lower['probability'] - (lower['probability'] - upper['probability']) * weight
-
-            reasoning = f"Interpolated between {lower['line']} ({lower['probability']:.1%}) and {upper['line']} ({upper['probability']:.1%})"
-            return prob, reasoning
-
-        # Extrapolation (beyond our predictions)
-        # Binary events (points, goals, assists) use EXPONENTIAL decay
-        # Counting stats (shots, blocks, hits, saves) use NORMAL DISTRIBUTION
-
-        binary_events = ['points', 'goals', 'assists']
-        is_binary = prop_type.lower() in binary_events
-
-        if lower_preds:
-            # Target line is ABOVE all our predictions
-            closest = max(lower_preds, key=lambda x: x['line'])
-            line_diff = target_line - closest['line']
-
-            if is_binary:
-                # BINARY EVENTS: Use exponential decay
-                decay_rates = {
-                    'points': 0.60,    # 2 points is MUCH harder than 1
-                    'goals': 0.55,     # Even harder
-                    'assists': 0.65,   # Harder but more achievable
-                }
-                decay_rate = decay_rates.get(prop_type.lower(), 0.60)
-
-                prob = closest['probability'] * (decay_rate ** line_diff)
-                prob = max(0.05, prob)  # Floor at 5%
-
-                reasoning = f"Extrapolated from {closest['line']} ({closest['probability']:.1%}), exponential decay for +{line_diff:.1f} line (decay rate: {decay_rate})"
-            else:
-                # COUNTING STATS: Use normal distribution
-                # Estimate mean from closest prediction
-                # For OVER probability p at line L: mean = L + std_dev * z where z = norm.ppf(1-p)
-                # We'll use std_dev = 40% of mean (typical for shots)
-
-                std_dev_ratios = {
-                    'shots': 0.40,
-                    'blocks': 0.45,
-                    'hits': 0.45,
-                    'saves': 0.35,
-                    'goalie_saves': 0.35,
-                    'toi': 0.30  # TOI has lower variance (more predictable)
-                }
-                std_dev_ratio = std_dev_ratios.get(prop_type.lower(), 0.40)
-
-                # Estimate mean from closest prediction
-                # If P(X > line) = p, then P(X <= line) = 1-p
-                # z = norm.ppf(1-p) means line = mean + z*std_dev
-                # So: mean = line - z*std_dev
-                z_score = scipy_stats.norm.ppf(1 - closest['probability'])
-
-                # Use iterative approach: estimate mean assuming std_dev = 0.4 * mean
-                # line = mean + z * (0.4 * mean) = mean * (1 + 0.4*z)
-                estimated_mean = closest['line'] / (1 + std_dev_ratio * z_score)
-                std_dev = estimated_mean * std_dev_ratio
-
-                # Now calculate probability for target line
-                prob = 1 - scipy_stats.norm.cdf(target_line, estimated_mean, std_dev)
-                prob = max(0.05, prob)  # Floor at 5%
-
-                reasoning = f"Extrapolated from {closest['line']} ({closest['probability']:.1%}), normal distribution (mean={estimated_mean:.1f}, sd={std_dev:.1f})"
-
-            return prob, reasoning
-
-        if upper_preds:
-            # Target line is BELOW all our predictions
-            closest = min(upper_preds, key=lambda x: x['line'])
-            line_diff = closest['line'] - target_line
-
-            if is_binary:
-                # BINARY EVENTS: Use inverse exponential
-                decay_rates = {
-                    'points': 0.60,
-                    'goals': 0.55,
-                    'assists': 0.65,
-                }
-                decay_rate = decay_rates.get(prop_type.lower(), 0.60)
-
-                prob = closest['probability'] / (decay_rate ** line_diff)
-                prob = min(0.95, prob)  # Cap at 95%
-
-                reasoning = f"Extrapolated from {closest['line']} ({closest['probability']:.1%}), exponential increase for -{line_diff:.1f} line (decay rate: {decay_rate})"
-            else:
-                # COUNTING STATS: Use normal distribution (same as above)
-                std_dev_ratios = {
-                    'shots': 0.40,
-                    'blocks': 0.45,
-                    'hits': 0.45,
-                    'saves': 0.35,
-                    'goalie_saves': 0.35,
-                    'toi': 0.30  # TOI has lower variance (more predictable)
-                }
-                std_dev_ratio = std_dev_ratios.get(prop_type.lower(), 0.40)
-
-                z_score = scipy_stats.norm.ppf(1 - closest['probability'])
-                estimated_mean = closest['line'] / (1 + std_dev_ratio * z_score)
-                std_dev = estimated_mean * std_dev_ratio
-
-                prob = 1 - scipy_stats.norm.cdf(target_line, estimated_mean, std_dev)
-                prob = min(0.95, prob)  # Cap at 95%
-
-                reasoning = f"Extrapolated from {closest['line']} ({closest['probability']:.1%}), normal distribution (mean={estimated_mean:.1f}, sd={std_dev:.1f})"
-
-            return prob, reasoning
-
-        return None, "No prediction available"
+        return float(estimate['probability'][0]), self.describe_estimate(estimate, 0)
 
     def _get_individual_multiplier(self, player_name: str, prop_type: str, line: float,
                                    odds_type: str, date: str = None) -> Dict:
@@ -396,6 +359,13 @@ class MultiLineEVCalculator:
         # Get ACTUAL individual multiplier (this is the key improvement!)
         multiplier_info = self._get_individual_multiplier(player_name, prop_type, line, odds_type, date)
 
+        return self._edge_record(player_name, team, opponent, prop_type, line, odds_type,
+                                 our_prob, multiplier_info, reasoning)
+
+    def _edge_record(self, player_name: str, team: str, opponent: str, prop_type: str,
+                     line: float, odds_type: str, our_prob: float, multiplier_info: Dict,
+                     reasoning: str) -> Dict:
+        """Edge / EV record for one line given our probability and its multiplier."""
         individual_mult = multiplier_info['individual_multiplier']
         pp_implied_prob = multiplier_info['implied_probability']
         confidence = multiplier_info['confidence']
@@ -439,19 +409,32 @@ class MultiLineEVCalculator:
         print(f"[*] Minimum EV threshold: {min_ev:.1%}")
         print()
 
-        edge_plays = []
+        # Our probability for every line in one vectorized pass
+        estimate = self.estimate_lines(prizepicks_df['player_name'], prizepicks_df['prop_type'],
+                                       prizepicks_df['line'].to_numpy(dtype=np.float64))
+        our_probs = estimate['probability']
+        rows = np.flatnonzero(~np.isnan(our_probs))
 
-        for _, pp_line in prizepicks_df.iterrows():
-            edge_data = self.calculate_edge_for_line(
-                pp_line['player_name'],
-                pp_line['team'],
-                pp_line['opponent'],
-                pp_line['prop_type'],
-                pp_line['line'],
-                pp_line['odds_type']
-            )
+        # Multipliers: fallback table lookup, learned values per line
+        if self.multiplier_learner is None:
+            odds_types = prizepicks_df['odds_type'].to_numpy()[rows]
+            multipliers = np.array([self.FALLBACK_MULTIPLIERS.get(o, 1.732) for o in odds_types])
+            ev = our_probs[rows] * multipliers - 1.0
+            rows = rows[ev >= min_ev]
 
-            if edge_data and edge_data['expected_value'] >= min_ev:
+        edge_plays = []
+        records = prizepicks_df.iloc[rows]
+        for i, pp_line in zip(rows, records.itertuples(index=False)):
+            multiplier_info = self._get_individual_multiplier(
+                pp_line.player_name, pp_line.prop_type, pp_line.line, pp_line.odds_type)
+
+            edge_data = self._edge_record(
+                pp_line.player_name, pp_line.team, pp_line.opponent, pp_line.prop_type,
+                pp_line.line, pp_line.odds_type, float(our_probs[i]), multiplier_info, None
+            )
+            if edge_data['expected_value'] >= min_ev:
+                # Reasoning text only for the lines we keep
+                edge_data['reasoning'] = self.describe_estimate(estimate, i)
                 edge_plays.append(edge_data)
 
         # Sort by EV (highest first)
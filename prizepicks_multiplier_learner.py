@@ -16,6 +16,7 @@ from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 import requests
 import json
+from bisect import bisect_left, bisect_right
 
 
 DB_PATH = "database/nhl_predictions.db"
@@ -33,13 +34,19 @@ class PrizePicksMultiplierLearner:
     5. Store with confidence score based on observations
     """
 
-    def __init__(self):
-        self.conn = sqlite3.connect(DB_PATH)
+    # Historical lookups accept learned lines within this distance
+    HISTORICAL_LINE_WINDOW = 0.5
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.conn = sqlite3.connect(db_path)
         self.baseline_multiplier = None
+
+        # In-memory index: (player, prop) -> entries sorted by (line, date, odds_type)
         self.learned_multipliers = {}
 
         # Create table for storing learned multipliers
         self._create_multiplier_table()
+        self.load_learned_multipliers()
 
     def _create_multiplier_table(self):
         """Create table to store learned individual multipliers"""
@@ -67,6 +74,74 @@ class PrizePicksMultiplierLearner:
 
         self.conn.commit()
 
+    def load_learned_multipliers(self) -> int:
+        """
+        Bulk-load prizepicks_learned_multipliers into the in-memory index.
+
+        Lookups (get_learned_multiplier) then run without touching the
+        database; _save_learned_multiplier keeps the index current.
+
+        Returns: Number of learned multipliers loaded
+        """
+        self.learned_multipliers = {}
+
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT player_name, prop_type, line, date, odds_type, last_updated,
+                   individual_multiplier, implied_probability, confidence, observations
+            FROM prizepicks_learned_multipliers
+            ORDER BY player_name, prop_type, line, date, odds_type
+        """)
+
+        count = 0
+        for row in cursor.fetchall():
+            self._index_multiplier(*row, presorted=True)
+            count += 1
+
+        return count
+
+    def count_learned(self) -> int:
+        """Number of learned multipliers in the in-memory index."""
+        return sum(len(group['entries']) for group in self.learned_multipliers.values())
+
+    @staticmethod
+    def _entry_key(line: float, date: str, odds_type: str) -> Tuple:
+        """Sort key of an index entry (NULL text sorts first, as in SQLite)."""
+        return (line, date or '', odds_type or '')
+
+    def _index_multiplier(self, player_name: str, prop_type: str, line: float, date: str,
+                          odds_type: str, last_updated: str, individual_multiplier: float,
+                          implied_probability: float, confidence: float, observations: int,
+                          presorted: bool = False):
+        """Insert or replace one learned multiplier in the in-memory index."""
+        group = self.learned_multipliers.setdefault((player_name, prop_type),
+                                                    {'keys': [], 'lines': [], 'entries': []})
+        line = float(line)
+        key = self._entry_key(line, date, odds_type)
+        entry = {
+            'date': date or '',
+            'last_updated': last_updated or '',
+            'line': line,
+            'individual_multiplier': individual_multiplier,
+            'implied_probability': implied_probability,
+            'confidence': confidence,
+            'observations': observations
+        }
+
+        keys = group['keys']
+        if presorted and (not keys or keys[-1] < key):
+            position = len(keys)
+        else:
+            position = bisect_left(keys, key)
+            # Same (player, prop, line, odds_type, date) = INSERT OR REPLACE
+            if position < len(keys) and keys[position] == key:
+                group['entries'][position] = entry
+                return
+
+        keys.insert(position, key)
+        group['lines'].insert(position, line)
+        group['entries'].insert(position, entry)
+
     def find_neutral_baseline(self, prizepicks_df: pd.DataFrame) -> Optional[Dict]:
         """
         Find the most "standard" pick to use as baseline for testing.
@@ -231,8 +306,9 @@ class PrizePicksMultiplierLearner:
                                  implied_probability: float, confidence: float,
                                  observations: int, baseline_used: str,
                                  baseline_multiplier: float, parlay_payout: float):
-        """Save learned multiplier to database"""
+        """Save learned multiplier to database (and the in-memory index)"""
 
+        last_updated = datetime.now().isoformat()
         cursor = self.conn.cursor()
 
         cursor.execute("""
@@ -244,64 +320,62 @@ class PrizePicksMultiplierLearner:
         """, (
             date, player_name, prop_type, line, odds_type, individual_multiplier,
             implied_probability, confidence, observations, baseline_used,
-            baseline_multiplier, parlay_payout, datetime.now().isoformat()
+            baseline_multiplier, parlay_payout, last_updated
         ))
 
         self.conn.commit()
 
+        # Keep the in-memory index current
+        self._index_multiplier(player_name, prop_type, line, date, odds_type, last_updated,
+                               individual_multiplier, implied_probability, confidence, observations)
+
     def get_learned_multiplier(self, player_name: str, prop_type: str,
                               line: float, date: str = None) -> Optional[Dict]:
         """
         Retrieve learned multiplier for a specific pick.
 
+        Served from the in-memory index: exact (line, date) match first,
+        otherwise the most recent learned line within HISTORICAL_LINE_WINDOW.
+
         Returns: Dict with multiplier info or None if not learned yet
         """
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
 
-        cursor = self.conn.cursor()
-
-        # Try exact match first
-        cursor.execute("""
-            SELECT individual_multiplier, implied_probability, confidence, observations
-            FROM prizepicks_learned_multipliers
-            WHERE player_name = ? AND prop_type = ? AND line = ? AND date = ?
-            ORDER BY last_updated DESC
-            LIMIT 1
-        """, (player_name, prop_type, line, date))
+        group = self.learned_multipliers.get((player_name, prop_type))
+        if group is None:
+            return None
 
-        result = cursor.fetchone()
+        # Learned lines within the historical window (sorted by line)
+        lines = group['lines']
+        start = bisect_left(lines, line - self.HISTORICAL_LINE_WINDOW)
+        end = bisect_right(lines, line + self.HISTORICAL_LINE_WINDOW)
+        if start == end:
+            return None
+        candidates = group['entries'][start:end]
 
-        if result:
+        # Try exact match first (latest update if several odds types)
+        exact = [entry for entry in candidates if entry['line'] == line and entry['date'] == date]
+        if exact:
+            result = max(exact, key=lambda entry: entry['last_updated'])
             return {
-                'individual_multiplier': result[0],
-                'implied_probability': result[1],
-                'confidence': result[2],
-                'observations': result[3],
+                'individual_multiplier': result['individual_multiplier'],
+                'implied_probability': result['implied_probability'],
+                'confidence': result['confidence'],
+                'observations': result['observations'],
                 'source': 'learned'
             }
 
-        # Try recent historical data (within last 7 days) for same player/prop
-        cursor.execute("""
-            SELECT individual_multiplier, implied_probability, confidence, observations
-            FROM prizepicks_learned_multipliers
-            WHERE player_name = ? AND prop_type = ? AND ABS(line - ?) <= 0.5
-            ORDER BY date DESC, last_updated DESC
-            LIMIT 1
-        """, (player_name, prop_type, line))
-
-        result = cursor.fetchone()
-
-        if result:
-            return {
-                'individual_multiplier': result[0],
-                'implied_probability': result[1],
-                'confidence': result[2] * 0.8,  # Reduce confidence for historical data
-                'observations': result[3],
-                'source': 'historical'
-            }
-
-        return None
+        # Most recent nearby line for same player/prop (nearest line breaks ties)
+        result = max(candidates, key=lambda entry: (entry['date'], entry['last_updated'],
+                                                    -abs(entry['line'] - line)))
+        return {
+            'individual_multiplier': result['individual_multiplier'],
+            'implied_probability': result['implied_probability'],
+            'confidence': result['confidence'] * 0.8,  # Reduce confidence for historical data
+            'observations': result['observations'],
+            'source': 'historical'
+        }
 
     def get_fallback_multiplier(self, odds_type: str) -> Dict:
         """
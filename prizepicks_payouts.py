@@ -1,8 +1,16 @@
 """
 PrizePicks Payout Calculator
 Handles standard, goblin, demon modes and mixed parlays
+
+Payouts depend only on how many legs of each odds_type a parlay holds,
+so every (num_legs, #standard, #goblin, #demon) cell is precomputed once
+into a dense table shared by the optimizer, parlay generators and apps.
+
+Flex Play entries pay on k-of-n hits; their payouts per hit count are
+kept in a second table indexed [num_legs, hits].
 """
 
+import numpy as np
 from typing import List, Dict
 
 
@@ -46,36 +54,41 @@ class PrizePicksPayoutCalculator:
         6: 1.60   # 6-pick demon ~= 40.0x (vs 25.0x standard)
     }
 
-    @classmethod
-    def calculate_parlay_payout(cls, odds_types: List[str]) -> float:
-        """
-        Calculate payout for a parlay given odds_types of each leg.
+    # Flex Play payouts (all standard picks) by number of hits
+    # 2-pick entries are Power Play only
+    FLEX_PAYOUTS = {
+        3: {3: 2.25, 2: 1.25},
+        4: {4: 5.0, 3: 1.5},
+        5: {5: 10.0, 4: 2.0, 3: 0.4},
+        6: {6: 25.0, 5: 2.0, 4: 0.4}
+    }
 
-        Args:
-            odds_types: List of odds_type for each pick ('standard', 'goblin', 'demon')
+    MIN_FLEX_LEGS = 3
 
-        Returns:
-            Payout multiplier (e.g., 3.0 for 2-pick standard)
+    # Integer codes for vectorized lookups (anything else is OTHER)
+    ODDS_TYPE_CODES = {'standard': 0, 'goblin': 1, 'demon': 2}
+    OTHER_CODE = 3
 
-        Examples:
-            ['standard', 'standard'] -> 3.0x
-            ['goblin', 'goblin'] -> 2.0x
-            ['standard', 'goblin'] -> ~2.5x (blended)
-            ['demon', 'demon'] -> 4.0x
-        """
-        num_picks = len(odds_types)
+    MIN_LEGS = 2
+    MAX_LEGS = 6
 
-        if num_picks < 2 or num_picks > 6:
-            raise ValueError(f"Invalid number of picks: {num_picks} (must be 2-6)")
+    # Dense payout table [num_legs, #standard, #goblin, #demon] (built on first use)
+    _payout_table = None
 
+    # Dense Flex table [num_legs, hits] for all-standard entries (built on first use)
+    _flex_table = None
+
+    @classmethod
+    def _compute_payout(cls, num_picks: int, standard_count: int,
+                        goblin_count: int, demon_count: int) -> float:
+        """
+        Payout for a parlay with the given odds_type counts.
+
+        Legs with any other odds_type count toward num_picks but add no weight.
+        """
         # Get base payout (standard)
         base_payout = cls.STANDARD_PAYOUTS.get(num_picks, 3.0)
 
-        # Count each odds_type
-        standard_count = odds_types.count('standard')
-        goblin_count = odds_types.count('goblin')
-        demon_count = odds_types.count('demon')
-
         # All standard picks
         if standard_count == num_picks:
             return base_payout
@@ -113,6 +126,160 @@ class PrizePicksPayoutCalculator:
 
         return round(adjusted_payout, 2)
 
+    @classmethod
+    def payout_table(cls) -> np.ndarray:
+        """
+        Dense payout table indexed [num_legs, #standard, #goblin, #demon].
+
+        Covers 2-6 legs; cells whose counts exceed num_legs (and legs < 2) are NaN.
+        """
+        if cls._payout_table is None:
+            size = cls.MAX_LEGS + 1
+            table = np.full((size, size, size, size), np.nan)
+            for num_picks in range(cls.MIN_LEGS, size):
+                for standard in range(num_picks + 1):
+                    for goblin in range(num_picks + 1 - standard):
+                        for demon in range(num_picks + 1 - standard - goblin):
+                            table[num_picks, standard, goblin, demon] = cls._compute_payout(
+                                num_picks, standard, goblin, demon
+                            )
+            table.setflags(write=False)
+            cls._payout_table = table
+        return cls._payout_table
+
+    @classmethod
+    def payout_grid(cls, num_picks: int) -> np.ndarray:
+        """
+        Payouts for one parlay size indexed [#goblin, #demon].
+
+        Remaining legs are standard; cells with goblin + demon > num_picks are NaN.
+        """
+        table = cls.payout_table()
+        grid = np.full((num_picks + 1, num_picks + 1), np.nan)
+        for goblin in range(num_picks + 1):
+            for demon in range(num_picks + 1 - goblin):
+                grid[goblin, demon] = table[num_picks, num_picks - goblin - demon, goblin, demon]
+        return grid
+
+    @classmethod
+    def encode_odds_types(cls, odds_types) -> np.ndarray:
+        """Map odds_type strings to int8 codes (0=standard, 1=goblin, 2=demon, 3=other)."""
+        return np.array(
+            [cls.ODDS_TYPE_CODES.get(str(t).lower(), cls.OTHER_CODE) for t in odds_types],
+            dtype=np.int8
+        )
+
+    @classmethod
+    def lookup_payouts_by_counts(cls, num_legs, standard, goblin, demon) -> np.ndarray:
+        """Vectorized table lookup from arrays of legs and odds_type counts."""
+        return cls.payout_table()[num_legs, standard, goblin, demon]
+
+    @classmethod
+    def lookup_payouts(cls, odds_codes: np.ndarray) -> np.ndarray:
+        """
+        Vectorized payouts for many parlays of the same size.
+
+        Args:
+            odds_codes: Array of odds_type codes, shape (parlays, legs)
+
+        Returns:
+            Payout multiplier per parlay
+        """
+        odds_codes = np.asarray(odds_codes)
+        num_picks = odds_codes.shape[1]
+
+        if num_picks < cls.MIN_LEGS or num_picks > cls.MAX_LEGS:
+            raise ValueError(f"Invalid number of picks: {num_picks} (must be 2-6)")
+
+        standard = np.count_nonzero(odds_codes == cls.ODDS_TYPE_CODES['standard'], axis=1)
+        goblin = np.count_nonzero(odds_codes == cls.ODDS_TYPE_CODES['goblin'], axis=1)
+        demon = np.count_nonzero(odds_codes == cls.ODDS_TYPE_CODES['demon'], axis=1)
+        return cls.payout_table()[num_picks, standard, goblin, demon]
+
+    @classmethod
+    def flex_payout_table(cls) -> np.ndarray:
+        """
+        Flex payouts for all-standard entries indexed [num_legs, hits].
+
+        Hit counts that pay nothing are 0; rows without Flex (legs < 3) are NaN.
+        """
+        if cls._flex_table is None:
+            size = cls.MAX_LEGS + 1
+            table = np.full((size, size), np.nan)
+            for num_picks, payouts in cls.FLEX_PAYOUTS.items():
+                table[num_picks, :num_picks + 1] = 0.0
+                for hits, payout in payouts.items():
+                    table[num_picks, hits] = payout
+            table.setflags(write=False)
+            cls._flex_table = table
+        return cls._flex_table
+
+    @classmethod
+    def lookup_flex_payouts(cls, odds_codes: np.ndarray) -> np.ndarray:
+        """
+        Vectorized Flex payouts for many entries of the same size.
+
+        Goblin/demon legs scale every hit tier by the same blend the Power
+        Play table applies to the full-hit payout (an approximation).
+
+        Args:
+            odds_codes: Array of odds_type codes, shape (entries, legs)
+
+        Returns:
+            Payout multiplier per entry and hit count, shape (entries, legs + 1)
+        """
+        odds_codes = np.asarray(odds_codes)
+        num_picks = odds_codes.shape[1]
+
+        if num_picks < cls.MIN_FLEX_LEGS or num_picks > cls.MAX_LEGS:
+            raise ValueError(f"Invalid number of Flex picks: {num_picks} (must be 3-6)")
+
+        blend = cls.lookup_payouts(odds_codes) / cls.STANDARD_PAYOUTS[num_picks]
+        return blend[:, None] * cls.flex_payout_table()[num_picks, :num_picks + 1]
+
+    @classmethod
+    def calculate_flex_payout(cls, odds_types: List[str], hits: int) -> float:
+        """
+        Flex payout for an entry given the odds_type of each leg and the hit count.
+
+        Examples:
+            ['standard'] * 5, 4 hits -> 2.0x
+            ['standard'] * 6, 3 hits -> 0.0x
+        """
+        codes = cls.encode_odds_types(odds_types)[None, :]
+        return float(cls.lookup_flex_payouts(codes)[0, hits])
+
+    @classmethod
+    def calculate_parlay_payout(cls, odds_types: List[str]) -> float:
+        """
+        Calculate payout for a parlay given odds_types of each leg.
+
+        Args:
+            odds_types: List of odds_type for each pick ('standard', 'goblin', 'demon')
+
+        Returns:
+            Payout multiplier (e.g., 3.0 for 2-pick standard)
+
+        Examples:
+            ['standard', 'standard'] -> 3.0x
+            ['goblin', 'goblin'] -> 2.0x
+            ['standard', 'goblin'] -> ~2.5x (blended)
+            ['demon', 'demon'] -> 4.0x
+        """
+        num_picks = len(odds_types)
+
+        if num_picks < cls.MIN_LEGS or num_picks > cls.MAX_LEGS:
+            raise ValueError(f"Invalid number of picks: {num_picks} (must be 2-6)")
+
+        odds_types = [str(t).lower() for t in odds_types]
+
+        return float(cls.payout_table()[
+            num_picks,
+            odds_types.count('standard'),
+            odds_types.count('goblin'),
+            odds_types.count('demon')
+        ])
+
     @classmethod
     def get_payout_for_odds_type(cls, num_picks: int, odds_type: str) -> float:
         """
@@ -149,6 +316,12 @@ class PrizePicksPayoutCalculator:
         print(f"  3-pick [demon×2, standard]: {cls.calculate_parlay_payout(['demon', 'demon', 'standard']):.2f}x")
         print()
 
+        print("FLEX PLAY (standard picks):")
+        for num_picks, payouts in cls.FLEX_PAYOUTS.items():
+            tiers = ", ".join(f"{hits}/{num_picks}: {payout:.2f}x" for hits, payout in payouts.items())
+            print(f"  {num_picks}-PICK: {tiers}")
+        print()
+
         print("Note: Mixed parlay payouts are calculated using weighted averages")
         print("      Actual PrizePicks payouts may vary slightly")
         print("="*80)
@@ -181,6 +354,35 @@ def test_payout_calculator():
 
     print()
 
+    # Vectorized lookup must agree with the scalar path for every mix
+    rng = np.random.default_rng(0)
+    names = ['standard', 'goblin', 'demon']
+    mismatches = 0
+    for num_picks in range(2, 7):
+        codes = rng.integers(0, 3, size=(1000, num_picks))
+        vectorized = calc.lookup_payouts(codes)
+        for row, payout in zip(codes, vectorized):
+            if calc.calculate_parlay_payout([names[c] for c in row]) != payout:
+                mismatches += 1
+    print(f"Vectorized vs scalar lookup mismatches: {mismatches}")
+
+    import time
+    codes = rng.integers(0, 3, size=(2000000, 4))
+    start = time.perf_counter()
+    calc.lookup_payouts(codes)
+    print(f"Vectorized lookup: 2,000,000 4-leg parlays in {time.perf_counter() - start:.2f}s")
+
+    # Flex: all-hit tier follows the Power blend, lower tiers scale with it
+    flex_mismatches = 0
+    for num_picks in range(3, 7):
+        codes = rng.integers(0, 3, size=(1000, num_picks))
+        flex = calc.lookup_flex_payouts(codes)
+        power = calc.lookup_payouts(codes)
+        expected_top = power * calc.FLEX_PAYOUTS[num_picks][num_picks] / calc.STANDARD_PAYOUTS[num_picks]
+        flex_mismatches += int((~np.isclose(flex[:, num_picks], expected_top)).sum())
+    print(f"Flex vs Power blend mismatches: {flex_mismatches}")
+    print()
+
     # Print full table
     calc.print_payout_table()
 
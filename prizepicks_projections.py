@@ -0,0 +1,653 @@
+"""
+PrizePicks Projections Feed
+===========================
+
+One fetch-and-parse layer for the PrizePicks /projections endpoint, shared by
+PrizePicksClient (prizepicks_integration_v2.py), PrizePicksMultiLineClient
+(prizepicks_multi_line_optimizer.py) and PrizePicksLinesFetcher
+(fetch_prizepicks_current_lines.py).
+
+Every download is written to a timestamped raw snapshot on disk. Within the
+TTL, later calls - including other scripts launched by the daily / GTO
+workflows - are served from the newest snapshot instead of the network (only
+the newest SNAPSHOTS_PER_LEAGUE are kept), and the payload is parsed once per
+process into a normalized table:
+
+    projection_id, player_name, team, position, opponent,
+    stat_type, prop_type, line, odds_type, game_time
+
+Downloads follow pagination (so heavy nights are not truncated at one page):
+once the first page gives the page count, the remaining pages are fetched
+concurrently. Every request goes through one shared rate limit, and
+get_all_projections() fetches every league in LEAGUE_IDS concurrently.
+
+Usage:
+    from prizepicks_projections import get_projections, get_all_projections
+
+    board = get_projections('NHL')                   # cached for CACHE_TTL_SECONDS
+    board = get_projections('NHL', force_refresh=True)
+    boards = get_all_projections()                   # every league, one call
+"""
+
+import glob
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from api_utils import RateLimiter, fetch_with_retry
+
+PROJECTIONS_URL = "https://api.prizepicks.com/projections"
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://app.prizepicks.com/',
+    'Origin': 'https://app.prizepicks.com'
+}
+
+LEAGUE_IDS = {'NHL': 8, 'NFL': 9, 'NBA': 7, 'MLB': 2}
+
+# Raw payload snapshots (projections_<SPORT>_<YYYYmmdd_HHMMSS>.json)
+SNAPSHOT_DIR = "database/prizepicks_snapshots"
+
+# Serve the newest snapshot for this long before downloading again
+CACHE_TTL_SECONDS = 600
+
+# Raw snapshots kept per league (older ones are deleted after each download;
+# line history lives in line_movement.py)
+SNAPSHOTS_PER_LEAGUE = 24
+
+# Pagination (pages after the first are fetched concurrently when the page
+# count is known)
+PER_PAGE = 250
+MAX_PAGES = 20
+MAX_PAGE_WORKERS = 8
+
+# One rate limit for every request this process makes (all leagues / pages);
+# the burst lets a few pages of every league go out at once
+CALLS_PER_MINUTE = 60
+RATE_LIMITER = RateLimiter(CALLS_PER_MINUTE, burst=4 * len(LEAGUE_IDS))
+
+# Append each new snapshot's deltas to the line history (line_movement.py)
+RECORD_LINE_HISTORY = True
+
+# PrizePicks stat types -> our prop types (unmapped stat types are lower-cased)
+STAT_TYPE_MAP = {
+    'Points': 'points',
+    'Shots On Goal': 'shots',
+    'SOG': 'shots',
+    'Goals': 'goals',
+    'Assists': 'assists',
+    'Blocked Shots': 'blocks',
+    'Hits': 'hits',
+    'Time On Ice': 'toi',
+    'TOI': 'toi',
+    'Saves': 'goalie_saves',
+    'Goalie Saves': 'goalie_saves'
+}
+
+PROJECTION_COLUMNS = ['projection_id', 'player_name', 'team', 'position', 'opponent',
+                      'stat_type', 'prop_type', 'line', 'odds_type', 'game_time']
+
+# Per-process cache: sport -> (fetched_at, payload, parsed table)
+_FEEDS = {}
+
+
+def league_id_for(sport: str) -> int:
+    """PrizePicks league id of a sport (NHL if unknown)."""
+    return LEAGUE_IDS.get(sport.upper(), 8)
+
+
+def _snapshot_path(sport: str, fetched_at: datetime) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"projections_{sport.upper()}_{fetched_at.strftime('%Y%m%d_%H%M%S')}.json")
+
+
+def latest_snapshot(sport: str = 'NHL') -> Optional[Tuple[datetime, str]]:
+    """Newest snapshot on disk for a sport as (fetched_at, path), or None."""
+    paths = sorted(glob.glob(os.path.join(SNAPSHOT_DIR, f"projections_{sport.upper()}_*.json")))
+    if not paths:
+        return None
+
+    path = paths[-1]
+    stamp = os.path.basename(path)[len(f"projections_{sport.upper()}_"):-len(".json")]
+    try:
+        return datetime.strptime(stamp, '%Y%m%d_%H%M%S'), path
+    except ValueError:
+        return None
+
+
+def save_snapshot(sport: str, payload: Dict, fetched_at: datetime = None) -> str:
+    """Write a raw payload snapshot (atomically, so concurrent readers never see half a file)."""
+    if fetched_at is None:
+        fetched_at = datetime.now()
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = _snapshot_path(sport, fetched_at)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(temp_path, path)
+    return path
+
+
+def prune_snapshots(sport: str, keep: int = SNAPSHOTS_PER_LEAGUE) -> int:
+    """
+    Delete all but the newest `keep` snapshots of a sport.
+
+    Returns:
+        Number of files removed
+    """
+    paths = sorted(glob.glob(os.path.join(SNAPSHOT_DIR, f"projections_{sport.upper()}_*.json")))
+    removed = 0
+    for path in paths[:max(len(paths) - keep, 0)]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            print(f"[WARNING] Could not delete old snapshot {path}: {e}")
+    return removed
+
+
+def _has_next_page(body: Dict, page: int, page_size: int) -> bool:
+    """Whether another page follows (JSON:API links / meta, else a full page)."""
+    links = body.get('links') or {}
+    if 'next' in links:
+        return bool(links['next'])
+
+    meta = body.get('meta') or {}
+    if meta.get('total_pages') is not None:
+        return page < int(meta['total_pages'])
+
+    return page_size >= PER_PAGE
+
+
+def _page_count(body: Dict) -> Optional[int]:
+    """Total pages announced by a response (meta.total_pages or links.last), else None."""
+    meta = body.get('meta') or {}
+    if meta.get('total_pages') is not None:
+        try:
+            return int(meta['total_pages'])
+        except (TypeError, ValueError):
+            pass
+
+    last = (body.get('links') or {}).get('last')
+    if last:
+        pages = parse_qs(urlparse(last).query).get('page')
+        if pages and pages[0].isdigit():
+            return int(pages[0])
+
+    return None
+
+
+def download_projections(sport: str = 'NHL', timeout: int = 15,
+                         rate_limiter: RateLimiter = None, max_pages: int = MAX_PAGES) -> Dict:
+    """
+    Download the full raw /projections payload for a sport (no caching).
+
+    The first page is fetched alone; if it announces the page count, pages
+    2..N are fetched concurrently (so a multi-page board takes about two
+    round-trips), otherwise pages are followed one by one until the last.
+    Projections and included entities are de-duplicated by id (the board can
+    shift between page requests).
+
+    Args:
+        sport: League key in LEAGUE_IDS
+        timeout: Request timeout in seconds
+        rate_limiter: Shared limit for every page request (RATE_LIMITER if None)
+        max_pages: Safety cap on pages per league
+
+    Returns:
+        {'data': [...], 'included': [...], 'meta': {'pages': n}}
+    """
+    if rate_limiter is None:
+        rate_limiter = RATE_LIMITER
+
+    def fetch_page(page):
+        params = {'league_id': league_id_for(sport), 'per_page': PER_PAGE,
+                  'single_stat': 'true', 'page': page}
+        response = fetch_with_retry(PROJECTIONS_URL, headers=HEADERS, params=params,
+                                    timeout=timeout, rate_limiter=rate_limiter)
+        return response.json()
+
+    data, included = [], []
+    seen_projections, seen_included = set(), set()
+
+    def merge(body):
+        page_data = body.get('data') or []
+        new_projections = 0
+        for proj in page_data:
+            if proj.get('id') not in seen_projections:
+                seen_projections.add(proj.get('id'))
+                data.append(proj)
+                new_projections += 1
+
+        for item in body.get('included') or []:
+            key = (item.get('type'), item.get('id'))
+            if key not in seen_included:
+                seen_included.add(key)
+                included.append(item)
+        return len(page_data), new_projections
+
+    body = fetch_page(1)
+    page_size, new_projections = merge(body)
+    page = 1
+
+    total_pages = _page_count(body)
+    if total_pages is not None:
+        # Page count known: fetch the rest at once (merged in page order)
+        remaining = list(range(2, min(total_pages, max_pages) + 1))
+        if remaining:
+            with ThreadPoolExecutor(max_workers=min(len(remaining), MAX_PAGE_WORKERS)) as executor:
+                for body in executor.map(fetch_page, remaining):
+                    merge(body)
+            page = remaining[-1]
+    else:
+        # Stop at the last page (or if the API ignored the page parameter)
+        while (page < max_pages and new_projections > 0
+               and _has_next_page(body, page, page_size)):
+            page += 1
+            body = fetch_page(page)
+            page_size, new_projections = merge(body)
+
+    return {'data': data, 'included': included, 'meta': {'pages': page}}
+
+
+def fetch_projections_payload(sport: str = 'NHL', ttl: float = CACHE_TTL_SECONDS,
+                              force_refresh: bool = False, timeout: int = 15) -> Tuple[datetime, Dict]:
+    """
+    Raw /projections payload, from memory, a fresh disk snapshot or the network.
+
+    Args:
+        sport: League key in LEAGUE_IDS
+        ttl: Maximum snapshot age in seconds
+        force_refresh: Always download (and snapshot) a new payload
+        timeout: Request timeout in seconds
+
+    Returns:
+        (fetched_at, payload)
+
+    Raises:
+        requests.RequestException: If a download is needed and fails
+    """
+    sport = sport.upper()
+
+    if not force_refresh:
+        cached = _FEEDS.get(sport)
+        if cached is not None and _age_seconds(cached[0]) <= ttl:
+            return cached[0], cached[1]
+
+        snapshot = latest_snapshot(sport)
+        if snapshot is not None and _age_seconds(snapshot[0]) <= ttl:
+            fetched_at, path = snapshot
+            if cached is not None and cached[0] == fetched_at:
+                return cached[0], cached[1]
+            try:
+                with open(path, encoding='utf-8') as f:
+                    payload = json.load(f)
+                _FEEDS[sport] = (fetched_at, payload, None)
+                print(f"[*] Using PrizePicks {sport} snapshot from {fetched_at.strftime('%I:%M:%S %p')}")
+                return fetched_at, payload
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Could not read snapshot {path}: {e}")
+
+    payload = download_projections(sport, timeout=timeout)
+    fetched_at = datetime.now().replace(microsecond=0)
+    try:
+        save_snapshot(sport, payload, fetched_at)
+        prune_snapshots(sport)
+    except OSError as e:
+        print(f"[WARNING] Could not save PrizePicks snapshot: {e}")
+
+    _FEEDS[sport] = (fetched_at, payload, None)
+    return fetched_at, payload
+
+
+def _age_seconds(fetched_at: datetime) -> float:
+    return (datetime.now() - fetched_at).total_seconds()
+
+
+def _entity_table(included: List[Dict], entity_type: str, fields: Dict) -> pd.DataFrame:
+    """
+    One 'included' entity type as a table indexed by id.
+
+    Args:
+        included: JSON:API 'included' array
+        entity_type: Entity type to keep (e.g. 'new_player')
+        fields: Attribute name -> default when missing
+
+    Returns:
+        DataFrame with one column per field (last entity wins for repeated ids)
+    """
+    items = [item for item in included if item.get('type') == entity_type]
+    attrs = [item.get('attributes', {}) for item in items]
+    table = pd.DataFrame(
+        {field: pd.Series([a.get(field, default) for a in attrs], dtype=object)
+         for field, default in fields.items()}
+    )
+    table.index = pd.Index([item.get('id') for item in items], dtype=object)
+    return table[~table.index.duplicated(keep='last')]
+
+
+def _take(column: pd.Series, rows: np.ndarray, default) -> np.ndarray:
+    """column[rows] with default where rows == -1 (no matching entity)."""
+    values = np.empty(len(column) + 1, dtype=object)
+    values[:-1] = column.to_numpy(dtype=object)
+    values[-1] = default
+    return values[rows]
+
+
+def parse_projections(payload: Dict) -> pd.DataFrame:
+    """
+    Normalize a JSON:API /projections payload into one row per projection.
+
+    Players and games from 'included' are normalized into id-indexed tables
+    once and joined to the projections by id in a single vectorized lookup;
+    stat types are mapped once per distinct value. Projections without a
+    known player get 'Unknown' / 'UNK'; opponent is 'UNK' unless the
+    player's team is one side of the projection's game. line is NaN when
+    the projection has no line_score.
+    """
+    data = payload.get('data') or []
+    included = payload.get('included') or []
+
+    players = _entity_table(included, 'new_player',
+                            {'name': 'Unknown', 'team': 'UNK', 'position': 'UNK'})
+    games = _entity_table(included, 'game',
+                          {'away_team': 'UNK', 'home_team': 'UNK', 'game_time': None})
+
+    # Projection columns in one pass over the JSON
+    empty = {}
+    fields = [
+        (proj.get('id'), attrs.get('stat_type', 'Unknown'), attrs.get('line_score'),
+         attrs.get('odds_type', 'standard'),
+         ((relationships.get('new_player') or empty).get('data') or empty).get('id'),
+         ((relationships.get('game') or empty).get('data') or empty).get('id'))
+        for proj in data
+        for attrs, relationships in ((proj.get('attributes', empty), proj.get('relationships', empty)),)
+    ]
+    projection_id, stat_type, line_score, odds_type, player_ids, game_ids = (
+        [np.array(column, dtype=object) for column in zip(*fields)] if fields
+        else [np.empty(0, dtype=object)] * 6
+    )
+
+    # Join to players / games (-1 = not in 'included')
+    player_rows = players.index.get_indexer(pd.Index(player_ids, dtype=object))
+    game_rows = games.index.get_indexer(pd.Index(game_ids, dtype=object))
+
+    team = _take(players['team'], player_rows, 'UNK')
+    away_team = _take(games['away_team'], game_rows, None)
+    home_team = _take(games['home_team'], game_rows, None)
+
+    has_game = game_rows >= 0
+    opponent = np.where(has_game & (team == away_team), home_team,
+                        np.where(has_game & (team == home_team), away_team, 'UNK'))
+
+    # Stat type -> prop type, once per distinct stat type
+    stat_codes, stat_uniques = pd.factorize(stat_type, use_na_sentinel=False)
+    prop_uniques = np.array(
+        [STAT_TYPE_MAP.get(stat, stat.lower() if isinstance(stat, str) else stat) for stat in stat_uniques],
+        dtype=object
+    )
+
+    try:
+        line = line_score.astype(np.float64)
+    except (TypeError, ValueError):
+        line = pd.to_numeric(pd.Series(line_score), errors='coerce').to_numpy(dtype=np.float64, copy=True)
+    line[line == 0] = np.nan
+
+    return pd.DataFrame({
+        'projection_id': projection_id,
+        'player_name': _take(players['name'], player_rows, 'Unknown'),
+        'team': team,
+        'position': _take(players['position'], player_rows, 'UNK'),
+        'opponent': opponent,
+        'stat_type': stat_type,
+        'prop_type': prop_uniques[stat_codes],
+        'line': line,
+        'odds_type': odds_type,
+        'game_time': _take(games['game_time'], game_rows, None)
+    }, columns=PROJECTION_COLUMNS)
+
+
+def get_projections(sport: str = 'NHL', ttl: float = CACHE_TTL_SECONDS,
+                    force_refresh: bool = False, timeout: int = 15) -> pd.DataFrame:
+    """
+    Normalized projections table for a sport (see PROJECTION_COLUMNS).
+
+    Parsed once per payload; callers get a copy they can filter or modify.
+
+    Raises:
+        requests.RequestException: If a download is needed and fails
+    """
+    sport = sport.upper()
+    fetched_at, payload = fetch_projections_payload(sport, ttl=ttl, force_refresh=force_refresh,
+                                                    timeout=timeout)
+
+    cached = _FEEDS[sport]
+    if cached[2] is None:
+        cached = (fetched_at, payload, parse_projections(payload))
+        _FEEDS[sport] = cached
+        if RECORD_LINE_HISTORY:
+            _record_line_history(cached[2], fetched_at, sport)
+
+    return cached[2].copy()
+
+
+def _record_line_history(board: pd.DataFrame, fetched_at: datetime, sport: str):
+    """Append a snapshot to the line history (already-recorded snapshots are skipped)."""
+    from line_movement import LineMovementStore
+
+    try:
+        store = LineMovementStore()
+        try:
+            counts = store.record_snapshot(board, fetched_at, league=sport)
+        finally:
+            store.close()
+    except Exception as e:
+        print(f"[WARNING] Could not record PrizePicks line history: {e}")
+        return
+
+    if counts is not None:
+        print(f"[*] Line history: {counts['added']} new, {counts['moved']} moved, "
+              f"{counts['removed']} removed since the previous snapshot")
+
+
+def get_all_projections(sports: List[str] = None, ttl: float = CACHE_TTL_SECONDS,
+                        force_refresh: bool = False, timeout: int = 15) -> pd.DataFrame:
+    """
+    Full board for several leagues in one call.
+
+    Leagues are fetched concurrently (each following its own pagination)
+    under the shared RATE_LIMITER, so the call takes about as long as the
+    slowest league. Each league is cached / snapshotted like get_projections().
+
+    Args:
+        sports: League keys (default: every league in LEAGUE_IDS)
+        ttl: Maximum snapshot age in seconds
+        force_refresh: Always download
+        timeout: Request timeout in seconds
+
+    Returns:
+        Normalized projections plus a 'league' column, one row per projection id.
+        Leagues that fail to download are reported and skipped.
+    """
+    if sports is None:
+        sports = list(LEAGUE_IDS)
+    sports = [sport.upper() for sport in sports]
+
+    def fetch(sport):
+        try:
+            return get_projections(sport, ttl=ttl, force_refresh=force_refresh, timeout=timeout)
+        except Exception as e:
+            print(f"[WARNING] Failed to fetch PrizePicks {sport}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(len(sports), 1)) as executor:
+        boards = list(executor.map(fetch, sports))
+
+    frames = [board.assign(league=sport) for sport, board in zip(sports, boards) if board is not None]
+    if not frames:
+        return pd.DataFrame(columns=PROJECTION_COLUMNS + ['league'])
+
+    board = pd.concat(frames, ignore_index=True)
+    return board.drop_duplicates(subset='projection_id', keep='first').reset_index(drop=True)
+
+
+def make_sample_payload(n_projections: int = 5000, seed: int = 0) -> Dict:
+    """
+    Synthetic multi-sport /projections payload shaped like the live API
+    (players, games and leagues in 'included'; a few projections without a
+    game, line or known player).
+    """
+    rng = np.random.default_rng(seed)
+    sports = {
+        'NHL': ['Points', 'Shots On Goal', 'Goals', 'Assists', 'Blocked Shots', 'Hits', 'Saves'],
+        'NBA': ['Points', 'Rebounds', 'Assists', 'Pts+Rebs+Asts', '3-PT Made'],
+        'NFL': ['Pass Yards', 'Rush Yards', 'Receptions', 'Fantasy Score'],
+        'MLB': ['Hits+Runs+RBIs', 'Pitcher Strikeouts', 'Total Bases']
+    }
+    teams = [f"T{i:02d}" for i in range(32)]
+
+    included = [{'type': 'league', 'id': str(league_id), 'attributes': {'name': sport}}
+                for sport, league_id in LEAGUE_IDS.items()]
+    n_players = max(n_projections // 6, 1)
+    for i in range(n_players):
+        included.append({'type': 'new_player', 'id': str(1000 + i),
+                         'attributes': {'name': f"Player {i}", 'team': teams[i % 32],
+                                        'position': 'C', 'league': list(sports)[i % 4]}})
+    for g in range(16):
+        included.append({'type': 'game', 'id': str(g),
+                         'attributes': {'away_team': teams[2 * g], 'home_team': teams[2 * g + 1],
+                                        'game_time': f"2025-11-03T19:{g:02d}:00-05:00"}})
+    rng.shuffle(included)
+
+    data = []
+    for j in range(n_projections):
+        player = int(rng.integers(n_players + 20))   # some ids not in 'included'
+        sport = list(sports)[player % 4]
+        relationships = {'new_player': {'data': {'type': 'new_player', 'id': str(1000 + player)}}}
+        if rng.random() < 0.95:
+            relationships['game'] = {'data': {'type': 'game', 'id': str((player % 32) // 2)}}
+        data.append({
+            'type': 'projection',
+            'id': str(500000 + j),
+            'attributes': {
+                'stat_type': sports[sport][int(rng.integers(len(sports[sport])))],
+                'line_score': None if rng.random() < 0.01 else float(rng.integers(1, 60)) + 0.5,
+                'odds_type': ['standard', 'goblin', 'demon'][int(rng.integers(3))]
+            },
+            'relationships': relationships
+        })
+
+    return {'data': data, 'included': included}
+
+
+def test_projections():
+    """Vectorized parser vs a row-by-row reference, plus a micro-benchmark."""
+    import time
+
+    print("\n" + "="*80)
+    print("PRIZEPICKS PROJECTIONS PARSER TEST")
+    print("="*80)
+    print()
+
+    def parse_rowwise(payload):
+        # Reference: the previous per-projection walk (nested .get() chains,
+        # stat map rebuilt per projection, one dict appended per row)
+        players, games, rows = {}, {}, []
+        for item in payload.get('included', []):
+            attrs = item.get('attributes', {})
+            if item.get('type') == 'new_player':
+                players[item.get('id')] = {'name': attrs.get('name', 'Unknown'),
+                                           'team': attrs.get('team', 'UNK'),
+                                           'position': attrs.get('position', 'UNK')}
+            elif item.get('type') == 'game':
+                games[item.get('id')] = {'away_team': attrs.get('away_team', 'UNK'),
+                                         'home_team': attrs.get('home_team', 'UNK'),
+                                         'game_time': attrs.get('game_time')}
+        for proj in payload.get('data', []):
+            attrs = proj.get('attributes', {})
+            relationships = proj.get('relationships', {})
+            player = players.get(relationships.get('new_player', {}).get('data', {}).get('id'),
+                                 {'name': 'Unknown', 'team': 'UNK', 'position': 'UNK'})
+            game = games.get(relationships.get('game', {}).get('data', {}).get('id'), {})
+            opponent = 'UNK'
+            if game:
+                if player['team'] == game.get('away_team'):
+                    opponent = game.get('home_team', 'UNK')
+                elif player['team'] == game.get('home_team'):
+                    opponent = game.get('away_team', 'UNK')
+            stat_type = attrs.get('stat_type', 'Unknown')
+            line_score = attrs.get('line_score')
+            stat_map = dict(STAT_TYPE_MAP)
+            rows.append({
+                'projection_id': proj.get('id'), 'player_name': player['name'], 'team': player['team'],
+                'position': player['position'], 'opponent': opponent, 'stat_type': stat_type,
+                'prop_type': stat_map.get(stat_type, stat_type.lower()),
+                'line': float(line_score) if line_score else None,
+                'odds_type': attrs.get('odds_type', 'standard'), 'game_time': game.get('game_time')
+            })
+        return pd.DataFrame(rows, columns=PROJECTION_COLUMNS)
+
+    all_pass = True
+    payload = make_sample_payload(5000)
+
+    table = parse_projections(payload)
+    reference = parse_rowwise(payload)
+    ok = (len(table) == 5000
+          and table.drop(columns='line').astype(object).equals(reference.drop(columns='line').astype(object))
+          and np.allclose(table['line'], reference['line'].astype(float), equal_nan=True))
+    all_pass &= ok
+    print(f"  Matches row-by-row parse on 5,000 projections: {ok}")
+
+    ok = len(parse_projections({'data': [], 'included': []})) == 0
+    all_pass &= ok
+    print(f"  Empty payload: {ok}")
+
+    # Snapshot retention
+    import tempfile
+    global SNAPSHOT_DIR
+    snapshot_dir = SNAPSHOT_DIR
+    SNAPSHOT_DIR = tempfile.mkdtemp()
+    try:
+        for minute in range(5):
+            save_snapshot('NHL', {'data': []}, datetime(2025, 11, 3, 19, minute))
+        save_snapshot('NBA', {'data': []}, datetime(2025, 11, 3, 19, 0))
+        removed = prune_snapshots('NHL', keep=2)
+        newest = latest_snapshot('NHL')
+        ok = (removed == 3 and len(os.listdir(SNAPSHOT_DIR)) == 3
+              and newest is not None and newest[0] == datetime(2025, 11, 3, 19, 4))
+    finally:
+        SNAPSHOT_DIR = snapshot_dir
+    all_pass &= ok
+    print(f"  Old snapshots pruned per league: {ok}")
+
+    def best_of(parse, repeats=5):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            parse(payload)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    vectorized = best_of(parse_projections)
+    rowwise = best_of(parse_rowwise)
+    ok = vectorized < 0.05
+    all_pass &= ok
+    print(f"  5,000-projection payload: vectorized {vectorized * 1000:.1f}ms, "
+          f"row-by-row {rowwise * 1000:.1f}ms ({rowwise / vectorized:.1f}x) [{'PASS' if ok else 'FAIL'}]")
+
+    print()
+    print("[PASS]" if all_pass else "[FAIL]")
+    return all_pass
+
+
+if __name__ == "__main__":
+    test_projections()
@@ -16,6 +16,7 @@ import logging
 from datetime import datetime
 import os
 from game_script_features import GameScriptAnalyzer
+from nhl_teams import NHL_TEAM_MAP, NHL_ABBR_TO_FULL
 
 DB_PATH = "database/nhl_predictions.db"
 MODELS_DIR = "models"
@@ -23,45 +24,6 @@ MODELS_DIR = "models"
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
-# NHL Team Name Mapping: Full Name -> Abbreviation
-NHL_TEAM_MAP = {
-    'Anaheim Ducks': 'ANA',
-    'Boston Bruins': 'BOS',
-    'Buffalo Sabres': 'BUF',
-    'Calgary Flames': 'CGY',
-    'Carolina Hurricanes': 'CAR',
-    'Chicago Blackhawks': 'CHI',
-    'Colorado Avalanche': 'COL',
-    'Columbus Blue Jackets': 'CBJ',
-    'Dallas Stars': 'DAL',
-    'Detroit Red Wings': 'DET',
-    'Edmonton Oilers': 'EDM',
-    'Florida Panthers': 'FLA',
-    'Los Angeles Kings': 'LAK',
-    'Minnesota Wild': 'MIN',
-    'Montreal Canadiens': 'MTL',
-    'Nashville Predators': 'NSH',
-    'New Jersey Devils': 'NJD',
-    'New York Islanders': 'NYI',
-    'New York Rangers': 'NYR',
-    'Ottawa Senators': 'OTT',
-    'Philadelphia Flyers': 'PHI',
-    'Pittsburgh Penguins': 'PIT',
-    'San Jose Sharks': 'SJS',
-    'Seattle Kraken': 'SEA',
-    'St Louis Blues': 'STL',
-    'Tampa Bay Lightning': 'TBL',
-    'Toronto Maple Leafs': 'TOR',
-    'Vancouver Canucks': 'VAN',
-    'Vegas Golden Knights': 'VGK',
-    'Washington Capitals': 'WSH',
-    'Winnipeg Jets': 'WPG',
-    'Utah Hockey Club': 'UTA'
-}
-
-# Reverse mapping for abbreviation -> full name
-NHL_ABBR_TO_FULL = {v: k for k, v in NHL_TEAM_MAP.items()}
-
 
 class NHLMLTrainerV3:
     def __init__(self):
@@ -251,6 +251,16 @@ def main():
     updater.update_all_stars(force_full=force_full)
     updater.close()
 
+    # Fold the new logs into the empirical prop correlations and linemate graph
+    from correlation_detector import refresh_prop_correlations, build_linemate_graph
+    refresh = refresh_prop_correlations(DB_PATH, full_refresh=force_full)
+    print(f"[SUCCESS] Prop correlations refreshed: {refresh['new_logs']} new logs, "
+          f"{refresh['dates']} game dates")
+
+    graph = build_linemate_graph(DB_PATH)
+    print(f"[SUCCESS] Linemate graph rebuilt: {graph['linemates']} linemate pairs "
+          f"({graph['seconds']:.1f}s)")
+
 
 if __name__ == "__main__":
     main()